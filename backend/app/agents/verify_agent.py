@@ -1,29 +1,32 @@
 """Verifier agent for validating evidence against constraints."""
-from langchain_openai import AzureChatOpenAI
 from prompts.prompts import VERIFIER_PROMPT
 from app.core.config import settings
 from app.schemas.verifier import VerifierOutput
+from app.core.llm import get_llm_client, invoke_llm
 import json
 
 
-def get_llm_client():
-    """Get Azure OpenAI LLM client."""
-    return AzureChatOpenAI(
-        azure_endpoint=settings.azure_openai_endpoint,
-        api_key=settings.azure_openai_api_key,
-        api_version=settings.api_version,
-        azure_deployment=settings.azure_openai_model,
-        temperature=0.1,
-    )
+def _verifier_output_from_response(response_text: str) -> VerifierOutput:
+    """Parse a verifier response, tolerating code fences; raises if it is not valid verifier JSON."""
+    if "```json" in response_text:
+        json_start = response_text.find("```json") + 7
+        json_end = response_text.find("```", json_start)
+        response_text = response_text[json_start:json_end].strip()
+    elif "```" in response_text:
+        json_start = response_text.find("```") + 3
+        json_end = response_text.find("```", json_start)
+        response_text = response_text[json_start:json_end].strip()
+    return VerifierOutput(**json.loads(response_text))
 
 
-def verify_evidence(parsed_constraints: dict, evidence_summary: dict) -> VerifierOutput:
+def verify_evidence(parsed_constraints: dict, evidence_summary: dict, use_cache: bool = True) -> VerifierOutput:
     """
     Verify collected evidence matches constraints.
     
     Args:
         parsed_constraints: Parsed constraint object
         evidence_summary: Summary of collected evidence
+        use_cache: Set to False to bypass the LLM response cache
         
     Returns:
         VerifierOutput with pass/fail status
@@ -37,21 +40,8 @@ def verify_evidence(parsed_constraints: dict, evidence_summary: dict) -> Verifie
     prompt = VERIFIER_PROMPT.replace("{parsed_constraints}", constraints_str).replace("{evidence_summary}", evidence_str)
     
     try:
-        response = llm.invoke(prompt)
-        response_text = response.content
-        
-        # Extract JSON
-        if "```json" in response_text:
-            json_start = response_text.find("```json") + 7
-            json_end = response_text.find("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        elif "```" in response_text:
-            json_start = response_text.find("```") + 3
-            json_end = response_text.find("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        
-        result_dict = json.loads(response_text)
-        return VerifierOutput(**result_dict)
+        response = invoke_llm(llm, prompt, "VERIFIER_PROMPT", use_cache=use_cache, validate=_verifier_output_from_response)
+        return _verifier_output_from_response(response.content)
         
     except Exception as e:
         print(f"Error in verification: {str(e)}")
@@ -10,7 +10,7 @@ router = APIRouter(prefix="/analyze", tags=["analyze"])
 
 
 @router.post("", response_model=AnalyzeResponse)
-async def analyze_gaps(
+def analyze_gaps(
     analyze_req: AnalyzeRequest,
     db: Session = Depends(get_db)
 ):
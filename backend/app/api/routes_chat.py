@@ -1,9 +1,12 @@
 """Chat routes."""
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.services.chat_service import handle_chat_message
+from app.services.chat_service import handle_chat_message, stream_chat_message
 from app.schemas.chat import ChatRequest, ChatResponse
+from typing import Any, Dict, Iterable, Iterator
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,7 +15,7 @@ router = APIRouter(prefix="/chat", tags=["chat"])
 
 
 @router.post("", response_model=ChatResponse)
-async def chat(
+def chat(
     chat_req: ChatRequest,
     db: Session = Depends(get_db)
 ):
@@ -50,3 +53,29 @@ async def chat(
         raise HTTPException(status_code=500, detail=f"Error in chat: {str(e)}")
 
 
+def format_sse(events: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Encode chat events as server-sent events."""
+    for event in events:
+        yield f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+@router.post("/stream")
+def chat_stream(chat_req: ChatRequest):
+    """
+    Streaming chat endpoint (server-sent events).
+    
+    Emits `progress` events while tools run, `token` events with reply text
+    deltas, then a final `done` event carrying the full ChatResponse fields
+    (or an `error` event; if the reply stream broke after tokens were sent,
+    it carries the stored partial reply with `partial: true`).
+    """
+    events = stream_chat_message(
+        chat_req.message,
+        chat_req.conversation_id,
+        chat_req.document_id
+    )
+    return StreamingResponse(
+        format_sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
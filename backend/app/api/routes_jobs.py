@@ -0,0 +1,90 @@
+"""Background job routes."""
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.db.session import get_db, get_async_db
+from app.db.models import BackgroundJob
+from app.db.repositories.aio.background_job_repo import get_background_job
+from app.services.job_service import submit_job, submit_pdf_job
+from app.schemas.jobs import JobResponse
+from app.schemas.pdf import PDFResponse
+from app.schemas.search import SearchRequest
+from app.schemas.analyze import AnalyzeRequest
+from typing import Annotated
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def to_job_response(job: BackgroundJob) -> JobResponse:
+    """Convert a BackgroundJob row to its API response."""
+    return JobResponse(
+        job_id=job.job_id,
+        kind=job.kind,
+        status=job.status,
+        progress=job.progress_json or {},
+        result=job.result_json,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at
+    )
+
+
+@router.post("/pdf", response_model=PDFResponse)
+async def submit_pdf(
+    file: Annotated[UploadFile, File()],
+    db: Session = Depends(get_db)
+):
+    """
+    Upload a PDF syllabus; text is stored now and topics are extracted in the background.
+    """
+    if not file.filename.endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="File must be a PDF")
+    
+    try:
+        pdf_bytes = await file.read()
+        document, job = await run_in_threadpool(submit_pdf_job, pdf_bytes, file.filename, db)
+        return PDFResponse(
+            document_id=document.document_id,
+            extracted_text_preview=document.raw_text[:500] if document.raw_text else "",
+            topic_extract_status="pending",
+            job_id=job.job_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
+
+
+@router.post("/search", response_model=JobResponse)
+def submit_search(
+    search_req: SearchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Queue a job search; poll GET /jobs/{job_id} for progress and the SearchResponse.
+    """
+    return to_job_response(submit_job(db, "search", search_req.model_dump()))
+
+
+@router.post("/analyze", response_model=JobResponse)
+def submit_analyze(
+    analyze_req: AnalyzeRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Queue a gap analysis; poll GET /jobs/{job_id} for progress and the AnalyzeResponse.
+    """
+    return to_job_response(submit_job(db, "analyze", analyze_req.model_dump()))
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get background job status, progress and result.
+    """
+    job = await get_background_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return to_job_response(job)
@@ -1,5 +1,6 @@
 """PDF upload and processing routes."""
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.services.pdf_service import process_pdf
@@ -23,8 +24,8 @@ async def upload_pdf(
     try:
         pdf_bytes = await file.read()
         
-        document_id, text_preview, topic_extract_status = process_pdf(
-            pdf_bytes, file.filename, db
+        document_id, text_preview, topic_extract_status = await run_in_threadpool(
+            process_pdf, pdf_bytes, file.filename, db
         )
         
         return PDFResponse(
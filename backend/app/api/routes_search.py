@@ -10,7 +10,7 @@ router = APIRouter(prefix="/search", tags=["search"])
 
 
 @router.post("", response_model=SearchResponse)
-async def search_jobs(
+def search_jobs(
     search_req: SearchRequest,
     db: Session = Depends(get_db)
 ):
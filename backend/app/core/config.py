@@ -20,10 +20,82 @@ class Settings(BaseSettings):
     
     # Database Configuration
     database_url: str = "sqlite:///./syllabus_gap_analyzer.db"
+    db_pool_size: int = 10  # Connections kept open; covers request threads plus job_workers
+    db_max_overflow: int = 10  # Extra connections opened under bursts
+    db_pool_timeout: float = 30.0  # Seconds to wait for a free connection
+    sqlite_journal_mode: str = "WAL"  # Readers do not block the writer
+    sqlite_synchronous: str = "NORMAL"  # Safe with WAL; skips the fsync on every commit
+    sqlite_busy_timeout_ms: int = 5000  # Wait this long for the write lock before "database is locked"
+    sqlite_cache_size_kb: int = 20000  # Page cache per connection
+    sqlite_mmap_size_mb: int = 256  # Memory-mapped reads; 0 disables
     
     # Retry Configuration
     max_retries: int = 3
     retry_backoff_base: float = 2.0  # Exponential backoff base
+    llm_max_concurrency: int = 4  # Maximum LLM requests in flight at once
+    job_workers: int = 2  # Worker threads for background /jobs
+    job_heartbeat_seconds: int = 30  # How often a worker renews the lease on its running jobs
+    job_lease_seconds: int = 300  # A running job without a heartbeat this long is requeued
+    
+    # LLM HTTP Connection Pool
+    llm_http2: bool = True  # Needs the 'h2' package; falls back to HTTP/1.1 keep-alive
+    llm_http_max_connections: int = 20
+    llm_http_keepalive_expiry: float = 60.0  # Seconds an idle connection stays open
+    llm_request_timeout: float = 120.0
+    
+    # LLM Response Cache
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = "./llm_cache.sqlite3"
+    llm_cache_ttl_seconds: int = 7 * 24 * 3600  # One week
+    llm_cache_max_entries: int = 5000  # Least recently used entries evicted beyond this
+    
+    # PDF Extraction
+    pdf_extract_workers: int = 4  # Worker processes for page-parallel extraction
+    pdf_pages_per_task: int = 8  # Pages handed to one worker at a time
+    pdf_slow_page_seconds: float = 2.0  # Pages slower than this are logged
+    syllabus_chunk_size: int = 6000  # Characters per topic-extraction chunk
+    syllabus_chunk_overlap: int = 300
+    
+    # Gap Analysis
+    analysis_max_references: int = 5  # Posting URLs kept per table row
+    analysis_min_missing_jobs: int = 1  # Postings a topic needs to be listed as missing
+    analysis_max_missing_topics: int = 25
+    analysis_high_priority_share: float = 0.3  # Share of postings for "High" priority
+    analysis_medium_priority_share: float = 0.1  # Share of postings for "Medium" priority
+    analysis_prose_batch_size: int = 15  # Rows written per LLM call
+    analysis_recency_half_life_days: float = 90.0  # Posting weight halves at this age
+    
+    # Chat History
+    chat_history_max_messages: int = 40  # Most recent messages read per turn
+    chat_history_token_budget: int = 3000  # Tokens of past turns sent to the LLM (summary included)
+    chat_history_keep_ratio: float = 0.5  # Share of the budget kept verbatim when older turns are summarized
+    chat_summary_max_words: int = 250
+    
+    # Prompt Injection Sanitization
+    injection_policy: str = "redact"  # Job pages: "flag" (log only), "redact" (cut matched sentences) or "drop" (skip the page)
+    syllabus_injection_policy: str = "flag"  # Uploaded syllabi; course text often reads like instructions ("act as a", "execute code")
+    injection_redact_scope: str = "sentence"  # "sentence" or "paragraph" cut around each match
+    
+    # Topic Embeddings
+    embedding_backend: str = "auto"  # "hashing", "azure", or "auto" (azure when a deployment is set)
+    azure_openai_embedding_deployment: Optional[str] = None  # e.g., "text-embedding-3-small"
+    embedding_dim: int = 512  # Dimensions of the local hashing vectorizer
+    embedding_match_threshold: Optional[float] = None  # Cosine similarity for a match; None uses the backend default
+    embedding_batch_size: int = 256  # Topics per Azure embeddings request
+    topic_cluster_margin: float = 0.1  # Added to the match threshold before two topics are merged for good
+    
+    # Web Fetch Configuration
+    fetch_timeout: int = 10  # Per-request timeout in seconds
+    fetch_max_concurrency: int = 8  # Pages fetched in parallel per search
+    fetch_per_host_concurrency: int = 2  # Parallel requests allowed against one host
+    fetch_search_deadline: float = 30.0  # Overall fetch budget for one search in seconds
+    fetch_pool_maxsize: int = 20  # Keep-alive connections kept per host
+    fetch_cache_enabled: bool = True
+    fetch_cache_path: str = "./fetch_cache.sqlite3"
+    fetch_cache_max_age_seconds: int = 6 * 3600  # Served without revalidation inside this window
+    fetch_cache_max_entries: int = 10000
+    search_prefilter_enabled: bool = True  # Drop search hits that cannot match the constraints before fetching
+    search_prefilter_min_score: int = 0  # Hits scoring lower are dropped (see constraint_filter.score_search_hit)
     
     # Top Companies Allowlist (configurable)
     top_companies_allowlist: List[str] = [
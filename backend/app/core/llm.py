@@ -0,0 +1,306 @@
+"""Shared Azure OpenAI client registry and helpers for calling the LLM."""
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import httpx
+from langchain_core.messages import AIMessage
+from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
+from app.core.config import settings
+from app.core.llm_cache import get_llm_cache, LLMResponseCache
+from prompts.prompts import PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Caps the number of LLM requests in flight across all worker threads
+_llm_semaphore = threading.BoundedSemaphore(settings.llm_max_concurrency)
+
+# Client registry: one AzureChatOpenAI per (deployment, temperature), all sharing one HTTP pool
+_clients: Dict[Tuple[str, float], AzureChatOpenAI] = {}
+_embedding_clients: Dict[str, AzureOpenAIEmbeddings] = {}
+_clients_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_pool_stats = {
+    "clients_created": 0,
+    "client_lookups": 0,
+    "http_requests": 0,
+    "connections_opened": 0,
+}
+_pool_stats_lock = threading.Lock()
+
+
+def _count(key: str) -> None:
+    with _pool_stats_lock:
+        _pool_stats[key] += 1
+
+
+def _trace_connections(event_name: str, info: Dict[str, Any]) -> None:
+    """httpcore trace hook counting newly opened TCP connections."""
+    if event_name == "connection.connect_tcp.complete":
+        _count("connections_opened")
+
+
+def _on_request(request: httpx.Request) -> None:
+    _count("http_requests")
+    request.extensions["trace"] = _trace_connections
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _get_http_client() -> httpx.Client:
+    """Get the keep-alive HTTP client shared by all LLM clients (caller holds _clients_lock)."""
+    global _http_client
+    if _http_client is None:
+        http2 = settings.llm_http2 and _http2_available()
+        if settings.llm_http2 and not http2:
+            logger.warning("llm_http2 is enabled but the 'h2' package is not installed; using HTTP/1.1 keep-alive")
+        _http_client = httpx.Client(
+            http2=http2,
+            timeout=httpx.Timeout(settings.llm_request_timeout, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=settings.llm_http_max_connections,
+                max_keepalive_connections=settings.llm_http_max_connections,
+                keepalive_expiry=settings.llm_http_keepalive_expiry,
+            ),
+            event_hooks={"request": [_on_request]},
+        )
+    return _http_client
+
+
+def get_llm_client(temperature: float = 0.1, deployment: Optional[str] = None) -> AzureChatOpenAI:
+    """
+    Get the shared Azure OpenAI client for a deployment and temperature.
+
+    Clients are created lazily on first use and reused afterwards. All of them
+    share one pooled HTTP client, so connections stay alive across calls.
+
+    Args:
+        temperature: Sampling temperature
+        deployment: Azure deployment name (defaults to settings.azure_openai_model)
+
+    Returns:
+        AzureChatOpenAI client
+    """
+    deployment = deployment or settings.azure_openai_model
+    key = (deployment, temperature)
+    _count("client_lookups")
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = AzureChatOpenAI(
+                    azure_endpoint=settings.azure_openai_endpoint,
+                    api_key=settings.azure_openai_api_key,
+                    api_version=settings.api_version,
+                    azure_deployment=deployment,
+                    temperature=temperature,
+                    http_client=_get_http_client(),
+                )
+                _clients[key] = client
+                _count("clients_created")
+    return client
+
+
+def get_embeddings_client(deployment: str) -> AzureOpenAIEmbeddings:
+    """
+    Get the shared Azure OpenAI embeddings client for a deployment.
+    
+    Args:
+        deployment: Azure embeddings deployment name
+        
+    Returns:
+        AzureOpenAIEmbeddings client sharing the pooled HTTP client
+    """
+    _count("client_lookups")
+    client = _embedding_clients.get(deployment)
+    if client is None:
+        with _clients_lock:
+            client = _embedding_clients.get(deployment)
+            if client is None:
+                client = AzureOpenAIEmbeddings(
+                    azure_endpoint=settings.azure_openai_endpoint,
+                    api_key=settings.azure_openai_api_key,
+                    api_version=settings.api_version,
+                    azure_deployment=deployment,
+                    chunk_size=settings.embedding_batch_size,
+                    check_embedding_ctx_length=False,  # Topics are short; skip tiktoken tokenization
+                    http_client=_get_http_client(),
+                )
+                _embedding_clients[deployment] = client
+                _count("clients_created")
+    return client
+
+
+def embed_texts(deployment: str, texts: List[str]) -> List[List[float]]:
+    """
+    Embed texts with an Azure deployment under the in-flight limit, retrying on rate limits.
+    
+    Args:
+        deployment: Azure embeddings deployment name
+        texts: Texts to embed
+        
+    Returns:
+        One vector per text
+    """
+    client = get_embeddings_client(deployment)
+    return _call_with_retry(client.embed_documents, texts)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Return client registry and HTTP connection reuse statistics."""
+    with _pool_stats_lock:
+        stats = dict(_pool_stats)
+    requests_sent = stats["http_requests"]
+    lookups = stats["client_lookups"]
+    stats["client_reuse_rate"] = round(1 - stats["clients_created"] / lookups, 3) if lookups else 0.0
+    stats["connection_reuse_rate"] = (
+        round(max(0.0, 1 - stats["connections_opened"] / requests_sent), 3) if requests_sent else 0.0
+    )
+    stats["clients"] = [{"deployment": d, "temperature": t} for d, t in list(_clients)]
+    stats["clients"] += [{"deployment": d, "embeddings": True} for d in list(_embedding_clients)]
+    stats["http2"] = bool(_http_client is not None and settings.llm_http2 and _http2_available())
+    return stats
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    Check whether an exception is an HTTP 429 rate-limit response.
+
+    Args:
+        error: Exception raised by the LLM client
+
+    Returns:
+        True if the error is a rate-limit error
+    """
+    if getattr(error, "status_code", None) == 429:
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+def _retry_after_seconds(error: Exception) -> float:
+    """Read the Retry-After header from a rate-limit error, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def invoke_llm(
+    llm,
+    prompt: Any,
+    prompt_name: Optional[str] = None,
+    use_cache: bool = True,
+    validate: Optional[Callable[[str], Any]] = None
+):
+    """
+    Invoke the LLM, retrying rate-limited calls with exponential backoff.
+
+    Uses settings.max_retries and settings.retry_backoff_base, and holds a slot
+    of the global in-flight limit (settings.llm_max_concurrency) for each attempt.
+    String prompts tagged with a prompt_name are served from the response cache
+    when settings.llm_cache_enabled is set.
+
+    With validate (usually the caller's parser), a response is only cached if
+    validate accepts it; a response it rejects is returned uncached, so the
+    caller's own error handling applies and the next call asks the LLM again.
+    A cached response it rejects is deleted and the LLM is called instead.
+
+    Args:
+        llm: LangChain chat model
+        prompt: Prompt string or list of messages
+        prompt_name: Name of the prompt template, enables caching when given
+        use_cache: Set to False to bypass the cache for this call
+        validate: Called with the response text; raising rejects the response
+
+    Returns:
+        LLM response message
+    """
+    cache_key = None
+    if use_cache and prompt_name and isinstance(prompt, str) and settings.llm_cache_enabled:
+        model = getattr(llm, "deployment_name", None) or settings.azure_openai_model
+        cache_key = LLMResponseCache.make_key(prompt_name, PROMPT_VERSION, prompt, model, getattr(llm, "temperature", None))
+        cached = get_llm_cache().get(cache_key)
+        if cached is not None:
+            if _accepts(validate, cached):
+                return AIMessage(content=cached)
+            logger.warning(f"Dropping cached {prompt_name} response its caller cannot parse")
+            get_llm_cache().delete(cache_key)
+
+    response = _invoke_with_retry(llm, prompt)
+    if cache_key is not None and isinstance(response.content, str) and _accepts(validate, response.content):
+        get_llm_cache().set(cache_key, response.content, prompt_name)
+    return response
+
+
+def _accepts(validate: Optional[Callable[[str], Any]], response_text: str) -> bool:
+    """Whether validate (if any) accepts a response text without raising."""
+    if validate is None:
+        return True
+    try:
+        validate(response_text)
+    except Exception:
+        return False
+    return True
+
+
+def stream_llm(llm, prompt: Any) -> Iterator[str]:
+    """
+    Stream the LLM response as text deltas.
+
+    Rate-limited calls are retried like invoke_llm as long as no token has been
+    yielded yet. The in-flight slot is held until the stream finishes.
+
+    Args:
+        llm: LangChain chat model
+        prompt: Prompt string or list of messages
+
+    Yields:
+        Text deltas in arrival order
+    """
+    for attempt in range(settings.max_retries + 1):
+        started = False
+        try:
+            with _llm_semaphore:
+                for chunk in llm.stream(prompt):
+                    if chunk.content:
+                        started = True
+                        yield chunk.content
+            return
+        except Exception as e:
+            if started or not is_rate_limit_error(e) or attempt == settings.max_retries:
+                raise
+            delay = max(settings.retry_backoff_base ** attempt, _retry_after_seconds(e))
+            delay += random.uniform(0, 0.5)
+            logger.warning(f"LLM rate limited (attempt {attempt + 1}/{settings.max_retries}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _invoke_with_retry(llm, prompt: Any):
+    """Invoke the LLM under the in-flight limit, retrying on rate limits."""
+    return _call_with_retry(llm.invoke, prompt)
+
+
+def _call_with_retry(call, *args: Any):
+    """Run an Azure OpenAI call under the in-flight limit, retrying on rate limits."""
+    for attempt in range(settings.max_retries + 1):
+        try:
+            with _llm_semaphore:
+                return call(*args)
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt == settings.max_retries:
+                raise
+            delay = max(settings.retry_backoff_base ** attempt, _retry_after_seconds(e))
+            delay += random.uniform(0, 0.5)  # Jitter so parallel workers do not retry in lockstep
+            logger.warning(f"LLM rate limited (attempt {attempt + 1}/{settings.max_retries}), retrying in {delay:.1f}s")
+            time.sleep(delay)
@@ -0,0 +1,43 @@
+"""Progress reporting for long-running service calls."""
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Called as progress(stage, info), e.g. progress("fetch", {"fetched": 4, "total": 10})
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+
+def describe(stage: str, info: Dict[str, Any]) -> str:
+    """Human-readable one-line description of a progress event."""
+    if stage == "conversation":
+        return "Conversation started"
+    if stage == "search":
+        return "Searching for job postings"
+    if stage == "fetch":
+        return f"Fetched {info.get('fetched')}/{info.get('total')} pages"
+    if stage == "prefilter":
+        return f"Skipped {info.get('dropped')}/{info.get('total')} search results outside the constraints"
+    if stage == "filter":
+        return f"Filtered out {info.get('filtered')} postings outside the constraints"
+    if stage == "sources_collected":
+        return f"Collected {info.get('results_count')} job postings"
+    if stage == "verify":
+        return f"Verifying {info.get('job_count')} postings against constraints"
+    if stage == "extract":
+        return f"Extracted topics for {info.get('extracted')}/{info.get('total')} postings"
+    if stage == "analyze":
+        return f"Comparing {info.get('syllabus_topics')} syllabus topics with {info.get('job_topics')} job topics"
+    if stage == "store":
+        return "Saving analysis tables"
+    return stage.replace("_", " ").capitalize()
+
+
+def report(progress: Optional[ProgressCallback], stage: str, **info: Any) -> None:
+    """Report progress if a callback was given; callback errors never fail the caller."""
+    if progress is None:
+        return
+    try:
+        progress(stage, info)
+    except Exception as e:
+        logger.warning(f"Progress callback failed at stage '{stage}': {e}")
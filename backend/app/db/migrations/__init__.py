@@ -0,0 +1,4 @@
+"""Versioned schema migrations, applied by init_db after create_all."""
+from app.db.migrations.runner import run_migrations, get_applied_migrations
+
+__all__ = ["run_migrations", "get_applied_migrations"]
@@ -0,0 +1,100 @@
+"""Discover and apply versioned migration scripts, recording them in schema_migrations."""
+import importlib
+import logging
+import pkgutil
+import re
+from datetime import datetime
+from types import ModuleType
+from typing import Dict, List, Sequence
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from app.db.migrations import versions
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_MODULE_RE = re.compile(r"^v(\d{4})_\w+$")
+# Arbitrary key for the PostgreSQL advisory lock that serializes migrating replicas
+MIGRATION_LOCK_KEY = 7346001
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+
+def discover_migrations() -> Dict[int, ModuleType]:
+    """Import every vNNNN_*.py script in app.db.migrations.versions, keyed by version."""
+    migrations = {}
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        match = MIGRATION_MODULE_RE.match(module_info.name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise RuntimeError(f"Duplicate migration version {version}: {module_info.name}")
+        migrations[version] = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+    return dict(sorted(migrations.items()))
+
+
+def get_applied_migrations(connection: Connection) -> List[int]:
+    """Versions already recorded in schema_migrations."""
+    return list(connection.execute(select(schema_migrations.c.version).order_by(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(db_engine: Engine) -> List[int]:
+    """
+    Apply pending migrations in version order, each in its own transaction.
+
+    Scripts must be idempotent (CREATE INDEX IF NOT EXISTS and the like):
+    create_all has already built fresh databases from the current models, so
+    on a new deployment every script runs against a schema it may already match.
+
+    Args:
+        db_engine: Engine of the database to migrate
+
+    Returns:
+        Versions applied by this call
+    """
+    _metadata.create_all(bind=db_engine)
+    applied = []
+    for version, module in discover_migrations().items():
+        with db_engine.begin() as connection:
+            if connection.dialect.name == "postgresql":
+                connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            if version in get_applied_migrations(connection):
+                continue
+            module.upgrade(connection)
+            connection.execute(insert(schema_migrations), {"version": version, "name": module.__name__.rsplit(".", 1)[-1]})
+        applied.append(version)
+        logger.info(f"Applied migration {version}: {module.DESCRIPTION}")
+    return applied
+
+
+def _quote(connection: Connection, name: str) -> str:
+    return connection.dialect.identifier_preparer.quote(name)
+
+
+def create_index(connection: Connection, name: str, table: str, columns: Sequence[str], unique: bool = False) -> None:
+    """CREATE INDEX IF NOT EXISTS on the given columns."""
+    cols = ", ".join(_quote(connection, c) for c in columns)
+    connection.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {_quote(connection, name)} "
+        f"ON {_quote(connection, table)} ({cols})"
+    ))
+
+
+def drop_index(connection: Connection, name: str) -> None:
+    """DROP INDEX IF EXISTS."""
+    connection.execute(text(f"DROP INDEX IF EXISTS {_quote(connection, name)}"))
+
+
+def add_column(connection: Connection, table: str, column_ddl: str) -> None:
+    """ALTER TABLE ADD COLUMN unless the column (first word of column_ddl) already exists."""
+    column = column_ddl.split()[0]
+    if column in {c["name"] for c in inspect(connection).get_columns(table)}:
+        return
+    connection.execute(text(f"ALTER TABLE {_quote(connection, table)} ADD COLUMN {column_ddl}"))
@@ -0,0 +1 @@
+"""Migration scripts, one module per version: vNNNN_<name>.py defining DESCRIPTION and upgrade(connection)."""
@@ -0,0 +1,21 @@
+"""Composite indexes for the hot chat history, posting dedup and topic aggregation queries."""
+from sqlalchemy.engine import Connection
+from app.db.migrations.runner import create_index, drop_index
+
+DESCRIPTION = "composite indexes on chat_messages, job_sources and job_topics"
+
+
+def upgrade(connection: Connection) -> None:
+    # get_conversation_messages: WHERE conversation_id = ? ORDER BY created_at
+    create_index(connection, "idx_chat_conversation_created", "chat_messages", ["conversation_id", "created_at"])
+    # get_source_by_hash within a conversation
+    create_index(connection, "idx_job_source_conversation_hash", "job_sources", ["conversation_id", "content_hash"])
+    # Topic aggregation: WHERE conversation_id = ? GROUP BY normalized_topic, job_source_id
+    create_index(
+        connection, "idx_job_topic_conversation_topic", "job_topics",
+        ["conversation_id", "normalized_topic", "job_source_id"]
+    )
+    # Single-column conversation indexes are prefixes of the composites above
+    drop_index(connection, "idx_chat_conversation")
+    drop_index(connection, "idx_job_source_conversation")
+    drop_index(connection, "idx_job_topic_conversation")
@@ -0,0 +1,9 @@
+"""Location column on job_sources, filled from JSON-LD JobPosting metadata."""
+from sqlalchemy.engine import Connection
+from app.db.migrations.runner import add_column
+
+DESCRIPTION = "job_sources.location"
+
+
+def upgrade(connection: Connection) -> None:
+    add_column(connection, "job_sources", "location VARCHAR(255)")
@@ -0,0 +1,21 @@
+"""Unique (content_hash, normalized_topic) on posting_topics so concurrent extractions cannot duplicate topics."""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.db.migrations.runner import create_index, drop_index
+
+DESCRIPTION = "unique index on posting_topics (content_hash, normalized_topic)"
+
+
+def upgrade(connection: Connection) -> None:
+    # Keep the oldest row of each duplicate group
+    connection.execute(text(
+        "DELETE FROM posting_topics WHERE id NOT IN "
+        "(SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM posting_topics "
+        "GROUP BY content_hash, normalized_topic) AS keep)"
+    ))
+    create_index(
+        connection, "idx_posting_topic_hash_topic", "posting_topics",
+        ["content_hash", "normalized_topic"], unique=True
+    )
+    # Lookups by content_hash use the prefix of the unique index
+    drop_index(connection, "idx_posting_topic_hash")
@@ -0,0 +1,10 @@
+"""Worker and heartbeat columns on background_jobs for atomic claims and lease expiry."""
+from sqlalchemy.engine import Connection
+from app.db.migrations.runner import add_column
+
+DESCRIPTION = "background_jobs.worker and background_jobs.heartbeat_at"
+
+
+def upgrade(connection: Connection) -> None:
+    add_column(connection, "background_jobs", "worker VARCHAR(255)")
+    add_column(connection, "background_jobs", "heartbeat_at TIMESTAMP")
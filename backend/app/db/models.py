@@ -1,5 +1,5 @@
 """SQLAlchemy database models."""
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, JSON, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, JSON, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -42,11 +42,44 @@ class ChatMessage(Base):
     conversation = relationship("Conversation", back_populates="chat_messages")
     
     __table_args__ = (
-        Index("idx_chat_conversation", "conversation_id"),
+        Index("idx_chat_conversation_created", "conversation_id", "created_at"),
         Index("idx_chat_created", "created_at"),
     )
 
 
+class ConversationSummary(Base):
+    """Rolling summary of the chat turns that fell out of the history window."""
+    __tablename__ = "conversation_summaries"
+    
+    conversation_id = Column(String(36), ForeignKey("conversations.conversation_id", ondelete="CASCADE"), primary_key=True)
+    summary = Column(Text, nullable=False)
+    covered_until_message_id = Column(Integer, nullable=False)  # Last ChatMessage.id folded into the summary
+    message_count = Column(Integer, nullable=False, default=0)  # Messages folded in so far
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class InjectionDetection(Base):
+    """Prompt injection matches found in job pages and syllabi before they were sent to the LLM."""
+    __tablename__ = "injection_detections"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source_type = Column(String(20), nullable=False)  # "job_source" or "document"
+    source_id = Column(String(36), nullable=False)  # JobSource.id or Document.document_id
+    conversation_id = Column(String(36), ForeignKey("conversations.conversation_id", ondelete="CASCADE"))
+    pattern_id = Column(Integer, nullable=False)  # Index into INJECTION_PATTERNS
+    pattern = Column(String(255), nullable=False)
+    matched_text = Column(String(255), nullable=False)
+    start_offset = Column(Integer, nullable=False)
+    end_offset = Column(Integer, nullable=False)
+    action = Column(String(20), nullable=False)  # "flagged", "redacted" or "dropped"
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("idx_injection_source", "source_type", "source_id"),
+        Index("idx_injection_created", "created_at"),
+    )
+
+
 class Document(Base):
     """Documents table - stores uploaded PDFs."""
     __tablename__ = "documents"
@@ -99,6 +132,7 @@ class JobSource(Base):
     company = Column(String(255))
     role = Column(String(255))
     date_posted = Column(DateTime)  # If available from source
+    location = Column(String(255))  # From the posting's JSON-LD jobLocation, if any
     fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     snippet = Column(Text)  # Search snippet or summary
     raw_text = Column(Text)  # Full page text if available
@@ -110,7 +144,7 @@ class JobSource(Base):
     job_topics = relationship("JobTopic", back_populates="job_source", cascade="all, delete-orphan")
     
     __table_args__ = (
-        Index("idx_job_source_conversation", "conversation_id"),
+        Index("idx_job_source_conversation_hash", "conversation_id", "content_hash"),
         Index("idx_job_source_hash", "content_hash"),
         Index("idx_job_source_company", "company"),
         Index("idx_job_source_fetched", "fetched_at"),
@@ -135,11 +169,91 @@ class JobTopic(Base):
     
     __table_args__ = (
         Index("idx_job_topic_source", "job_source_id"),
-        Index("idx_job_topic_conversation", "conversation_id"),
+        Index("idx_job_topic_conversation_topic", "conversation_id", "normalized_topic", "job_source_id"),
         Index("idx_job_topic_normalized", "normalized_topic"),
     )
 
 
+class PostingTopic(Base):
+    """Topics extracted from a job posting, shared across conversations by content hash."""
+    __tablename__ = "posting_topics"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    content_hash = Column(String(64), nullable=False)  # JobSource.content_hash of the posting
+    normalized_topic = Column(String(255), nullable=False)
+    raw_topic = Column(String(255))
+    confidence = Column(Float)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        # One row per topic of a posting; concurrent extractions of the same posting insert with ignore-on-conflict
+        Index("idx_posting_topic_hash_topic", "content_hash", "normalized_topic", unique=True),
+    )
+
+
+class TopicEmbedding(Base):
+    """Topic vectors, stored once per normalized topic and embedding backend."""
+    __tablename__ = "topic_embeddings"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    backend = Column(String(100), nullable=False)  # e.g., "hashing-512-v1", "azure:text-embedding-3-small"
+    normalized_topic = Column(String(255), nullable=False)
+    dim = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)  # float32, L2-normalized
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("idx_topic_embedding_lookup", "backend", "normalized_topic", unique=True),
+    )
+
+
+class CanonicalTopic(Base):
+    """Canonical topic names shared across all documents and conversations."""
+    __tablename__ = "canonical_topics"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(255), nullable=False, unique=True)  # Normalized canonical name
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class TopicVariant(Base):
+    """Variant -> canonical topic index (e.g., "structured query language" -> "sql")."""
+    __tablename__ = "topic_variants"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    variant = Column(String(255), nullable=False, unique=True)  # Normalized variant
+    canonical_topic = Column(String(255), ForeignKey("canonical_topics.name", ondelete="CASCADE"), nullable=False)
+    method = Column(String(20))  # How it was clustered: "new", "key", "acronym", "embedding"
+    similarity = Column(Float)  # Cosine similarity for "embedding" matches
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("idx_topic_variant_canonical", "canonical_topic"),
+    )
+
+
+class BackgroundJob(Base):
+    """Background jobs - long-running /pdf, /search and /analyze work run off the request thread."""
+    __tablename__ = "background_jobs"
+    
+    job_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String(20), nullable=False)  # "pdf", "search", "analyze"
+    status = Column(String(20), nullable=False, default="queued")  # "queued", "running", "completed", "failed"
+    params_json = Column(JSON)  # Inputs needed to (re)run the job
+    progress_json = Column(JSON)  # Latest progress: stage plus stage-specific counters
+    result_json = Column(JSON)  # Final result, written on completion; partial state is in progress_json
+    error = Column(Text)
+    worker = Column(String(255))  # Worker ("host:pid") that claimed the job
+    heartbeat_at = Column(DateTime)  # Last lease renewal by the claiming worker
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("idx_background_job_status", "status"),
+        Index("idx_background_job_created", "created_at"),
+    )
+
+
 class AnalysisRun(Base):
     """Analysis runs - tracks each gap analysis execution."""
     __tablename__ = "analysis_runs"
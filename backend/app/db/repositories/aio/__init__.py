@@ -0,0 +1 @@
+"""Async database repositories (AsyncSession counterparts of app.db.repositories)."""
@@ -0,0 +1,48 @@
+"""Analysis repository (async)."""
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import AnalysisRun, AnalysisTableARow, AnalysisTableBRow
+from typing import List, Optional, Dict, Any
+
+
+async def create_analysis_run(db: AsyncSession, analysis_run: AnalysisRun) -> AnalysisRun:
+    """Create a new analysis run."""
+    db.add(analysis_run)
+    await db.commit()
+    await db.refresh(analysis_run)
+    return analysis_run
+
+
+async def get_analysis_run(db: AsyncSession, analysis_run_id: int) -> Optional[AnalysisRun]:
+    """Get analysis run by ID."""
+    return await db.get(AnalysisRun, analysis_run_id)
+
+
+async def get_table_a_rows(db: AsyncSession, analysis_run_id: int) -> List[AnalysisTableARow]:
+    """Get all Table A rows for an analysis run."""
+    result = await db.scalars(select(AnalysisTableARow).where(AnalysisTableARow.analysis_run_id == analysis_run_id))
+    return list(result)
+
+
+async def get_table_b_rows(db: AsyncSession, analysis_run_id: int) -> List[AnalysisTableBRow]:
+    """Get all Table B rows for an analysis run."""
+    result = await db.scalars(select(AnalysisTableBRow).where(AnalysisTableBRow.analysis_run_id == analysis_run_id))
+    return list(result)
+
+
+async def create_table_a_rows(db: AsyncSession, rows: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert Table A rows (column dicts) in one executemany statement."""
+    if rows:
+        await db.execute(insert(AnalysisTableARow), rows)
+    if commit:
+        await db.commit()
+    return len(rows)
+
+
+async def create_table_b_rows(db: AsyncSession, rows: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert Table B rows (column dicts) in one executemany statement."""
+    if rows:
+        await db.execute(insert(AnalysisTableBRow), rows)
+    if commit:
+        await db.commit()
+    return len(rows)
@@ -0,0 +1,39 @@
+"""Background job repository (async)."""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import BackgroundJob
+from typing import List, Optional
+
+
+async def create_background_job(db: AsyncSession, job: BackgroundJob) -> BackgroundJob:
+    """Create a new background job."""
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def get_background_job(db: AsyncSession, job_id: str) -> Optional[BackgroundJob]:
+    """Get background job by ID."""
+    return await db.get(BackgroundJob, job_id)
+
+
+async def get_jobs_by_status(db: AsyncSession, statuses: List[str]) -> List[BackgroundJob]:
+    """Get background jobs in any of the given statuses, oldest first."""
+    result = await db.scalars(
+        select(BackgroundJob)
+        .where(BackgroundJob.status.in_(statuses))
+        .order_by(BackgroundJob.created_at.asc())
+    )
+    return list(result)
+
+
+async def update_background_job(db: AsyncSession, job_id: str, **kwargs) -> Optional[BackgroundJob]:
+    """Update background job fields."""
+    job = await get_background_job(db, job_id)
+    if job:
+        for key, value in kwargs.items():
+            setattr(job, key, value)
+        await db.commit()
+        await db.refresh(job)
+    return job
@@ -0,0 +1,50 @@
+"""Canonical topic and topic variant repository (async)."""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import CanonicalTopic, TopicVariant
+from app.db.upsert import insert_ignore
+from typing import Iterable, List, Dict, Any, Tuple
+
+
+async def get_canonical_names(db: AsyncSession) -> List[str]:
+    """Get all canonical topic names in creation order."""
+    return list(await db.scalars(select(CanonicalTopic.name).order_by(CanonicalTopic.id)))
+
+
+async def get_variant_index(db: AsyncSession) -> List[Tuple[str, str]]:
+    """Get all (variant, canonical_topic) pairs."""
+    result = await db.execute(select(TopicVariant.variant, TopicVariant.canonical_topic))
+    return [tuple(row) for row in result]
+
+
+async def get_variant_canonicals(db: AsyncSession, variants: Iterable[str]) -> Dict[str, str]:
+    """Get the stored canonical topic of each given variant, keyed by variant."""
+    variants = list(set(variants))
+    canonicals = {}
+    # Chunked to stay under SQLite's bound-parameter limit
+    for i in range(0, len(variants), 500):
+        result = await db.execute(
+            select(TopicVariant.variant, TopicVariant.canonical_topic).where(
+                TopicVariant.variant.in_(variants[i:i + 500])
+            )
+        )
+        canonicals.update({variant: canonical for variant, canonical in result})
+    return canonicals
+
+
+async def create_canonical_topics(db: AsyncSession, topics: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert canonical topics (column dicts) in one executemany statement, skipping existing names."""
+    if topics:
+        await db.execute(insert_ignore(db.get_bind().dialect.name, CanonicalTopic, ["name"]), topics)
+    if commit:
+        await db.commit()
+    return len(topics)
+
+
+async def create_topic_variants(db: AsyncSession, variants: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert topic variants (column dicts) in one executemany statement, skipping stored variants."""
+    if variants:
+        await db.execute(insert_ignore(db.get_bind().dialect.name, TopicVariant, ["variant"]), variants)
+    if commit:
+        await db.commit()
+    return len(variants)
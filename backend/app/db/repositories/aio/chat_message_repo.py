@@ -0,0 +1,51 @@
+"""Chat message repository (async)."""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import ChatMessage
+from typing import List, Dict, Any, Optional
+
+
+async def create_chat_message(
+    db: AsyncSession,
+    conversation_id: str,
+    role: str,
+    content: str,
+    metadata: Dict[str, Any] = None
+) -> ChatMessage:
+    """Create a new chat message."""
+    message = ChatMessage(
+        conversation_id=conversation_id,
+        role=role,
+        content=content,
+        metadata_json=metadata or {}
+    )
+    db.add(message)
+    await db.commit()
+    await db.refresh(message)
+    return message
+
+
+async def get_conversation_messages(
+    db: AsyncSession,
+    conversation_id: str,
+    limit: int = 50,
+    after_id: Optional[int] = None,
+    before_id: Optional[int] = None
+) -> List[ChatMessage]:
+    """Get the most recent messages of a conversation, oldest first (see the sync repository)."""
+    query = select(ChatMessage).where(ChatMessage.conversation_id == conversation_id)
+    if after_id is not None:
+        query = query.where(ChatMessage.id > after_id)
+    if before_id is not None:
+        query = query.where(ChatMessage.id < before_id)
+    result = await db.scalars(query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(limit))
+    return list(result)[::-1]
+
+
+async def get_conversation_messages_for_llm(db: AsyncSession, conversation_id: str, limit: int = 20) -> List[Dict[str, str]]:
+    """Get conversation messages formatted for LLM (list of dicts with role and content)."""
+    messages = await get_conversation_messages(db, conversation_id, limit)
+    return [
+        {"role": msg.role, "content": msg.content}
+        for msg in messages
+    ]
@@ -0,0 +1,31 @@
+"""Conversation repository (async)."""
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import Conversation
+import uuid
+
+
+async def get_or_create_conversation(db: AsyncSession, conversation_id: str = None) -> Conversation:
+    """Get existing conversation or create new one."""
+    if conversation_id:
+        conv = await db.get(Conversation, conversation_id)
+        if conv:
+            return conv
+
+    # Create new conversation
+    new_id = conversation_id or str(uuid.uuid4())
+    conv = Conversation(conversation_id=new_id, status="active")
+    db.add(conv)
+    await db.commit()
+    await db.refresh(conv)
+    return conv
+
+
+async def update_conversation(db: AsyncSession, conversation_id: str, **kwargs) -> Conversation:
+    """Update conversation fields."""
+    conv = await db.get(Conversation, conversation_id)
+    if conv:
+        for key, value in kwargs.items():
+            setattr(conv, key, value)
+        await db.commit()
+        await db.refresh(conv)
+    return conv
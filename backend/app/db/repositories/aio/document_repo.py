@@ -0,0 +1,16 @@
+"""Document repository (async)."""
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import Document
+
+
+async def get_document_by_id(db: AsyncSession, document_id: str) -> Document:
+    """Get document by ID."""
+    return await db.get(Document, document_id)
+
+
+async def create_document(db: AsyncSession, document: Document) -> Document:
+    """Create a new document."""
+    db.add(document)
+    await db.commit()
+    await db.refresh(document)
+    return document
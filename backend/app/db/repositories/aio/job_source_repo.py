@@ -0,0 +1,40 @@
+"""Job source repository (async)."""
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import JobSource
+from typing import List, Optional, Dict, Any
+
+
+async def get_sources_by_conversation(db: AsyncSession, conversation_id: str) -> List[JobSource]:
+    """Get all job sources for a conversation."""
+    return list(await db.scalars(select(JobSource).where(JobSource.conversation_id == conversation_id)))
+
+
+async def get_source_by_hash(db: AsyncSession, content_hash: str, conversation_id: Optional[str] = None) -> Optional[JobSource]:
+    """Get job source by content hash (for deduplication), optionally within one conversation."""
+    query = select(JobSource).where(JobSource.content_hash == content_hash)
+    if conversation_id:
+        query = query.where(JobSource.conversation_id == conversation_id)
+    return (await db.scalars(query.limit(1))).first()
+
+
+async def create_job_sources(db: AsyncSession, job_sources: List[Dict[str, Any]], commit: bool = True) -> List[int]:
+    """Bulk insert job sources (column dicts). Returns the new IDs in input order."""
+    if not job_sources:
+        return []
+    result = await db.execute(
+        insert(JobSource).returning(JobSource.id, sort_by_parameter_order=True),
+        job_sources
+    )
+    ids = list(result.scalars())
+    if commit:
+        await db.commit()
+    return ids
+
+
+async def get_sources_by_ids(db: AsyncSession, source_ids: List[int]) -> List[JobSource]:
+    """Get job sources by ID, in the order given."""
+    if not source_ids:
+        return []
+    by_id = {s.id: s for s in await db.scalars(select(JobSource).where(JobSource.id.in_(source_ids)))}
+    return [by_id[source_id] for source_id in source_ids if source_id in by_id]
@@ -0,0 +1,46 @@
+"""Job topic repository (async)."""
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import JobTopic
+from app.db.repositories.job_topic_repo import (
+    count_topics_query, topic_frequencies_query, topic_frequency_row, topic_postings_query, topic_phrasings_query
+)
+from typing import List, Dict, Any, AsyncIterator
+
+
+async def get_topics_by_conversation(db: AsyncSession, conversation_id: str) -> List[JobTopic]:
+    """Get all job topics for a conversation."""
+    return list(await db.scalars(select(JobTopic).where(JobTopic.conversation_id == conversation_id)))
+
+
+async def count_topics_by_conversation(db: AsyncSession, conversation_id: str) -> int:
+    """Count job topics for a conversation without loading them."""
+    return (await db.execute(count_topics_query(conversation_id))).scalar_one()
+
+
+async def get_topic_frequencies(db: AsyncSession, conversation_id: str, sample_urls: int = 3) -> AsyncIterator[Dict[str, Any]]:
+    """Aggregate a conversation's job topics with GROUP BY, most widespread first (see the sync repository)."""
+    query = topic_frequencies_query(db.get_bind().dialect.name, conversation_id, sample_urls)
+    async for row in await db.stream(query):
+        yield topic_frequency_row(row)
+
+
+async def iter_topic_postings(db: AsyncSession, conversation_id: str) -> AsyncIterator[Any]:
+    """Stream one aggregated (topic, posting) row at a time (see the sync repository)."""
+    async for row in await db.stream(topic_postings_query(conversation_id)):
+        yield row
+
+
+async def iter_topic_phrasings(db: AsyncSession, conversation_id: str) -> AsyncIterator[Any]:
+    """Stream (normalized_topic, raw_topic, mentions) rows (see the sync repository)."""
+    async for row in await db.stream(topic_phrasings_query(conversation_id)):
+        yield row
+
+
+async def create_job_topics(db: AsyncSession, topics: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert job topics (column dicts) in one executemany statement."""
+    if topics:
+        await db.execute(insert(JobTopic), topics)
+    if commit:
+        await db.commit()
+    return len(topics)
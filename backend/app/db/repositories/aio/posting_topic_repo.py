@@ -0,0 +1,21 @@
+"""Posting topic repository (async)."""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import PostingTopic
+from app.db.upsert import insert_ignore
+from typing import List, Dict, Any
+
+
+async def get_topics_by_hash(db: AsyncSession, content_hash: str) -> List[PostingTopic]:
+    """Get previously extracted topics for a posting's content hash."""
+    return list(await db.scalars(select(PostingTopic).where(PostingTopic.content_hash == content_hash)))
+
+
+async def create_posting_topics(db: AsyncSession, topics: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert posting topics (column dicts), skipping topics the posting already has."""
+    if topics:
+        statement = insert_ignore(db.get_bind().dialect.name, PostingTopic, ["content_hash", "normalized_topic"])
+        await db.execute(statement, topics)
+    if commit:
+        await db.commit()
+    return len(topics)
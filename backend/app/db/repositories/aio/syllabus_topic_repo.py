@@ -0,0 +1,19 @@
+"""Syllabus topic repository (async)."""
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import SyllabusTopic
+from typing import List, Dict, Any
+
+
+async def get_topics_by_document_id(db: AsyncSession, document_id: str) -> List[SyllabusTopic]:
+    """Get all syllabus topics for a document."""
+    return list(await db.scalars(select(SyllabusTopic).where(SyllabusTopic.document_id == document_id)))
+
+
+async def create_topics(db: AsyncSession, topics: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert syllabus topics (column dicts) in one executemany statement."""
+    if topics:
+        await db.execute(insert(SyllabusTopic), topics)
+    if commit:
+        await db.commit()
+    return len(topics)
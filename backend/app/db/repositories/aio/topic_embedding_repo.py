@@ -0,0 +1,32 @@
+"""Topic embedding repository (async)."""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import TopicEmbedding
+from app.db.upsert import insert_ignore
+from typing import Dict, Iterable, List, Any
+
+
+async def get_embeddings(db: AsyncSession, backend: str, topics: Iterable[str]) -> Dict[str, bytes]:
+    """Get stored vectors (float32 bytes) for normalized topics, keyed by topic."""
+    topics = list(set(topics))
+    vectors = {}
+    # Chunked to stay under SQLite's bound-parameter limit
+    for i in range(0, len(topics), 500):
+        result = await db.execute(
+            select(TopicEmbedding.normalized_topic, TopicEmbedding.vector).where(
+                TopicEmbedding.backend == backend,
+                TopicEmbedding.normalized_topic.in_(topics[i:i + 500])
+            )
+        )
+        vectors.update({topic: vector for topic, vector in result})
+    return vectors
+
+
+async def create_embeddings(db: AsyncSession, embeddings: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert topic embeddings (column dicts) in one executemany statement, skipping ones already stored."""
+    if embeddings:
+        statement = insert_ignore(db.get_bind().dialect.name, TopicEmbedding, ["backend", "normalized_topic"])
+        await db.execute(statement, embeddings)
+    if commit:
+        await db.commit()
+    return len(embeddings)
@@ -1,7 +1,8 @@
 """Analysis repository."""
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.db.models import AnalysisRun, AnalysisTableARow, AnalysisTableBRow
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 
 
 def create_analysis_run(db: Session, analysis_run: AnalysisRun) -> AnalysisRun:
@@ -43,3 +44,21 @@ def create_table_b_row(db: Session, row: AnalysisTableBRow) -> AnalysisTableBRow
     return row
 
 
+def create_table_a_rows(db: Session, rows: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert Table A rows (column dicts) in one executemany statement."""
+    if rows:
+        db.execute(insert(AnalysisTableARow), rows)
+    if commit:
+        db.commit()
+    return len(rows)
+
+
+def create_table_b_rows(db: Session, rows: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert Table B rows (column dicts) in one executemany statement."""
+    if rows:
+        db.execute(insert(AnalysisTableBRow), rows)
+    if commit:
+        db.commit()
+    return len(rows)
+
+
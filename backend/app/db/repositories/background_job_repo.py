@@ -0,0 +1,108 @@
+"""Background job repository."""
+from datetime import datetime
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+from app.db.models import BackgroundJob
+from typing import List, Optional
+
+
+def create_background_job(db: Session, job: BackgroundJob) -> BackgroundJob:
+    """Create a new background job."""
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_background_job(db: Session, job_id: str) -> Optional[BackgroundJob]:
+    """Get background job by ID."""
+    return db.query(BackgroundJob).filter(BackgroundJob.job_id == job_id).first()
+
+
+def get_jobs_by_status(db: Session, statuses: List[str]) -> List[BackgroundJob]:
+    """Get background jobs in any of the given statuses, oldest first."""
+    return db.query(BackgroundJob)\
+        .filter(BackgroundJob.status.in_(statuses))\
+        .order_by(BackgroundJob.created_at.asc())\
+        .all()
+
+
+def update_background_job(db: Session, job_id: str, **kwargs) -> Optional[BackgroundJob]:
+    """Update background job fields."""
+    job = get_background_job(db, job_id)
+    if job:
+        for key, value in kwargs.items():
+            setattr(job, key, value)
+        db.commit()
+        db.refresh(job)
+    return job
+
+
+def claim_background_job(db: Session, job_id: str, worker: str) -> bool:
+    """
+    Atomically move a queued job to running for one worker.
+
+    Returns:
+        True if this worker claimed the job, False if it was not queued (another worker has it)
+    """
+    now = datetime.utcnow()
+    result = db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.job_id == job_id, BackgroundJob.status == "queued")
+        .values(status="running", worker=worker, heartbeat_at=now, progress_json={"stage": "started"}, updated_at=now)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def update_claimed_job(db: Session, job_id: str, worker: str, **kwargs) -> bool:
+    """
+    Update a running job only while the given worker still holds it, renewing its lease.
+
+    Returns:
+        False if the job was requeued or claimed by another worker since
+    """
+    now = datetime.utcnow()
+    result = db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.job_id == job_id, BackgroundJob.worker == worker, BackgroundJob.status == "running")
+        .values(heartbeat_at=now, updated_at=now, **kwargs)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def heartbeat_background_jobs(db: Session, job_ids: List[str], worker: str) -> int:
+    """Renew the lease on the given running jobs held by a worker."""
+    if not job_ids:
+        return 0
+    result = db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.job_id.in_(job_ids), BackgroundJob.worker == worker, BackgroundJob.status == "running")
+        .values(heartbeat_at=datetime.utcnow())
+    )
+    db.commit()
+    return result.rowcount
+
+
+def requeue_expired_jobs(db: Session, expired_before: datetime) -> List[str]:
+    """
+    Requeue running jobs whose worker has not renewed the lease since expired_before.
+
+    Returns:
+        IDs of the requeued jobs
+    """
+    expired = or_(BackgroundJob.heartbeat_at.is_(None), BackgroundJob.heartbeat_at < expired_before)
+    job_ids = [row.job_id for row in db.query(BackgroundJob.job_id).filter(BackgroundJob.status == "running", expired)]
+    requeued = []
+    for job_id in job_ids:
+        # Re-check the lease in the UPDATE so a job renewed meanwhile keeps running
+        result = db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.job_id == job_id, BackgroundJob.status == "running", expired)
+            .values(status="queued", worker=None, heartbeat_at=None, progress_json={"stage": "requeued"})
+        )
+        if result.rowcount == 1:
+            requeued.append(job_id)
+    db.commit()
+    return requeued
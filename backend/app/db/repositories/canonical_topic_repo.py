@@ -0,0 +1,46 @@
+"""Canonical topic and topic variant repository."""
+from sqlalchemy.orm import Session
+from app.db.models import CanonicalTopic, TopicVariant
+from app.db.upsert import insert_ignore
+from typing import Iterable, List, Dict, Any, Tuple
+
+
+def get_canonical_names(db: Session) -> List[str]:
+    """Get all canonical topic names in creation order."""
+    return [name for (name,) in db.query(CanonicalTopic.name).order_by(CanonicalTopic.id).all()]
+
+
+def get_variant_index(db: Session) -> List[Tuple[str, str]]:
+    """Get all (variant, canonical_topic) pairs."""
+    return db.query(TopicVariant.variant, TopicVariant.canonical_topic).all()
+
+
+def get_variant_canonicals(db: Session, variants: Iterable[str]) -> Dict[str, str]:
+    """Get the stored canonical topic of each given variant, keyed by variant."""
+    variants = list(set(variants))
+    canonicals = {}
+    # Chunked to stay under SQLite's bound-parameter limit
+    for i in range(0, len(variants), 500):
+        rows = db.query(TopicVariant.variant, TopicVariant.canonical_topic).filter(
+            TopicVariant.variant.in_(variants[i:i + 500])
+        ).all()
+        canonicals.update({variant: canonical for variant, canonical in rows})
+    return canonicals
+
+
+def create_canonical_topics(db: Session, topics: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert canonical topics (column dicts) in one executemany statement, skipping existing names."""
+    if topics:
+        db.execute(insert_ignore(db.get_bind().dialect.name, CanonicalTopic, ["name"]), topics)
+    if commit:
+        db.commit()
+    return len(topics)
+
+
+def create_topic_variants(db: Session, variants: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert topic variants (column dicts) in one executemany statement, skipping stored variants."""
+    if variants:
+        db.execute(insert_ignore(db.get_bind().dialect.name, TopicVariant, ["variant"]), variants)
+    if commit:
+        db.commit()
+    return len(variants)
@@ -1,7 +1,7 @@
 """Chat message repository."""
 from sqlalchemy.orm import Session
 from app.db.models import ChatMessage
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 
 def create_chat_message(
@@ -24,13 +24,33 @@ def create_chat_message(
     return message
 
 
-def get_conversation_messages(db: Session, conversation_id: str, limit: int = 50) -> List[ChatMessage]:
-    """Get conversation history, most recent first."""
-    return db.query(ChatMessage)\
-        .filter(ChatMessage.conversation_id == conversation_id)\
-        .order_by(ChatMessage.created_at.asc())\
-        .limit(limit)\
-        .all()
+def get_conversation_messages(
+    db: Session,
+    conversation_id: str,
+    limit: int = 50,
+    after_id: Optional[int] = None,
+    before_id: Optional[int] = None
+) -> List[ChatMessage]:
+    """
+    Get the most recent messages of a conversation, oldest first.
+    
+    Reads newest-first through idx_chat_conversation_created, so only the
+    returned rows are touched however long the conversation is.
+    
+    Args:
+        db: Database session
+        conversation_id: Conversation ID
+        limit: Maximum number of messages
+        after_id: Only messages with a larger ID
+        before_id: Only messages with a smaller ID
+    """
+    query = db.query(ChatMessage).filter(ChatMessage.conversation_id == conversation_id)
+    if after_id is not None:
+        query = query.filter(ChatMessage.id > after_id)
+    if before_id is not None:
+        query = query.filter(ChatMessage.id < before_id)
+    messages = query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(limit).all()
+    return messages[::-1]
 
 
 def get_conversation_messages_for_llm(db: Session, conversation_id: str, limit: int = 20) -> List[Dict[str, str]]:
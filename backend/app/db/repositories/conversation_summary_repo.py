@@ -0,0 +1,29 @@
+"""Conversation summary repository."""
+from sqlalchemy.orm import Session
+from app.db.models import ConversationSummary
+from typing import Optional
+
+
+def get_summary(db: Session, conversation_id: str) -> Optional[ConversationSummary]:
+    """Get the rolling summary of a conversation, if any."""
+    return db.get(ConversationSummary, conversation_id)
+
+
+def save_summary(
+    db: Session,
+    conversation_id: str,
+    summary: str,
+    covered_until_message_id: int,
+    message_count: int
+) -> ConversationSummary:
+    """Create or replace the rolling summary of a conversation."""
+    row = db.get(ConversationSummary, conversation_id)
+    if row is None:
+        row = ConversationSummary(conversation_id=conversation_id)
+        db.add(row)
+    row.summary = summary
+    row.covered_until_message_id = covered_until_message_id
+    row.message_count = message_count
+    db.commit()
+    db.refresh(row)
+    return row
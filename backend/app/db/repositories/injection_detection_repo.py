@@ -0,0 +1,45 @@
+"""Injection detection repository."""
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.db.models import InjectionDetection
+from typing import List, Dict, Any, Optional
+
+
+def build_detection_rows(
+    report: Dict[str, Any],
+    source_type: str,
+    source_id: Any,
+    conversation_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Build InjectionDetection rows for bulk insert from a sanitize_with_report result."""
+    return [
+        {
+            "source_type": source_type,
+            "source_id": str(source_id),
+            "conversation_id": conversation_id,
+            "pattern_id": match["pattern_id"],
+            "pattern": match["pattern"],
+            "matched_text": match["text"][:255],
+            "start_offset": match["start"],
+            "end_offset": match["end"],
+            "action": report["action"]
+        }
+        for match in report["matches"]
+    ]
+
+
+def create_detections(db: Session, detections: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert injection detections (column dicts) in one executemany statement."""
+    if detections:
+        db.execute(insert(InjectionDetection), detections)
+    if commit:
+        db.commit()
+    return len(detections)
+
+
+def get_detections_by_source(db: Session, source_type: str, source_id: Any) -> List[InjectionDetection]:
+    """Get the detections recorded for one job source or document."""
+    return db.query(InjectionDetection).filter(
+        InjectionDetection.source_type == source_type,
+        InjectionDetection.source_id == str(source_id)
+    ).order_by(InjectionDetection.start_offset).all()
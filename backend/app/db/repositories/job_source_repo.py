@@ -1,7 +1,8 @@
 """Job source repository."""
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.db.models import JobSource
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 
 
 def get_sources_by_conversation(db: Session, conversation_id: str) -> List[JobSource]:
@@ -9,9 +10,12 @@ def get_sources_by_conversation(db: Session, conversation_id: str) -> List[JobSo
     return db.query(JobSource).filter(JobSource.conversation_id == conversation_id).all()
 
 
-def get_source_by_hash(db: Session, content_hash: str) -> Optional[JobSource]:
-    """Get job source by content hash (for deduplication)."""
-    return db.query(JobSource).filter(JobSource.content_hash == content_hash).first()
+def get_source_by_hash(db: Session, content_hash: str, conversation_id: Optional[str] = None) -> Optional[JobSource]:
+    """Get job source by content hash (for deduplication), optionally within one conversation."""
+    query = db.query(JobSource).filter(JobSource.content_hash == content_hash)
+    if conversation_id:
+        query = query.filter(JobSource.conversation_id == conversation_id)
+    return query.first()
 
 
 def create_job_source(db: Session, job_source: JobSource) -> JobSource:
@@ -22,3 +26,25 @@ def create_job_source(db: Session, job_source: JobSource) -> JobSource:
     return job_source
 
 
+def create_job_sources(db: Session, job_sources: List[Dict[str, Any]], commit: bool = True) -> List[int]:
+    """Bulk insert job sources (column dicts). Returns the new IDs in input order."""
+    if not job_sources:
+        return []
+    result = db.execute(
+        insert(JobSource).returning(JobSource.id, sort_by_parameter_order=True),
+        job_sources
+    )
+    ids = list(result.scalars())
+    if commit:
+        db.commit()
+    return ids
+
+
+def get_sources_by_ids(db: Session, source_ids: List[int]) -> List[JobSource]:
+    """Get job sources by ID, in the order given."""
+    if not source_ids:
+        return []
+    by_id = {s.id: s for s in db.query(JobSource).filter(JobSource.id.in_(source_ids)).all()}
+    return [by_id[source_id] for source_id in source_ids if source_id in by_id]
+
+
@@ -1,7 +1,8 @@
 """Job topic repository."""
+from sqlalchemy import Select, and_, insert, select, func
 from sqlalchemy.orm import Session
-from app.db.models import JobTopic
-from typing import List
+from app.db.models import JobTopic, JobSource
+from typing import List, Dict, Any, Iterator
 
 
 def get_topics_by_conversation(db: Session, conversation_id: str) -> List[JobTopic]:
@@ -9,6 +10,144 @@ def get_topics_by_conversation(db: Session, conversation_id: str) -> List[JobTop
     return db.query(JobTopic).filter(JobTopic.conversation_id == conversation_id).all()
 
 
+def count_topics_query(conversation_id: str) -> Select:
+    """COUNT query behind count_topics_by_conversation."""
+    return select(func.count()).select_from(JobTopic).where(JobTopic.conversation_id == conversation_id)
+
+
+def count_topics_by_conversation(db: Session, conversation_id: str) -> int:
+    """Count job topics for a conversation without loading them."""
+    return db.execute(count_topics_query(conversation_id)).scalar_one()
+
+
+def _string_agg(dialect_name: str, column, separator: str):
+    """Dialect-specific string aggregate (string_agg on PostgreSQL, group_concat elsewhere)."""
+    if dialect_name == "postgresql":
+        return func.string_agg(column, separator)
+    return func.group_concat(column, separator)
+
+
+def topic_frequencies_query(dialect_name: str, conversation_id: str, sample_urls: int = 3) -> Select:
+    """GROUP BY query behind get_topic_frequencies, shared with the async repository."""
+    # One row per (topic, posting) first, ranked within the topic so only
+    # sample_urls postings per topic are joined for their URL
+    per_posting = (
+        select(
+            JobTopic.normalized_topic,
+            JobTopic.job_source_id,
+            func.count().label("mentions"),
+            func.sum(JobTopic.confidence).label("confidence_sum"),
+            func.count(JobTopic.confidence).label("confidence_count"),
+            func.row_number().over(
+                partition_by=JobTopic.normalized_topic, order_by=JobTopic.job_source_id
+            ).label("sample_rank"),
+        )
+        .where(JobTopic.conversation_id == conversation_id)
+        .group_by(JobTopic.normalized_topic, JobTopic.job_source_id)
+        .subquery()
+    )
+    sources = func.count().label("sources")
+    return (
+        select(
+            per_posting.c.normalized_topic,
+            func.sum(per_posting.c.mentions),
+            sources,
+            func.sum(per_posting.c.confidence_sum) / func.nullif(func.sum(per_posting.c.confidence_count), 0),
+            _string_agg(dialect_name, JobSource.url, "\n"),
+        )
+        .outerjoin(JobSource, and_(
+            JobSource.id == per_posting.c.job_source_id,
+            per_posting.c.sample_rank <= sample_urls,
+        ))
+        .group_by(per_posting.c.normalized_topic)
+        .order_by(sources.desc(), per_posting.c.normalized_topic)
+        .execution_options(yield_per=500)
+    )
+
+
+def topic_frequency_row(row) -> Dict[str, Any]:
+    """Turn a topic_frequencies_query row into its result dict."""
+    topic, mentions, source_count, avg_confidence, urls = row
+    return {
+        "normalized_topic": topic,
+        "mentions": mentions,
+        "sources": source_count,
+        "avg_confidence": float(avg_confidence) if avg_confidence is not None else None,
+        "sample_urls": urls.split("\n") if urls else [],
+    }
+
+
+def get_topic_frequencies(db: Session, conversation_id: str, sample_urls: int = 3) -> Iterator[Dict[str, Any]]:
+    """
+    Aggregate a conversation's job topics with GROUP BY, most widespread first.
+
+    Rows are streamed as plain tuples, so no JobTopic objects are built and
+    memory does not grow with the number of postings.
+
+    Args:
+        db: Database session
+        conversation_id: Conversation ID
+        sample_urls: Number of posting URLs to return per topic
+
+    Yields:
+        Dicts with normalized_topic, mentions, sources (distinct postings),
+        avg_confidence and sample_urls
+    """
+    query = topic_frequencies_query(db.get_bind().dialect.name, conversation_id, sample_urls)
+    for row in db.execute(query):
+        yield topic_frequency_row(row)
+
+
+def topic_postings_query(conversation_id: str) -> Select:
+    """Query behind iter_topic_postings, shared with the async repository."""
+    return (
+        select(
+            JobTopic.normalized_topic,
+            JobTopic.job_source_id,
+            JobSource.url,
+            func.coalesce(JobSource.date_posted, JobSource.fetched_at).label("posted_at"),
+            func.sum(func.coalesce(JobTopic.frequency_weight, 1.0)).label("frequency_weight"),
+            func.max(JobTopic.confidence).label("confidence"),
+        )
+        .join(JobSource, JobSource.id == JobTopic.job_source_id)
+        .where(JobTopic.conversation_id == conversation_id)
+        .group_by(JobTopic.normalized_topic, JobTopic.job_source_id, JobSource.url, JobSource.date_posted, JobSource.fetched_at)
+        .execution_options(yield_per=1000)
+    )
+
+
+def iter_topic_postings(db: Session, conversation_id: str) -> Iterator[Any]:
+    """
+    Stream one aggregated row per (topic, posting) of a conversation.
+
+    Yields:
+        Rows of (normalized_topic, job_source_id, url, posted_at, frequency_weight, confidence),
+        where posted_at is date_posted or else fetched_at, frequency_weight is
+        summed and confidence is the maximum
+    """
+    yield from db.execute(topic_postings_query(conversation_id))
+
+
+def topic_phrasings_query(conversation_id: str) -> Select:
+    """Query behind iter_topic_phrasings, shared with the async repository."""
+    return (
+        select(JobTopic.normalized_topic, JobTopic.raw_topic, func.count().label("mentions"))
+        .where(JobTopic.conversation_id == conversation_id, JobTopic.raw_topic.is_not(None))
+        .group_by(JobTopic.normalized_topic, JobTopic.raw_topic)
+        .execution_options(yield_per=1000)
+    )
+
+
+def iter_topic_phrasings(db: Session, conversation_id: str) -> Iterator[Any]:
+    """
+    Stream how often each raw phrasing was used per topic in a conversation.
+
+    Yields:
+        Rows of (normalized_topic, raw_topic, mentions)
+    """
+    yield from db.execute(topic_phrasings_query(conversation_id))
+
+
 def create_job_topic(db: Session, topic: JobTopic) -> JobTopic:
     """Create a new job topic."""
     db.add(topic)
@@ -17,3 +156,10 @@ def create_job_topic(db: Session, topic: JobTopic) -> JobTopic:
     return topic
 
 
+def create_job_topics(db: Session, topics: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert job topics (column dicts) in one executemany statement."""
+    if topics:
+        db.execute(insert(JobTopic), topics)
+    if commit:
+        db.commit()
+    return len(topics)
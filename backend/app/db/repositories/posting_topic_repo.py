@@ -0,0 +1,28 @@
+"""Posting topic repository (topics shared across conversations by content hash)."""
+from sqlalchemy.orm import Session
+from app.db.models import PostingTopic
+from app.db.upsert import insert_ignore
+from typing import List, Dict, Any
+
+
+def get_topics_by_hash(db: Session, content_hash: str) -> List[PostingTopic]:
+    """Get previously extracted topics for a posting's content hash."""
+    return db.query(PostingTopic).filter(PostingTopic.content_hash == content_hash).all()
+
+
+def create_posting_topic(db: Session, topic: PostingTopic) -> PostingTopic:
+    """Create a new posting topic."""
+    db.add(topic)
+    db.commit()
+    db.refresh(topic)
+    return topic
+
+
+def create_posting_topics(db: Session, topics: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert posting topics (column dicts), skipping topics the posting already has."""
+    if topics:
+        statement = insert_ignore(db.get_bind().dialect.name, PostingTopic, ["content_hash", "normalized_topic"])
+        db.execute(statement, topics)
+    if commit:
+        db.commit()
+    return len(topics)
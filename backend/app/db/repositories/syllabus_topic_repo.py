@@ -1,7 +1,8 @@
 """Syllabus topic repository."""
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.db.models import SyllabusTopic
-from typing import List
+from typing import List, Dict, Any
 
 
 def get_topics_by_document_id(db: Session, document_id: str) -> List[SyllabusTopic]:
@@ -17,3 +18,12 @@ def create_topic(db: Session, topic: SyllabusTopic) -> SyllabusTopic:
     return topic
 
 
+def create_topics(db: Session, topics: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert syllabus topics (column dicts) in one executemany statement."""
+    if topics:
+        db.execute(insert(SyllabusTopic), topics)
+    if commit:
+        db.commit()
+    return len(topics)
+
+
@@ -0,0 +1,28 @@
+"""Topic embedding repository."""
+from sqlalchemy.orm import Session
+from app.db.models import TopicEmbedding
+from app.db.upsert import insert_ignore
+from typing import Dict, Iterable, List, Any
+
+
+def get_embeddings(db: Session, backend: str, topics: Iterable[str]) -> Dict[str, bytes]:
+    """Get stored vectors (float32 bytes) for normalized topics, keyed by topic."""
+    topics = list(set(topics))
+    vectors = {}
+    # Chunked to stay under SQLite's bound-parameter limit
+    for i in range(0, len(topics), 500):
+        rows = db.query(TopicEmbedding.normalized_topic, TopicEmbedding.vector).filter(
+            TopicEmbedding.backend == backend,
+            TopicEmbedding.normalized_topic.in_(topics[i:i + 500])
+        ).all()
+        vectors.update({topic: vector for topic, vector in rows})
+    return vectors
+
+
+def create_embeddings(db: Session, embeddings: List[Dict[str, Any]], commit: bool = True) -> int:
+    """Bulk insert topic embeddings (column dicts) in one executemany statement, skipping ones already stored."""
+    if embeddings:
+        db.execute(insert_ignore(db.get_bind().dialect.name, TopicEmbedding, ["backend", "normalized_topic"]), embeddings)
+    if commit:
+        db.commit()
+    return len(embeddings)
@@ -1,14 +1,167 @@
 """Database session management."""
-from sqlalchemy import create_engine
+import threading
+from typing import Any, AsyncIterator, Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
+SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SQLITE_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+# Drivers used when database_url names only the database ("postgresql://...")
+SYNC_DRIVERS = {"postgresql": "psycopg"}
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+# Explicit drivers that already work with create_async_engine
+ASYNC_CAPABLE_DRIVERS = {"aiosqlite", "asyncpg", "psycopg"}
+
+
+def _with_driver(database_url: str, drivers: Dict[str, str], keep: Optional[set] = None) -> str:
+    """Pick the driver for a URL's backend unless it names one (in keep, if given) itself."""
+    if database_url.startswith("postgres://"):
+        database_url = "postgresql://" + database_url[len("postgres://"):]
+    url = make_url(database_url)
+    backend, driver = url.get_backend_name(), url.get_driver_name()
+    if backend not in drivers:
+        return database_url
+    if "+" in url.drivername and (keep is None or driver in keep):
+        return database_url
+    return url.set(drivername=f"{backend}+{drivers[backend]}").render_as_string(hide_password=False)
+
+
+def sync_database_url(database_url: Optional[str] = None) -> str:
+    """database_url for the sync engine (a bare postgresql:// uses psycopg)."""
+    return _with_driver(database_url or settings.database_url, SYNC_DRIVERS)
+
+
+def async_database_url(database_url: Optional[str] = None) -> str:
+    """database_url for the async engine (sqlite uses aiosqlite, postgresql uses asyncpg)."""
+    return _with_driver(database_url or settings.database_url, ASYNC_DRIVERS, ASYNC_CAPABLE_DRIVERS)
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and make_url(url).database in (None, "", ":memory:")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply the configured pragmas to every new SQLite connection."""
+    journal_mode = settings.sqlite_journal_mode.upper()
+    synchronous = settings.sqlite_synchronous.upper()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Unsupported sqlite_journal_mode: {settings.sqlite_journal_mode}")
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"Unsupported sqlite_synchronous: {settings.sqlite_synchronous}")
+
+    cursor = dbapi_connection.cursor()
+    try:
+        # busy_timeout first, so switching the journal mode waits out other writers too
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+        cursor.execute(f"PRAGMA synchronous = {synchronous}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size = -{int(settings.sqlite_cache_size_kb)}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size_mb) * 1024 * 1024}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    Create a SQLAlchemy engine tuned for the configured database.
+
+    SQLite file databases get WAL journaling, synchronous=NORMAL, a busy
+    timeout, a larger page cache and memory-mapped reads on every connection,
+    so readers never block the single writer and concurrent commits wait
+    instead of failing with "database is locked". The connection pool is
+    sized for the request threads plus the background job workers.
+
+    Args:
+        database_url: Database URL (defaults to settings.database_url)
+
+    Returns:
+        Engine instance
+    """
+    database_url = sync_database_url(database_url)
+    if not database_url.startswith("sqlite"):
+        return create_engine(
+            database_url,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_pre_ping=True
+        )
+
+    connect_args = {
+        "check_same_thread": False,
+        # sqlite3's own lock wait, in seconds; matches the busy_timeout pragma
+        "timeout": settings.sqlite_busy_timeout_ms / 1000,
+    }
+    if _is_memory_sqlite(database_url):
+        # An in-memory database lives in one connection, so keep the default pool
+        return create_engine(database_url, connect_args=connect_args)
+
+    db_engine = create_engine(
+        database_url,
+        connect_args=connect_args,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout
+    )
+    event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+def create_async_db_engine(database_url: Optional[str] = None) -> AsyncEngine:
+    """
+    Create an async engine for the same database as create_db_engine.
+
+    Uses aiosqlite for SQLite (with the same connection pragmas) and asyncpg
+    for PostgreSQL; the driver package is only needed once this is called.
+
+    Args:
+        database_url: Database URL (defaults to settings.database_url)
+
+    Returns:
+        AsyncEngine instance
+    """
+    database_url = async_database_url(database_url)
+    if not database_url.startswith("sqlite"):
+        return create_async_engine(
+            database_url,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_pre_ping=True
+        )
+    if _is_memory_sqlite(database_url):
+        return create_async_engine(database_url)
+
+    db_engine = create_async_engine(
+        database_url,
+        connect_args={"timeout": settings.sqlite_busy_timeout_ms / 1000},
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout
+    )
+    event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+def get_db_pool_stats(db_engine: Optional[Engine] = None) -> Dict[str, Any]:
+    """Connection pool statistics of the engine."""
+    pool = (db_engine or engine).pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    return stats
+
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+engine = create_db_engine()
 
 # SessionLocal factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -18,8 +171,10 @@ Base = declarative_base()
 
 
 def init_db():
-    """Initialize database by creating all tables."""
+    """Initialize database by creating all tables and applying pending migrations."""
+    from app.db.migrations import run_migrations
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
 
 
 def get_db():
@@ -31,3 +186,43 @@ def get_db():
         db.close()
 
 
+# Async engine and session factory, created on first use so the async driver stays optional
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncEngine:
+    """Get the process-wide async engine, creating it on first use."""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                db_engine = create_async_db_engine()
+                # expire_on_commit=False: attributes stay readable after commit without another await
+                _async_session_factory = async_sessionmaker(
+                    db_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+                )
+                _async_engine = db_engine
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """Create a new AsyncSession bound to the async engine."""
+    get_async_engine()
+    return _async_session_factory()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency for FastAPI to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's pooled connections (aiosqlite keeps a thread per connection)."""
+    global _async_engine, _async_session_factory
+    with _async_engine_lock:
+        db_engine, _async_engine, _async_session_factory = _async_engine, None, None
+    if db_engine is not None:
+        await db_engine.dispose()
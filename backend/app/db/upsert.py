@@ -0,0 +1,27 @@
+"""Dialect-aware INSERT statements that skip rows conflicting with a unique constraint."""
+from typing import Sequence
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql.dml import Insert
+
+
+def insert_ignore(dialect_name: str, model, index_elements: Sequence[str]) -> Insert:
+    """
+    INSERT into model's table that silently skips rows violating the unique index on index_elements.
+    
+    Uses ON CONFLICT DO NOTHING on PostgreSQL and SQLite, so concurrent writers
+    inserting the same rows do not fail and do not create duplicates.
+    
+    Args:
+        dialect_name: Name of the session's dialect (db.get_bind().dialect.name)
+        model: Mapped class to insert into
+        index_elements: Columns of the unique index that decides a conflict
+        
+    Returns:
+        Insert statement to execute with a list of column dicts
+    """
+    if dialect_name == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing(index_elements=list(index_elements))
+    if dialect_name == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing(index_elements=list(index_elements))
+    return insert(model).prefix_with("IGNORE")
@@ -1,8 +1,14 @@
 """FastAPI main application."""
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import routes_pdf, routes_search, routes_analyze, routes_chat
-from app.db.session import init_db
+from app.api import routes_pdf, routes_search, routes_analyze, routes_chat, routes_jobs
+from app.db.session import init_db, get_db_pool_stats, dispose_async_engine
+from app.services.job_service import resume_background_jobs
+from app.core.llm import get_pool_stats
+from app.core.llm_cache import get_llm_cache
+from app.tools.fetch_cache import get_fetch_cache
+from app.tools.pdf_extract_tool import shutdown_process_pool
 
 app = FastAPI(
     title="Syllabus Gap Analyzer API",
@@ -24,12 +30,21 @@ app.include_router(routes_pdf.router)
 app.include_router(routes_search.router)
 app.include_router(routes_analyze.router)
 app.include_router(routes_chat.router)
+app.include_router(routes_jobs.router)
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup."""
+    """Initialize database and requeue unfinished background jobs on startup."""
     init_db()
+    resume_background_jobs()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled async database connections and stop PDF extraction worker processes."""
+    await dispose_async_engine()
+    await run_in_threadpool(shutdown_process_pool)
 
 
 @app.get("/")
@@ -42,7 +57,8 @@ async def root():
             "pdf": "/pdf",
             "search": "/search",
             "analyze": "/analyze",
-            "chat": "/chat"
+            "chat": "/chat",
+            "jobs": "/jobs"
         }
     }
 
@@ -53,3 +69,14 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/stats")
+async def stats():
+    """Runtime statistics (database and LLM client pools, LLM response and page fetch caches)."""
+    return {
+        "db_pool": get_db_pool_stats(),
+        "llm_pool": get_pool_stats(),
+        "llm_cache": get_llm_cache().stats(),
+        "fetch_cache": get_fetch_cache().stats(),
+    }
+
+
@@ -0,0 +1,16 @@
+"""Background job schemas."""
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+
+class JobResponse(BaseModel):
+    """Response schema for /jobs endpoints."""
+    job_id: str = Field(..., description="Background job ID")
+    kind: str = Field(..., description="Job kind: 'pdf', 'search' or 'analyze'")
+    status: str = Field(..., description="Job status: 'queued', 'running', 'completed' or 'failed'")
+    progress: Dict[str, Any] = Field(default_factory=dict, description="Current stage and progress counters")
+    result: Optional[Dict[str, Any]] = Field(None, description="Final result once completed")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    created_at: datetime = Field(..., description="When the job was submitted")
+    updated_at: datetime = Field(..., description="Last status or progress update")
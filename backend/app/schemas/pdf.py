@@ -1,5 +1,6 @@
 """PDF-related schemas."""
 from pydantic import BaseModel, Field
+from typing import Optional
 
 
 class PDFResponse(BaseModel):
@@ -7,5 +8,6 @@ class PDFResponse(BaseModel):
     document_id: str = Field(..., description="Unique document ID")
     extracted_text_preview: str = Field(..., description="Preview of extracted text (first 500 chars)")
     topic_extract_status: str = Field(..., description="Status of topic extraction: 'pending', 'completed', 'failed'")
+    job_id: Optional[str] = Field(None, description="Background job extracting topics when status is 'pending'")
 
 
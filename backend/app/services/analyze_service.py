@@ -1,86 +1,170 @@
 """Analysis service for generating gap analysis tables."""
 import json
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from app.db.models import SyllabusTopic, JobTopic, AnalysisRun, AnalysisTableARow, AnalysisTableBRow
+from app.db.models import SyllabusTopic, AnalysisRun, AnalysisTableARow, AnalysisTableBRow
 from app.db.repositories.syllabus_topic_repo import get_topics_by_document_id
-from app.db.repositories.job_topic_repo import get_topics_by_conversation as get_job_topics_by_conversation_id
+from app.db.repositories.job_topic_repo import iter_topic_postings, iter_topic_phrasings
 from app.db.repositories.analysis_repo import (
-    create_analysis_run, create_table_a_row, create_table_b_row, get_table_a_rows, get_table_b_rows
+    create_analysis_run, create_table_a_rows, create_table_b_rows, get_table_a_rows, get_table_b_rows
 )
-from prompts.prompts import ANALYSIS_PROMPT
+from prompts.prompts import ANALYSIS_KEPT_PROSE_PROMPT, ANALYSIS_MISSING_PROSE_PROMPT, PROMPT_VERSION
 from app.core.config import settings
-from langchain_openai import AzureChatOpenAI
+from app.core.llm import get_llm_client, invoke_llm
+from app.core.progress import ProgressCallback, report
+from app.services.topic_matcher import match_topics
+from app.services.topic_vectors import similarity_matrix
+from app.services.topic_canonicalizer import get_topic_resolver
 from datetime import datetime
 
 
-def get_llm_client():
-    """Get Azure OpenAI LLM client."""
-    return AzureChatOpenAI(
-        azure_endpoint=settings.azure_openai_endpoint,
-        api_key=settings.azure_openai_api_key,
-        api_version=settings.api_version,
-        azure_deployment=settings.azure_openai_model,
-        temperature=0.1,
-    )
+def _parse_json_array(response_text: str) -> List[Dict[str, Any]]:
+    """Parse a JSON array from an LLM response, tolerating code fences; raises ValueError if there is none."""
+    if "```json" in response_text:
+        json_start = response_text.find("```json") + 7
+        json_end = response_text.find("```", json_start)
+        response_text = response_text[json_start:json_end].strip()
+    elif "```" in response_text:
+        json_start = response_text.find("```") + 3
+        json_end = response_text.find("```", json_start)
+        response_text = response_text[json_start:json_end].strip()
+    
+    start_idx, end_idx = response_text.find("["), response_text.rfind("]")
+    if start_idx == -1 or end_idx < start_idx:
+        raise ValueError("No JSON array in response")
+    result = json.loads(response_text[start_idx:end_idx + 1])
+    return [item for item in result if isinstance(item, dict)] if isinstance(result, list) else []
 
 
-def generate_tables(document_id: str, conversation_id: str, db: Session) -> Dict[str, Any]:
-    """Generate Table A and Table B."""
-    # Load syllabus topics
-    syllabus_topics = get_topics_by_document_id(db, document_id)
-    syllabus_list = [t.topic_name for t in syllabus_topics]
+def write_prose(
+    prompt_template: str,
+    prompt_name: str,
+    items: List[Dict[str, Any]],
+    modules: List[str],
+    use_cache: bool = True
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Have the LLM write the prose fields for table rows in small concurrent batches.
     
-    # Load job topics
-    job_topics = get_job_topics_by_conversation_id(db, conversation_id)
-    
-    # Get unique normalized topics with frequency
-    topic_freq = {}
-    for job_topic in job_topics:
-        normalized = job_topic.normalized_topic
-        topic_freq[normalized] = topic_freq.get(normalized, 0) + 1
+    Args:
+        prompt_template: ANALYSIS_KEPT_PROSE_PROMPT or ANALYSIS_MISSING_PROSE_PROMPT
+        prompt_name: Prompt name for the response cache
+        items: Prompt items, each with an "id"
+        modules: Syllabus modules to choose insertion points from
+        use_cache: Set to False to bypass the LLM response cache
+        
+    Returns:
+        Dict of item id -> prose fields; failed batches are simply missing
+    """
+    batch_size = max(1, settings.analysis_prose_batch_size)
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    if not batches:
+        return {}
+    llm = get_llm_client()
     
-    job_topics_list = list(topic_freq.keys())
+    def run_batch(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        prompt = prompt_template.replace("{modules}", json.dumps(modules)).replace("{items}", json.dumps(batch, indent=2))
+        try:
+            response = invoke_llm(llm, prompt, prompt_name, use_cache=use_cache, validate=_parse_json_array)
+            return _parse_json_array(response.content)
+        except Exception as e:
+            print(f"Error writing analysis prose: {str(e)}")
+            return []
     
-    # Get job source URLs for references
-    from app.db.repositories.job_source_repo import get_sources_by_conversation
-    job_sources = get_sources_by_conversation(db, conversation_id)
-    job_urls = [s.url for s in job_sources]
+    prose = {}
+    with ThreadPoolExecutor(max_workers=min(len(batches), settings.llm_max_concurrency)) as executor:
+        for results in executor.map(run_batch, batches):
+            for item in results:
+                if isinstance(item.get("id"), int):
+                    prose[item["id"]] = item
+    return prose
+
+
+def generate_tables(
+    document_id: str,
+    conversation_id: str,
+    db: Session,
+    use_cache: bool = True,
+    progress: Optional[ProgressCallback] = None
+) -> Dict[str, Any]:
+    """
+    Generate Table A and Table B.
     
-    # Prepare prompt
-    syllabus_topics_str = json.dumps(syllabus_list, indent=2)
-    job_topics_str = json.dumps(list(topic_freq.items())[:50], indent=2)  # Limit to top 50
-    urls_str = json.dumps(job_urls[:20], indent=2)  # Limit URLs
+    Counts, relevance scores, priorities and references come from the local
+    topic matcher. The LLM only writes the prose fields, in small batches; if a
+    batch fails, its rows fall back to phrasings taken from the postings.
+    """
+    # Load syllabus topics; job topics arrive pre-aggregated per topic and posting
+    syllabus_topics = get_topics_by_document_id(db, document_id)
     
-    prompt = ANALYSIS_PROMPT.replace("{syllabus_topics}", syllabus_topics_str).replace("{job_topics}", job_topics_str).replace("{job_source_urls}", urls_str)
+    # Syllabus names and keywords go through the same canonical dictionary as job topics
+    canonical = get_topic_resolver().resolve(
+        [t.topic_name for t in syllabus_topics]
+        + [k for t in syllabus_topics for k in (t.keywords_json or []) if isinstance(k, str)]
+    )
+    matches = match_topics(
+        syllabus_topics,
+        iter_topic_postings(db, conversation_id),
+        iter_topic_phrasings(db, conversation_id),
+        vector_similarity=lambda syllabus_names, job_names: similarity_matrix(db, syllabus_names, job_names),
+        canonical=canonical
+    )
+    total = matches["total_postings"]
+    table_a, table_b = matches["table_a"], matches["table_b"]
+    report(progress, "analyze", syllabus_topics=len(syllabus_topics), job_topics=matches["job_topic_count"])
     
-    # Call LLM
-    llm = get_llm_client()
+    kept_prose = write_prose(
+        ANALYSIS_KEPT_PROSE_PROMPT, "ANALYSIS_KEPT_PROSE_PROMPT",
+        [
+            {"id": i, "topic": row["syllabus_topic"], "job_postings": row["evidence_job_count"],
+             "total_postings": total, "industry_phrasings": row["phrasings"]}
+            for i, row in enumerate(table_a)
+        ],
+        matches["modules"], use_cache
+    )
+    missing_prose = write_prose(
+        ANALYSIS_MISSING_PROSE_PROMPT, "ANALYSIS_MISSING_PROSE_PROMPT",
+        [
+            {"id": i, "topic": row["missing_topic"], "job_postings": row["frequency_in_jobs"],
+             "total_postings": total, "industry_phrasings": row["phrasings"]}
+            for i, row in enumerate(table_b)
+        ],
+        matches["modules"], use_cache
+    )
     
-    try:
-        response = llm.invoke(prompt)
-        response_text = response.content
-        
-        # Extract JSON
-        if "```json" in response_text:
-            json_start = response_text.find("```json") + 7
-            json_end = response_text.find("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        elif "```" in response_text:
-            json_start = response_text.find("```") + 3
-            json_end = response_text.find("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        
-        result = json.loads(response_text)
-        
-        return {
-            "table_a": result.get("table_a", []),
-            "table_b": result.get("table_b", [])
-        }
-        
-    except Exception as e:
-        print(f"Error generating tables: {str(e)}")
-        return {"table_a": [], "table_b": []}
+    return {
+        "table_a": [
+            {
+                "syllabus_topic": row["syllabus_topic"],
+                "industry_relevance_score": row["industry_relevance_score"],
+                "evidence_job_count": row["evidence_job_count"],
+                "example_industry_phrasing": str(
+                    kept_prose.get(i, {}).get("example_industry_phrasing") or ", ".join(row["phrasings"][:2])
+                ),
+                "notes": str(
+                    kept_prose.get(i, {}).get("notes")
+                    or f"Mentioned in {row['evidence_job_count']} of {total} job postings"
+                ),
+                "references": row["references"],
+            }
+            for i, row in enumerate(table_a)
+        ],
+        "table_b": [
+            {
+                "missing_topic": row["missing_topic"],
+                "frequency_in_jobs": row["frequency_in_jobs"],
+                "priority": row["priority"],
+                "suggested_syllabus_insertion": str(missing_prose.get(i, {}).get("suggested_syllabus_insertion") or ""),
+                "rationale": str(
+                    missing_prose.get(i, {}).get("rationale")
+                    or f"Appears in {row['frequency_in_jobs']} of {total} job postings but not in the syllabus"
+                ),
+                "references": row["references"],
+            }
+            for i, row in enumerate(table_b)
+        ],
+    }
 
 
 def store_analysis(document_id: str, conversation_id: str, tables: Dict[str, Any], db: Session) -> int:
@@ -90,37 +174,39 @@ def store_analysis(document_id: str, conversation_id: str, tables: Dict[str, Any
         conversation_id=conversation_id,
         document_id=document_id,
         model_version=settings.azure_openai_model,
-        prompt_version="1.0",
+        prompt_version=PROMPT_VERSION,
         tool_versions={"langchain": "1.1.3"}
     )
     analysis_run = create_analysis_run(db, analysis_run)
     
-    # Store Table A rows
-    for row_data in tables.get("table_a", []):
-        row = AnalysisTableARow(
-            analysis_run_id=analysis_run.id,
-            syllabus_topic=row_data.get("syllabus_topic", ""),
-            industry_relevance_score=row_data.get("industry_relevance_score", 0),
-            evidence_job_count=row_data.get("evidence_job_count", 0),
-            example_industry_phrasing=row_data.get("example_industry_phrasing", ""),
-            notes=row_data.get("notes"),
-            references_json=row_data.get("references", [])
-        )
-        create_table_a_row(db, row)
-    
-    # Store Table B rows
-    for row_data in tables.get("table_b", []):
-        priority = row_data.get("priority", "Medium")
-        row = AnalysisTableBRow(
-            analysis_run_id=analysis_run.id,
-            missing_topic=row_data.get("missing_topic", ""),
-            frequency_in_jobs=row_data.get("frequency_in_jobs", 0),
-            priority=priority,
-            suggested_syllabus_insertion=row_data.get("suggested_syllabus_insertion", ""),
-            rationale=row_data.get("rationale", ""),
-            references_json=row_data.get("references", [])
-        )
-        create_table_b_row(db, row)
+    # Store Table A and Table B rows in one transaction
+    table_a_rows = [
+        {
+            "analysis_run_id": analysis_run.id,
+            "syllabus_topic": row_data.get("syllabus_topic", ""),
+            "industry_relevance_score": row_data.get("industry_relevance_score", 0),
+            "evidence_job_count": row_data.get("evidence_job_count", 0),
+            "example_industry_phrasing": row_data.get("example_industry_phrasing", ""),
+            "notes": row_data.get("notes"),
+            "references_json": row_data.get("references", [])
+        }
+        for row_data in tables.get("table_a", [])
+    ]
+    table_b_rows = [
+        {
+            "analysis_run_id": analysis_run.id,
+            "missing_topic": row_data.get("missing_topic", ""),
+            "frequency_in_jobs": row_data.get("frequency_in_jobs", 0),
+            "priority": row_data.get("priority", "Medium"),
+            "suggested_syllabus_insertion": row_data.get("suggested_syllabus_insertion", ""),
+            "rationale": row_data.get("rationale", ""),
+            "references_json": row_data.get("references", [])
+        }
+        for row_data in tables.get("table_b", [])
+    ]
+    create_table_a_rows(db, table_a_rows, commit=False)
+    create_table_b_rows(db, table_b_rows, commit=False)
+    db.commit()
     
     return analysis_run.id
 
@@ -0,0 +1,146 @@
+"""Bounded chat history: a token-budgeted window of recent turns plus a rolling summary of older ones."""
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.llm import get_llm_client, invoke_llm
+from app.db.repositories.chat_message_repo import get_conversation_messages
+from app.db.repositories.conversation_summary_repo import get_summary, save_summary
+from prompts.prompts import CHAT_SUMMARY_PROMPT
+
+logger = logging.getLogger(__name__)
+
+# Tokens the chat format adds per message (role and separators)
+MESSAGE_TOKEN_OVERHEAD = 4
+# Characters of one message passed to the summary prompt
+SUMMARY_MESSAGE_MAX_CHARS = 2000
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """tiktoken encoding of the chat model, or None if tiktoken or its data files are unavailable."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+                    try:
+                        _encoding = tiktoken.encoding_for_model(settings.azure_openai_model)
+                    except KeyError:
+                        _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    logger.warning(f"tiktoken unavailable ({e}); estimating tokens as characters / 4")
+                    _encoding = None
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens of text with the model's tokenizer, or estimate them if it is unavailable."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _tail_within(items: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+    """Newest items whose tokens add up to at most budget, oldest first."""
+    kept = []
+    used = 0
+    for item in reversed(items):
+        if used + item["tokens"] > budget:
+            break
+        kept.append(item)
+        used += item["tokens"]
+    return kept[::-1]
+
+
+def _update_summary(summary: Optional[str], items: List[Dict[str, Any]]) -> Optional[str]:
+    """Fold messages into the rolling summary with one LLM call; None if the call fails."""
+    messages = [
+        {"role": item["role"], "content": item["content"][:SUMMARY_MESSAGE_MAX_CHARS]}
+        for item in items
+    ]
+    prompt = CHAT_SUMMARY_PROMPT\
+        .replace("{max_words}", str(settings.chat_summary_max_words))\
+        .replace("{summary}", summary or "(none yet)")\
+        .replace("{messages}", json.dumps(messages, indent=2))
+    try:
+        response = invoke_llm(get_llm_client(), prompt, "CHAT_SUMMARY_PROMPT")
+        return response.content.strip() or None
+    except Exception as e:
+        logger.error(f"Error updating conversation summary: {e}")
+        return None
+
+
+def build_history_window(db: Session, conversation_id: str, before_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Build the past turns sent to the LLM for a conversation, within a token budget.
+
+    Only messages newer than the stored summary are read, at most
+    chat_history_max_messages of them and newest first through the
+    (conversation_id, created_at) index. While they and the summary fit
+    chat_history_token_budget they are all kept. Once they do not, the oldest
+    are folded into the summary with one LLM call, keeping the newest
+    chat_history_keep_ratio of the budget verbatim, so the next turns fit
+    again without another summary call. If that call fails, the oldest
+    messages are simply dropped for this turn.
+
+    Args:
+        db: Database session
+        conversation_id: Conversation ID
+        before_id: Only messages older than this ChatMessage ID (the current turn)
+
+    Returns:
+        Dict with summary (str or None), messages (role/content dicts, oldest
+        first), tokens (estimated total) and summarized (messages folded in this call)
+    """
+    budget = settings.chat_history_token_budget
+    summary_row = get_summary(db, conversation_id)
+    summary = summary_row.summary if summary_row else None
+    rows = get_conversation_messages(
+        db, conversation_id,
+        limit=settings.chat_history_max_messages,
+        after_id=summary_row.covered_until_message_id if summary_row else None,
+        before_id=before_id
+    )
+    items = [
+        {"id": row.id, "role": row.role, "content": row.content, "tokens": count_tokens(row.content) + MESSAGE_TOKEN_OVERHEAD}
+        for row in rows
+        if row.role in ("user", "assistant") and row.content
+    ]
+
+    summarized = 0
+    summary_tokens = count_tokens(summary)
+    if summary_tokens + sum(item["tokens"] for item in items) > budget:
+        kept = _tail_within(items, int(budget * settings.chat_history_keep_ratio))
+        folded = items[:len(items) - len(kept)]
+        new_summary = _update_summary(summary, folded) if folded else None
+        if new_summary:
+            summary_row = save_summary(
+                db, conversation_id, new_summary,
+                covered_until_message_id=folded[-1]["id"],
+                message_count=(summary_row.message_count if summary_row else 0) + len(folded)
+            )
+            summary, summary_tokens, summarized = new_summary, count_tokens(new_summary), len(folded)
+        else:
+            kept = _tail_within(items, max(0, budget - summary_tokens))
+        items = kept
+
+    tokens = summary_tokens + sum(item["tokens"] for item in items)
+    if summarized:
+        logger.info(f"Summarized {summarized} older messages of conversation {conversation_id[:8]}...")
+    return {
+        "summary": summary,
+        "messages": [{"role": item["role"], "content": item["content"]} for item in items],
+        "tokens": tokens,
+        "summarized": summarized,
+    }
@@ -1,46 +1,57 @@
 """Chat service with tool-using agent and multi-turn conversation support."""
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Iterator
+from app.core.progress import ProgressCallback, report, describe
+from app.core.llm import get_llm_client, invoke_llm, stream_llm
 from sqlalchemy.orm import Session
 from app.services.search_service import parse_constraints, collect_sources, verify_and_store
 from app.services.analyze_service import generate_tables, store_analysis
 from app.schemas.search import SearchRequest, SearchResponse
 from app.schemas.analyze import AnalyzeRequest
 from app.db.repositories.conversation_repo import get_or_create_conversation
-from app.db.repositories.chat_message_repo import (
-    create_chat_message, 
-    get_conversation_messages_for_llm
-)
+from app.db.repositories.chat_message_repo import create_chat_message
+from app.services.chat_history import build_history_window
 from app.db.session import SessionLocal
 from app.core.config import settings
-from langchain_openai import AzureChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from prompts.prompts import CHAT_SYSTEM_PROMPT
 import logging
+import queue
+import threading
 
 logger = logging.getLogger(__name__)
 
 
-def get_llm_client():
-    """Get Azure OpenAI LLM client."""
-    return AzureChatOpenAI(
-        azure_endpoint=settings.azure_openai_endpoint,
-        api_key=settings.azure_openai_api_key,
-        api_version=settings.api_version,
-        azure_deployment=settings.azure_openai_model,
-        temperature=0.7,
-    )
+class ChatStreamInterrupted(Exception):
+    """The LLM stream failed after part of the reply was sent; carries the response with the partial text."""
+
+    def __init__(self, detail: str, response: Dict[str, Any]):
+        super().__init__(detail)
+        self.response = response
 
 
-def handle_chat_message(message: str, conversation_id: Optional[str], document_id: Optional[str], db: Session) -> Dict[str, Any]:
+def handle_chat_message(
+    message: str,
+    conversation_id: Optional[str],
+    document_id: Optional[str],
+    db: Session,
+    progress: Optional[ProgressCallback] = None,
+    on_token: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
     """
     Handle chat message with multi-turn conversation support.
     Maintains context and can call tools (search/analyze) when needed.
+    
+    When on_token is given, the LLM reply is streamed and each text delta is
+    passed to it; progress receives tool progress events. If the stream fails
+    after deltas were sent, the partial reply is stored and ChatStreamInterrupted
+    is raised instead of answering with the fallback text.
     """
     message_lower = message.lower()
     
     # Get or create conversation
     conv = get_or_create_conversation(db, conversation_id)
     conversation_id = conv.conversation_id
+    report(progress, "conversation", conversation_id=conversation_id)
     
     response = {
         "response": "",
@@ -50,10 +61,8 @@ def handle_chat_message(message: str, conversation_id: Optional[str], document_i
         "tables": None
     }
     
-    # Get conversation history (before storing current message)
-    history = get_conversation_messages_for_llm(db, conversation_id, limit=20)
-    
     # Store user message directly in main session
+    user_msg_id = None
     try:
         from app.db.models import ChatMessage
         user_msg = ChatMessage(
@@ -65,6 +74,7 @@ def handle_chat_message(message: str, conversation_id: Optional[str], document_i
         db.add(user_msg)
         db.commit()
         db.refresh(user_msg)
+        user_msg_id = user_msg.id
         logger.info(f"Stored user message ID {user_msg.id} for conversation {conversation_id[:8]}...")
     except Exception as e:
         logger.error(f"Error storing user message: {e}", exc_info=True)
@@ -78,7 +88,7 @@ def handle_chat_message(message: str, conversation_id: Optional[str], document_i
     if is_search_request:
         # Call search
         search_req = SearchRequest(instruction=message, conversation_id=conversation_id)
-        search_result = handle_search(search_req, db)
+        search_result = handle_search(search_req, db, progress)
         response_text = f"I found {search_result.results_count} job descriptions. You can now ask me to analyze the syllabus against these jobs."
         response["response"] = response_text
         response["tool_calls"] = [{"tool": "search", "status": "completed"}]
@@ -124,7 +134,7 @@ def handle_chat_message(message: str, conversation_id: Optional[str], document_i
         
         # Call analyze
         analyze_req = AnalyzeRequest(conversation_id=conversation_id, document_id=document_id)
-        analyze_result = handle_analyze(analyze_req, db)
+        analyze_result = handle_analyze(analyze_req, db, progress)
         
         response_text = "Analysis complete! Here are the results:"
         response["response"] = response_text
@@ -153,18 +163,25 @@ def handle_chat_message(message: str, conversation_id: Optional[str], document_i
         return response
     
     # Use LLM for general conversation with history
+    streamed = []
     try:
-        llm = get_llm_client()
+        llm = get_llm_client(temperature=0.7)
         
         # Build system prompt with document context if available
         system_prompt = CHAT_SYSTEM_PROMPT
         if document_id:
             # Add document context to system prompt
-            from app.db.repositories.document_repo import get_document
-            doc = get_document(db, document_id)
+            from app.db.repositories.document_repo import get_document_by_id
+            doc = get_document_by_id(db, document_id)
             if doc:
                 system_prompt += f"\n\nNOTE: The user has uploaded a syllabus PDF (Document ID: {document_id[:8]}...). Topics have been extracted from this document. You can reference this document when answering questions about the syllabus or topics."
         
+        # Past turns (before the current message) within the token budget, older ones summarized
+        window = build_history_window(db, conversation_id, before_id=user_msg_id)
+        history = window["messages"]
+        if window["summary"]:
+            system_prompt += f"\n\nSummary of the earlier conversation:\n{window['summary']}"
+        
         # Build messages for LLM using langchain message format
         langchain_messages = [SystemMessage(content=system_prompt)]
         
@@ -178,11 +195,20 @@ def handle_chat_message(message: str, conversation_id: Optional[str], document_i
         # Add current user message
         langchain_messages.append(HumanMessage(content=message))
         
-        logger.info(f"Calling LLM with {len(langchain_messages)} messages (history: {len(history)})")
+        logger.info(
+            f"Calling LLM with {len(langchain_messages)} messages "
+            f"(history: {len(history)}, ~{window['tokens']} tokens, summary: {bool(window['summary'])})"
+        )
         
-        # Get response from LLM
-        llm_response = llm.invoke(langchain_messages)
-        response_text = llm_response.content
+        # Get response from LLM, streaming deltas when requested
+        if on_token:
+            for delta in stream_llm(llm, langchain_messages):
+                streamed.append(delta)
+                on_token(delta)
+            response_text = "".join(streamed)
+        else:
+            llm_response = invoke_llm(llm, langchain_messages)
+            response_text = llm_response.content
         
         logger.info(f"LLM response received: {len(response_text)} chars")
         
@@ -209,6 +235,25 @@ def handle_chat_message(message: str, conversation_id: Optional[str], document_i
         logger.error(f"Error in LLM chat: {str(e)}", exc_info=True)
         import traceback
         logger.error(traceback.format_exc())
+        if streamed:
+            # The client already shows these deltas; keep them rather than replacing them with the fallback
+            response_text = "".join(streamed)
+            response["response"] = response_text
+            try:
+                from app.db.models import ChatMessage
+                assistant_msg = ChatMessage(
+                    conversation_id=conversation_id,
+                    role="assistant",
+                    content=response_text,
+                    metadata_json={"interrupted": True, "error": str(e)}
+                )
+                db.add(assistant_msg)
+                db.commit()
+                logger.info(f"Stored partial assistant message ID {assistant_msg.id} for conversation {conversation_id[:8]}...")
+            except Exception as e2:
+                logger.error(f"Error storing partial message: {e2}", exc_info=True)
+                db.rollback()
+            raise ChatStreamInterrupted(str(e), response) from e
         # Fallback response
         response_text = "I can help you:\n1. Search for job descriptions\n2. Analyze syllabus gaps\n\nWhat would you like to do?"
         response["response"] = response_text
@@ -231,7 +276,51 @@ def handle_chat_message(message: str, conversation_id: Optional[str], document_i
     return response
 
 
-def handle_search(search_req: SearchRequest, db: Session) -> SearchResponse:
+def stream_chat_message(message: str, conversation_id: Optional[str], document_id: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Handle a chat message on a worker thread and yield its events as they happen.
+    
+    Events are dicts with "event" and "data" keys:
+    - progress: tool progress, with a human-readable "message"
+    - token: a text delta of the assistant reply
+    - done: the final response (same fields as handle_chat_message)
+    - error: the turn failed; if reply tokens were already sent, it also carries
+      the response fields with the partial reply and "partial": true
+    """
+    events: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+    
+    def progress(stage: str, info: Dict[str, Any]) -> None:
+        events.put({"event": "progress", "data": {"stage": stage, "message": describe(stage, info), **info}})
+    
+    def on_token(delta: str) -> None:
+        events.put({"event": "token", "data": {"delta": delta}})
+    
+    def run() -> None:
+        db = SessionLocal()
+        try:
+            result = handle_chat_message(message, conversation_id, document_id, db, progress=progress, on_token=on_token)
+            db.commit()
+            events.put({"event": "done", "data": result})
+        except ChatStreamInterrupted as e:
+            logger.error(f"Streamed chat reply interrupted: {e}")
+            events.put({"event": "error", "data": {**e.response, "detail": f"Error in chat: {str(e)}", "partial": True}})
+        except Exception as e:
+            logger.error(f"Error in streamed chat: {e}", exc_info=True)
+            db.rollback()
+            events.put({"event": "error", "data": {"detail": f"Error in chat: {str(e)}"}})
+        finally:
+            db.close()
+            events.put(None)
+    
+    threading.Thread(target=run, name="chat-stream", daemon=True).start()
+    while True:
+        event = events.get()
+        if event is None:
+            break
+        yield event
+
+
+def handle_search(search_req: SearchRequest, db: Session, progress: Optional[ProgressCallback] = None) -> SearchResponse:
     """Handle search request."""
     # Parse constraints
     parsed = parse_constraints(search_req.instruction)
@@ -241,10 +330,16 @@ def handle_search(search_req: SearchRequest, db: Session) -> SearchResponse:
     conversation_id = conv.conversation_id
     
     # Collect sources
-    sources = collect_sources(parsed, db, conversation_id)
+    sources = collect_sources(parsed, db, conversation_id, progress)
+    report(
+        progress, "sources_collected",
+        conversation_id=conversation_id,
+        results_count=len(sources),
+        sources_sample=[{"url": s.url, "title": s.title} for s in sources[:3]]
+    )
     
     # Verify and store
-    verified, count = verify_and_store(sources, parsed, db, conversation_id)
+    verified, count = verify_and_store(sources, parsed, db, conversation_id, progress)
     
     # Update conversation
     from app.db.repositories.conversation_repo import update_conversation
@@ -259,14 +354,15 @@ def handle_search(search_req: SearchRequest, db: Session) -> SearchResponse:
     )
 
 
-def handle_analyze(analyze_req: AnalyzeRequest, db: Session):
+def handle_analyze(analyze_req: AnalyzeRequest, db: Session, progress: Optional[ProgressCallback] = None):
     """Handle analyze request."""
     from app.schemas.analyze import AnalyzeResponse, TableARow, TableBRow
     
     # Generate tables
-    tables = generate_tables(analyze_req.document_id, analyze_req.conversation_id, db)
+    tables = generate_tables(analyze_req.document_id, analyze_req.conversation_id, db, progress=progress)
     
     # Store analysis
+    report(progress, "store", table_a_rows=len(tables.get("table_a", [])), table_b_rows=len(tables.get("table_b", [])))
     store_analysis(analyze_req.document_id, analyze_req.conversation_id, tables, db)
     
     # Convert to response format
@@ -0,0 +1,284 @@
+"""Rule-based checks of job postings and search hits against parsed search constraints."""
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from app.core.config import settings
+from app.schemas.search import ConstraintParsingOutput, TimeWindow
+from app.tools.fetch_tool import extract_company_from_url
+
+# Approximate length of one time window unit
+TIME_WINDOW_UNIT_DAYS = {"days": 1, "weeks": 7, "months": 30, "years": 365}
+
+# Terms that place a posting in a country; bare "us" is left out ("join us")
+COUNTRY_TERMS = {
+    "us": [
+        "united states", "usa", "u.s.", "u.s.a.", "us-based", "us based", "remote - us", "remote us",
+        "new york", "san francisco", "seattle", "austin", "chicago", "boston", "los angeles",
+        "denver", "atlanta", "dallas", "houston", "washington dc", "bay area", "silicon valley",
+    ],
+    "uk": ["united kingdom", "uk", "england", "london", "manchester", "edinburgh", "cambridge, uk"],
+    "canada": ["canada", "toronto", "vancouver", "montreal", "ottawa"],
+    "india": ["india", "bangalore", "bengaluru", "hyderabad", "pune", "chennai", "mumbai", "gurgaon", "noida"],
+    "germany": ["germany", "berlin", "munich", "hamburg", "frankfurt"],
+    "ireland": ["ireland", "dublin"],
+    "netherlands": ["netherlands", "amsterdam"],
+    "france": ["france", "paris"],
+    "poland": ["poland", "warsaw", "krakow"],
+    "singapore": ["singapore"],
+    "australia": ["australia", "sydney", "melbourne"],
+}
+# "City, ST" with a US state code marks a US posting
+US_STATE_RE = re.compile(
+    r",\s*(AL|AK|AZ|AR|CA|CO|CT|DC|DE|FL|GA|HI|ID|IL|IN|IA|KS|KY|LA|ME|MD|MA|MI|MN|MS|MO|MT|NE|NV|NH|NJ|NM|"
+    r"NY|NC|ND|OH|OK|OR|PA|RI|SC|SD|TN|TX|UT|VT|VA|WA|WV|WI|WY)\b"
+)
+
+# Seniority levels recognized in job titles
+SENIORITY_TERMS = {
+    "intern": ["intern", "internship", "co-op", "coop"],
+    "entry": ["junior", "jr", "entry level", "entry-level", "new grad", "graduate"],
+    "senior": ["senior", "sr", "staff", "principal", "lead"],
+    "executive": ["director", "vp", "vice president", "head of", "chief"],
+}
+# Title levels that rule a posting out for each requested seniority
+SENIORITY_CONFLICTS = {
+    "intern": {"entry", "senior", "executive"},
+    "entry": {"intern", "senior", "executive"},
+    "mid": {"intern", "executive"},
+    "senior": {"intern", "entry"},
+}
+
+# "Posted 3 days ago", "30+ days ago", "Posted today"
+AGE_RE = re.compile(r"\b(\d+)\+?\s*(day|week|month|year)s?\s+ago\b", re.I)
+AGE_TODAY_RE = re.compile(r"\bposted\s+(today|just now|yesterday)\b", re.I)
+
+
+def time_window_start(time_window: Optional[TimeWindow], now: Optional[datetime] = None) -> Optional[datetime]:
+    """Earliest posting date inside a parsed time window (UTC), or None if there is no window."""
+    if time_window is None:
+        return None
+    days = TIME_WINDOW_UNIT_DAYS.get(time_window.unit.lower().rstrip("s") + "s")
+    if days is None:
+        return None
+    return (now or datetime.utcnow()) - timedelta(days=days * time_window.value)
+
+
+def allowed_companies(constraints: ConstraintParsingOutput) -> List[str]:
+    """Normalized company names the constraints restrict postings to; empty for any company."""
+    if constraints.company_allowlist:
+        companies = constraints.company_allowlist
+    elif constraints.company_tier == "top_companies":
+        companies = settings.top_companies_allowlist
+    else:
+        return []
+    return [key for key in (company_key(company) for company in companies if company) if key]
+
+
+def company_key(company: str) -> str:
+    """Lowercase words of a company name without punctuation ("Google, LLC" -> "google llc")."""
+    return " ".join(re.findall(r"[a-z0-9&]+", company.lower()))
+
+
+def company_allowed(company: str, allowlist: List[str]) -> bool:
+    """Check a company name against allowlist keys, matching whole words ("Google LLC" matches "google")."""
+    name = f" {company_key(company)} "
+    return any(f" {allowed} " in name for allowed in allowlist)
+
+
+def constraint_mismatch(
+    constraints: ConstraintParsingOutput,
+    date_posted: Optional[datetime],
+    company: Optional[str],
+    now: Optional[datetime] = None
+) -> Optional[str]:
+    """
+    Check structured posting metadata against the time window and company constraints.
+
+    Only known values are checked; a posting without a date or company passes.
+
+    Returns:
+        "outside_time_window", "company_not_allowed", or None if the posting may match
+    """
+    window_start = time_window_start(constraints.time_window, now)
+    if window_start and date_posted and date_posted < window_start:
+        return "outside_time_window"
+    allowlist = allowed_companies(constraints)
+    if allowlist and company and not company_allowed(company, allowlist):
+        return "company_not_allowed"
+    return None
+
+
+def _contains_term(text: str, term: str) -> bool:
+    """Whole-word (or whole-phrase) match of a lowercase term in lowercase text."""
+    return re.search(rf"(?<![a-z0-9]){re.escape(term)}(?![a-z0-9])", text) is not None
+
+
+def countries_in(text: str) -> set:
+    """Countries a piece of text places a posting in, from COUNTRY_TERMS and US state codes."""
+    lowered = text.lower()
+    found = {country for country, terms in COUNTRY_TERMS.items() if any(_contains_term(lowered, t) for t in terms)}
+    if US_STATE_RE.search(text):
+        found.add("us")
+    return found
+
+
+def location_countries(location: str) -> set:
+    """Countries a constraint location names; unlike posting text, a bare "US" counts here."""
+    if company_key(location) in ("us", "u s", "america"):
+        return {"us"}
+    return countries_in(location)
+
+
+def seniority_levels_in(title: str) -> set:
+    """Seniority levels named in a job title."""
+    lowered = title.lower()
+    return {level for level, terms in SENIORITY_TERMS.items() if any(_contains_term(lowered, t) for t in terms)}
+
+
+def hit_published_at(hit: Dict[str, Any], now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Latest possible posting date of a search hit.
+
+    Uses the hit's published_date (ISO or RFC 2822) if present, else an age
+    like "Posted 3 days ago" or "30+ days ago" in its title or snippet.
+    """
+    now = now or datetime.utcnow()
+    published = hit.get("published_date")
+    if isinstance(published, str) and published.strip():
+        for parse in (lambda v: datetime.fromisoformat(v.replace("Z", "+00:00")), parsedate_to_datetime):
+            try:
+                parsed = parse(published.strip())
+            except (TypeError, ValueError):
+                continue
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+            return parsed
+    text = f"{hit.get('title') or ''} {hit.get('content') or ''}"
+    if AGE_TODAY_RE.search(text):
+        return now
+    ages = [int(value) * TIME_WINDOW_UNIT_DAYS[unit.lower() + "s"] for value, unit in AGE_RE.findall(text)]
+    if ages:
+        return now - timedelta(days=min(ages))
+    return None
+
+
+def score_search_hit(
+    hit: Dict[str, Any],
+    constraints: ConstraintParsingOutput,
+    now: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Score a search hit against the constraints from its URL, title and snippet, before it is fetched.
+
+    Each constraint either matches (+1), is unknown (0), or rules the hit out.
+    A hit is ruled out when its date is older than the time window, its
+    applicant tracking system URL names a company outside the allowlist, its
+    title and snippet place it only in other countries than the requested
+    location, or its title names a conflicting seniority. With a company
+    allowlist, a hit that mentions no allowed company scores -1, so it is
+    kept only if another constraint matches.
+
+    Args:
+        hit: Search result with url, title, content and optionally published_date
+        constraints: Parsed search constraints
+        now: Reference time (default: now, UTC)
+
+    Returns:
+        Dictionary with score, keep, and reasons (why the hit was ruled out or penalized)
+    """
+    url = hit.get("url") or ""
+    title = hit.get("title") or ""
+    snippet = hit.get("content") or ""
+    host = urlparse(url).netloc.lower()
+    text = f"{title}\n{snippet}"
+    score = 0
+    reasons = []
+    ruled_out = False
+
+    # Time window
+    window_start = time_window_start(constraints.time_window, now)
+    if window_start:
+        published_at = hit_published_at(hit, now)
+        if published_at is not None:
+            if published_at < window_start:
+                ruled_out = True
+                reasons.append("outside_time_window")
+            else:
+                score += 1
+
+    # Companies
+    allowlist = allowed_companies(constraints)
+    if allowlist:
+        ats_company = extract_company_from_url(url) if ("greenhouse.io" in host or "lever.co" in host) else ""
+        mentioned = f" {company_key(host.replace('.', ' ') + ' ' + text)} "
+        if ats_company and not company_allowed(ats_company, allowlist):
+            ruled_out = True
+            reasons.append("company_not_allowed")
+        elif any(f" {allowed} " in mentioned for allowed in allowlist):
+            score += 1
+        else:
+            score -= 1
+            reasons.append("no_allowed_company_mentioned")
+
+    # Location
+    if constraints.location:
+        wanted = location_countries(constraints.location)
+        found = countries_in(text)
+        if wanted and found:
+            if wanted & found:
+                score += 1
+            elif "remote" not in text.lower():
+                ruled_out = True
+                reasons.append("location_mismatch")
+        elif _contains_term(text.lower(), constraints.location.lower().strip()):
+            score += 1
+
+    # Seniority
+    seniority = (constraints.seniority or "").lower()
+    if seniority in SENIORITY_CONFLICTS:
+        levels = seniority_levels_in(title)
+        if levels & SENIORITY_CONFLICTS[seniority]:
+            ruled_out = True
+            reasons.append("seniority_mismatch")
+        elif seniority in levels:
+            score += 1
+
+    # Role keywords in the title or URL
+    target = f"{title} {url}".lower().replace("-", " ")
+    if any(keyword and keyword.lower() in target for keyword in constraints.role_keywords):
+        score += 1
+
+    keep = not ruled_out and score >= settings.search_prefilter_min_score
+    return {"score": score, "keep": keep, "reasons": reasons}
+
+
+def prefilter_search_hits(
+    hits: List[Dict[str, Any]],
+    constraints: ConstraintParsingOutput,
+    now: Optional[datetime] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Drop search hits that cannot match the constraints, before any page is fetched.
+
+    Args:
+        hits: Search results
+        constraints: Parsed search constraints
+        now: Reference time (default: now, UTC)
+
+    Returns:
+        Tuple of (kept hits in search order, count of dropped hits by the first
+        reason that ruled them out, "low_score" if only their score was too low)
+    """
+    kept = []
+    dropped: Dict[str, int] = {}
+    for hit in hits:
+        result = score_search_hit(hit, constraints, now)
+        if result["keep"]:
+            kept.append(hit)
+            continue
+        hard_reasons = [r for r in result["reasons"] if r != "no_allowed_company_mentioned"]
+        reason = hard_reasons[0] if hard_reasons else "low_score"
+        dropped[reason] = dropped.get(reason, 0) + 1
+    return kept, dropped
@@ -0,0 +1,212 @@
+"""Background job service - runs /pdf, /search and /analyze work in a worker pool."""
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models import BackgroundJob, Document
+from app.db.session import SessionLocal
+from app.db.repositories.background_job_repo import (
+    create_background_job, get_background_job, get_jobs_by_status, claim_background_job,
+    update_claimed_job, heartbeat_background_jobs, requeue_expired_jobs
+)
+from app.db.repositories.document_repo import get_document_by_id
+from app.schemas.search import SearchRequest
+from app.schemas.analyze import AnalyzeRequest
+from app.services.pdf_service import create_document, store_topics
+from app.services.search_service import handle_search
+from app.services.chat_service import handle_analyze
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=settings.job_workers, thread_name_prefix="job")
+
+# Identifies this process in background_jobs.worker
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Jobs this process is running; their lease is renewed by the heartbeat thread
+_running_jobs: Set[str] = set()
+_running_lock = threading.Lock()
+_heartbeat_thread: Optional[threading.Thread] = None
+
+
+def _run_pdf_job(params: Dict[str, Any], db: Session, progress: Callable) -> Dict[str, Any]:
+    """Extract and store topics for an already stored document."""
+    document = get_document_by_id(db, params["document_id"])
+    if not document:
+        raise ValueError(f"Document {params['document_id']} not found")
+    progress("extract_topics", {"document_id": document.document_id})
+    document_id, raw_text = document.document_id, document.raw_text
+    topic_extract_status = store_topics(document_id, raw_text, db)
+    db.commit()
+    return {
+        "document_id": document_id,
+        "extracted_text_preview": raw_text[:500] if raw_text else "",
+        "topic_extract_status": topic_extract_status
+    }
+
+
+def _run_search_job(params: Dict[str, Any], db: Session, progress: Callable) -> Dict[str, Any]:
+    """Run a job search."""
+    return handle_search(SearchRequest(**params), db, progress).model_dump(mode="json")
+
+
+def _run_analyze_job(params: Dict[str, Any], db: Session, progress: Callable) -> Dict[str, Any]:
+    """Run a gap analysis."""
+    return handle_analyze(AnalyzeRequest(**params), db, progress).model_dump(mode="json")
+
+
+JOB_HANDLERS = {
+    "pdf": _run_pdf_job,
+    "search": _run_search_job,
+    "analyze": _run_analyze_job,
+}
+
+
+def submit_job(db: Session, kind: str, params: Dict[str, Any]) -> BackgroundJob:
+    """
+    Persist a new job and queue it on the worker pool.
+    
+    Args:
+        db: Database session
+        kind: Job kind, one of JOB_HANDLERS
+        params: JSON-serializable job inputs
+        
+    Returns:
+        The queued BackgroundJob
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = create_background_job(db, BackgroundJob(
+        kind=kind,
+        status="queued",
+        params_json=params,
+        progress_json={"stage": "queued"}
+    ))
+    _executor.submit(run_job, job.job_id)
+    return job
+
+
+def submit_pdf_job(pdf_bytes: bytes, filename: str, db: Session) -> Tuple[Document, BackgroundJob]:
+    """
+    Store an uploaded PDF's text now and queue topic extraction as a background job.
+    
+    Args:
+        pdf_bytes: PDF file content
+        filename: Original filename
+        db: Database session
+        
+    Returns:
+        Tuple of (document, job)
+    """
+    document = create_document(pdf_bytes, filename, db)
+    db.commit()
+    job = submit_job(db, "pdf", {"document_id": document.document_id})
+    return document, job
+
+
+def run_job(job_id: str) -> None:
+    """
+    Claim a queued job and run it on the current thread, recording progress and result in the DB.
+    
+    The claim is a conditional UPDATE, so a job queued on several workers (or
+    requeued after a restart) runs on exactly one of them. Progress and result
+    writes only apply while this worker still holds the job.
+    """
+    db = SessionLocal()
+    try:
+        if not claim_background_job(db, job_id, WORKER_ID):
+            return
+        job = get_background_job(db, job_id)
+        kind, params = job.kind, job.params_json or {}
+        state = {"stage": "started"}
+        _start_heartbeat()
+        with _running_lock:
+            _running_jobs.add(job_id)
+        
+        def progress(stage: str, info: Dict[str, Any]) -> None:
+            # Merge so earlier partial results (e.g. sources sample) stay visible
+            state.update(info)
+            state["stage"] = stage
+            with SessionLocal() as status_db:
+                update_claimed_job(status_db, job_id, WORKER_ID, progress_json=dict(state))
+        
+        try:
+            result = JOB_HANDLERS[kind](params, db, progress)
+        except Exception as e:
+            logger.error(f"Background job {job_id} ({kind}) failed: {e}", exc_info=True)
+            db.rollback()
+            update_claimed_job(db, job_id, WORKER_ID, status="failed", error=str(e), progress_json={**state, "stage": "failed"})
+            return
+        
+        if update_claimed_job(db, job_id, WORKER_ID, status="completed", result_json=result, progress_json={**state, "stage": "completed"}):
+            logger.info(f"Background job {job_id} ({kind}) completed")
+        else:
+            logger.warning(f"Background job {job_id} ({kind}) finished after its lease expired; result discarded")
+    finally:
+        with _running_lock:
+            _running_jobs.discard(job_id)
+        db.close()
+
+
+def _start_heartbeat() -> None:
+    """Start the thread that renews leases on this process's running jobs, once."""
+    global _heartbeat_thread
+    if _heartbeat_thread is None:
+        with _running_lock:
+            if _heartbeat_thread is None:
+                _heartbeat_thread = threading.Thread(target=_heartbeat_loop, name="job-heartbeat", daemon=True)
+                _heartbeat_thread.start()
+
+
+def _heartbeat_loop() -> None:
+    """Renew running job leases and requeue jobs whose worker stopped renewing theirs."""
+    while True:
+        time.sleep(settings.job_heartbeat_seconds)
+        with _running_lock:
+            job_ids = list(_running_jobs)
+        try:
+            with SessionLocal() as db:
+                heartbeat_background_jobs(db, job_ids, WORKER_ID)
+            _requeue_expired()
+        except Exception as e:
+            logger.warning(f"Background job heartbeat failed: {e}")
+
+
+def _requeue_expired() -> int:
+    """Requeue running jobs with an expired lease (e.g. of a crashed replica) and queue them here."""
+    with SessionLocal() as db:
+        job_ids = requeue_expired_jobs(db, datetime.utcnow() - timedelta(seconds=settings.job_lease_seconds))
+    for job_id in job_ids:
+        _executor.submit(run_job, job_id)
+    if job_ids:
+        logger.info(f"Requeued {len(job_ids)} background jobs with an expired lease")
+    return len(job_ids)
+
+
+def resume_background_jobs() -> int:
+    """
+    Queue jobs left queued by a previous process, and requeue running jobs whose lease has expired.
+    
+    Running jobs with a live lease belong to another worker and are left alone;
+    a job queued here and elsewhere still runs once, since run_job claims it first.
+    
+    Returns:
+        Number of jobs queued
+    """
+    db = SessionLocal()
+    try:
+        requeued = requeue_expired_jobs(db, datetime.utcnow() - timedelta(seconds=settings.job_lease_seconds))
+        jobs = get_jobs_by_status(db, ["queued"])
+        for job in jobs:
+            _executor.submit(run_job, job.job_id)
+        if jobs:
+            logger.info(f"Queued {len(jobs)} background jobs ({len(requeued)} with an expired lease)")
+        return len(jobs)
+    finally:
+        db.close()
@@ -1,26 +1,23 @@
 """PDF processing service."""
+import logging
+import re
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from app.tools.pdf_extract_tool import extract_text_from_bytes
-from app.utils.security import sanitize_text
+from app.utils.security import sanitize_with_report
+from app.utils.text import chunk_text, normalize_topic
 from prompts.prompts import SYLLABUS_TOPIC_EXTRACT_PROMPT
 from app.core.config import settings
-from langchain_openai import AzureChatOpenAI
+from app.core.llm import get_llm_client, invoke_llm
 import json
 from app.db.models import Document, SyllabusTopic
+from app.db.repositories.syllabus_topic_repo import create_topics
+from app.db.repositories.injection_detection_repo import build_detection_rows, create_detections
 
-
-def get_llm_client():
-    """Get Azure OpenAI LLM client."""
-    return AzureChatOpenAI(
-        azure_endpoint=settings.azure_openai_endpoint,
-        api_key=settings.azure_openai_api_key,
-        api_version=settings.api_version,
-        azure_deployment=settings.azure_openai_model,
-        temperature=0.1,
-    )
+logger = logging.getLogger(__name__)
 
 
 def extract_text(pdf_bytes: bytes) -> Tuple[str, bool]:
@@ -36,74 +33,72 @@ def extract_text(pdf_bytes: bytes) -> Tuple[str, bool]:
     return extract_text_from_bytes(pdf_bytes)
 
 
-def extract_topics(text: str, db: Session) -> list:
+# Week/module headings used to tell each chunk where it starts in the course outline
+MODULE_HEADING_RE = re.compile(r"\b(?:week|module|unit|lecture|session|chapter)\s*\d+\b", re.IGNORECASE)
+
+
+def _parse_topic_array(response_text: str) -> list:
+    """Parse the JSON array of topics from an LLM response; raises ValueError if there is none."""
+    # Try to extract JSON from markdown code blocks if present
+    if "```json" in response_text:
+        json_start = response_text.find("```json") + 7
+        json_end = response_text.find("```", json_start)
+        response_text = response_text[json_start:json_end].strip()
+    elif "```" in response_text:
+        json_start = response_text.find("```") + 3
+        json_end = response_text.find("```", json_start)
+        response_text = response_text[json_start:json_end].strip()
+    
+    # Try to find JSON array in the text
+    # Look for opening bracket
+    start_idx = response_text.find('[')
+    if start_idx == -1:
+        raise ValueError(f"No JSON array found in response: {response_text[:200]}")
+    
+    # Find matching closing bracket
+    bracket_count = 0
+    end_idx = start_idx
+    for i in range(start_idx, len(response_text)):
+        if response_text[i] == '[':
+            bracket_count += 1
+        elif response_text[i] == ']':
+            bracket_count -= 1
+            if bracket_count == 0:
+                end_idx = i + 1
+                break
+    
+    if end_idx <= start_idx:
+        raise ValueError("Could not find matching closing bracket")
+    
+    topics = json.loads(response_text[start_idx:end_idx])
+    return topics if isinstance(topics, list) else []
+
+
+def extract_chunk_topics(chunk: str, module_context: Optional[str] = None, use_cache: bool = True) -> list:
     """
-    Extract topics from syllabus text using LLM.
+    Extract topics from one chunk of syllabus text (the map step).
     
     Args:
-        text: Extracted syllabus text
-        db: Database session
+        chunk: Sanitized syllabus text chunk
+        module_context: Last week/module heading before this chunk, if any
+        use_cache: Set to False to bypass the LLM response cache
         
     Returns:
         List of extracted topics
     """
-    # Sanitize text first
-    sanitized_text = sanitize_text(text)
-    
-    # Prepare prompt - use replace instead of format to avoid issues with JSON braces in prompt
-    prompt = SYLLABUS_TOPIC_EXTRACT_PROMPT.replace("{syllabus_text}", sanitized_text[:20000])  # Limit text length
-    
-    # Call LLM
-    llm = get_llm_client()
+    if module_context:
+        chunk = f"[This excerpt continues {module_context}]\n{chunk}"
+    # Use replace instead of format to avoid issues with JSON braces in prompt
+    prompt = SYLLABUS_TOPIC_EXTRACT_PROMPT.replace("{syllabus_text}", chunk)
     
     try:
-        response = llm.invoke(prompt)
+        response = invoke_llm(
+            get_llm_client(), prompt, "SYLLABUS_TOPIC_EXTRACT_PROMPT", use_cache=use_cache, validate=_parse_topic_array
+        )
         response_text = response.content
-        
-        # Parse JSON from response
-        # Try to extract JSON from markdown code blocks if present
-        if "```json" in response_text:
-            json_start = response_text.find("```json") + 7
-            json_end = response_text.find("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        elif "```" in response_text:
-            json_start = response_text.find("```") + 3
-            json_end = response_text.find("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        
-        # Try to find JSON array in the text
-        # Look for opening bracket
-        start_idx = response_text.find('[')
-        if start_idx == -1:
-            print(f"No JSON array found in response: {response_text[:200]}")
-            return []
-        
-        # Find matching closing bracket
-        bracket_count = 0
-        end_idx = start_idx
-        for i in range(start_idx, len(response_text)):
-            if response_text[i] == '[':
-                bracket_count += 1
-            elif response_text[i] == ']':
-                bracket_count -= 1
-                if bracket_count == 0:
-                    end_idx = i + 1
-                    break
-        
-        if end_idx <= start_idx:
-            print(f"Could not find matching closing bracket")
-            return []
-        
-        json_str = response_text[start_idx:end_idx]
-        topics = json.loads(json_str)
-        
-        if not isinstance(topics, list):
-            topics = []
-            
-        return topics
-        
-    except json.JSONDecodeError as e:
-        print(f"JSON decode error extracting topics: {str(e)}")
+        return _parse_topic_array(response_text)
+    except ValueError as e:
+        print(f"Could not parse extracted topics: {str(e)}")
         print(f"Response text (first 500 chars): {response_text[:500] if 'response_text' in locals() else 'N/A'}")
         return []
     except Exception as e:
@@ -113,6 +108,199 @@ def extract_topics(text: str, db: Session) -> list:
         return []
 
 
+def merge_chunk_topics(chunk_topics: List[list]) -> List[dict]:
+    """
+    Merge per-chunk topics, deduplicating by normalized topic name (the reduce step).
+    
+    The first occurrence keeps its position and name. Modules from every
+    occurrence are kept in order of appearance, keywords are unioned and the
+    highest confidence wins.
+    
+    Args:
+        chunk_topics: Topic lists in chunk order
+        
+    Returns:
+        Deduplicated list of topic dicts
+    """
+    merged: Dict[str, dict] = {}
+    for topics in chunk_topics:
+        for topic_data in topics:
+            if isinstance(topic_data, str):
+                # Handle case where LLM returns simple string list
+                topic_data = {"topic_name": topic_data, "confidence": 0.8}
+            if not isinstance(topic_data, dict):
+                continue
+            topic_name = str(topic_data.get("topic_name") or topic_data.get("topic") or "").strip()
+            key = normalize_topic(topic_name)
+            if not key:
+                continue
+            
+            entry = merged.setdefault(key, {
+                "topic_name": topic_name,
+                "modules": [],
+                "keywords": [],
+                "confidence": 0.0,
+            })
+            module = topic_data.get("module")
+            if module and str(module) not in entry["modules"]:
+                entry["modules"].append(str(module))
+            seen_keywords = {k.lower() for k in entry["keywords"]}
+            for keyword in topic_data.get("keywords") or []:
+                if isinstance(keyword, str) and keyword.lower() not in seen_keywords:
+                    entry["keywords"].append(keyword)
+                    seen_keywords.add(keyword.lower())
+            try:
+                entry["confidence"] = max(entry["confidence"], float(topic_data.get("confidence", 0.0)))
+            except (TypeError, ValueError):
+                pass
+    
+    return [
+        {
+            "topic_name": entry["topic_name"],
+            "module": ", ".join(entry["modules"])[:100] or None,  # Column holds 100 chars
+            "keywords": entry["keywords"],
+            "confidence": entry["confidence"],
+        }
+        for entry in merged.values()
+    ]
+
+
+def extract_topics(text: str, db: Session, use_cache: bool = True, document_id: Optional[str] = None) -> list:
+    """
+    Extract topics from syllabus text using LLM.
+    
+    The text is split with chunk_text and every chunk is extracted
+    concurrently (bounded by settings.llm_max_concurrency), then the results
+    are merged with merge_chunk_topics, so long syllabi are covered in full.
+    
+    Args:
+        text: Extracted syllabus text
+        db: Database session
+        use_cache: Set to False to bypass the LLM response cache
+        document_id: Document the text belongs to; injection detections are
+            recorded against it (added to the session, not committed)
+        
+    Returns:
+        List of extracted topics
+    """
+    # Record injection matches; cut them out only if the syllabus policy says so
+    sanitized = sanitize_with_report(text, settings.syllabus_injection_policy, settings.injection_redact_scope)
+    if sanitized["matches"]:
+        logger.warning(
+            f"[SECURITY] {len(sanitized['matches'])} injection match(es) in syllabus text: "
+            f"{sanitized['action']}, {sanitized['removed_chars']} chars removed"
+        )
+        if document_id:
+            create_detections(db, build_detection_rows(sanitized, "document", document_id), commit=False)
+    sanitized_text = sanitized["text"]
+    if not sanitized_text.strip():
+        return []
+    chunks = chunk_text(sanitized_text, settings.syllabus_chunk_size, settings.syllabus_chunk_overlap)
+    
+    # Carry the last module heading seen before each chunk into it
+    contexts = []
+    last_heading = None
+    for chunk in chunks:
+        contexts.append(last_heading)
+        headings = MODULE_HEADING_RE.findall(chunk)
+        if headings:
+            last_heading = headings[-1]
+    
+    if len(chunks) == 1:
+        chunk_topics = [extract_chunk_topics(chunks[0], None, use_cache)]
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(chunks), settings.llm_max_concurrency)) as executor:
+            chunk_topics = list(executor.map(
+                lambda args: extract_chunk_topics(*args, use_cache=use_cache), zip(chunks, contexts)
+            ))
+    
+    topics = merge_chunk_topics(chunk_topics)
+    logger.info(
+        f"Extracted {len(topics)} topics from {len(chunks)} chunks "
+        f"({sum(len(t) for t in chunk_topics)} before merging)"
+    )
+    return topics
+
+
+def create_document(pdf_bytes: bytes, filename: str, db: Session) -> Document:
+    """
+    Extract text from an uploaded PDF and add its Document record (flushed, not committed).
+    
+    Args:
+        pdf_bytes: PDF file content
+        filename: Original filename
+        db: Database session
+        
+    Returns:
+        The new Document
+    """
+    # Extract text
+    raw_text, ocr_used = extract_text(pdf_bytes)
+    
+    # Create document record
+    document = Document(
+        document_id=str(uuid.uuid4()),
+        filename=filename,
+        raw_text=raw_text,
+        extraction_method="pdfplumber",
+        ocr_used=ocr_used
+    )
+    db.add(document)
+    db.flush()  # Get document_id
+    return document
+
+
+def store_topics(document_id: str, raw_text: str, db: Session) -> str:
+    """
+    Extract topics from a document's text and add them with a single bulk insert (not committed).
+    
+    Args:
+        document_id: Document the topics belong to
+        raw_text: Extracted document text
+        db: Database session
+        
+    Returns:
+        topic_extract_status: "completed" or "failed"
+    """
+    # Extract topics
+    topics = extract_topics(raw_text, db, document_id=document_id)
+    topic_extract_status = "completed" if topics else "failed"
+    
+    # Store topics with a single bulk insert
+    topic_rows = []
+    for idx, topic_data in enumerate(topics):
+        try:
+            if isinstance(topic_data, dict):
+                topic_name = topic_data.get("topic_name") or topic_data.get("topic") or ""
+                if not topic_name:
+                    print(f"Warning: Topic {idx} has no topic_name")
+                    continue
+                topic_rows.append({
+                    "document_id": document_id,
+                    "topic_name": str(topic_name),
+                    "module": topic_data.get("module"),
+                    "keywords_json": topic_data.get("keywords", []),
+                    "confidence": float(topic_data.get("confidence", 0.0))
+                })
+            elif isinstance(topic_data, str):
+                # Handle case where LLM returns simple string list
+                topic_rows.append({
+                    "document_id": document_id,
+                    "topic_name": str(topic_data),
+                    "module": None,
+                    "keywords_json": [],
+                    "confidence": 0.8
+                })
+        except Exception as e:
+            print(f"Error storing topic {idx} ({type(topic_data)}): {str(e)}")
+            import traceback
+            traceback.print_exc()
+            continue
+    
+    create_topics(db, topic_rows, commit=False)
+    return topic_extract_status
+
+
 def process_pdf(pdf_bytes: bytes, filename: str, db: Session) -> Tuple[str, str, str]:
     """
     Process uploaded PDF: extract text and topics, store in DB.
@@ -126,57 +314,9 @@ def process_pdf(pdf_bytes: bytes, filename: str, db: Session) -> Tuple[str, str,
         Tuple of (document_id, text_preview, topic_extract_status)
     """
     try:
-        # Extract text
-        raw_text, ocr_used = extract_text(pdf_bytes)
-        
-        # Create document record
-        document_id = str(uuid.uuid4())
-        document = Document(
-            document_id=document_id,
-            filename=filename,
-            raw_text=raw_text,
-            extraction_method="pdfplumber",
-            ocr_used=ocr_used
-        )
-        db.add(document)
-        db.flush()  # Get document_id
-        
-        # Extract topics
-        topics = extract_topics(raw_text, db)
-        topic_extract_status = "completed" if topics else "failed"
-        
-        # Store topics
-        for idx, topic_data in enumerate(topics):
-            try:
-                if isinstance(topic_data, dict):
-                    topic_name = topic_data.get("topic_name") or topic_data.get("topic") or ""
-                    if not topic_name:
-                        print(f"Warning: Topic {idx} has no topic_name")
-                        continue
-                    topic = SyllabusTopic(
-                        document_id=document_id,
-                        topic_name=str(topic_name),
-                        module=topic_data.get("module"),
-                        keywords_json=topic_data.get("keywords", []),
-                        confidence=float(topic_data.get("confidence", 0.0))
-                    )
-                    db.add(topic)
-                elif isinstance(topic_data, str):
-                    # Handle case where LLM returns simple string list
-                    topic = SyllabusTopic(
-                        document_id=document_id,
-                        topic_name=str(topic_data),
-                        module=None,
-                        keywords_json=[],
-                        confidence=0.8
-                    )
-                    db.add(topic)
-            except Exception as e:
-                print(f"Error storing topic {idx} ({type(topic_data)}): {str(e)}")
-                import traceback
-                traceback.print_exc()
-                continue
-        
+        document = create_document(pdf_bytes, filename, db)
+        document_id, raw_text = document.document_id, document.raw_text
+        topic_extract_status = store_topics(document_id, raw_text, db)
         db.commit()
         
         # Return preview (first 500 chars)
@@ -190,4 +330,3 @@ def process_pdf(pdf_bytes: bytes, filename: str, db: Session) -> Tuple[str, str,
         print(f"Error in process_pdf: {str(e)}")
         print(error_details)
         raise
-
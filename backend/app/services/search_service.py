@@ -3,59 +3,70 @@ import uuid
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
-from app.schemas.search import ConstraintParsingOutput, TimeWindow
+from app.schemas.search import ConstraintParsingOutput, TimeWindow, SearchRequest, SearchResponse
 from app.agents.verify_agent import verify_evidence
 from app.tools.web_search_tool import search_web
-from app.tools.fetch_tool import fetch_web_page, extract_company_from_url
+from app.tools.fetch_tool import fetch_web_pages, extract_company_from_url
 from prompts.prompts import CONSTRAINT_PARSING_PROMPT, JOB_TOPIC_EXTRACT_PROMPT, RETRY_QUERY_PROMPT
 from app.core.config import settings
-from langchain_openai import AzureChatOpenAI
-from app.db.models import Conversation, JobSource, JobTopic
+from app.core.llm import get_llm_client, invoke_llm
+from app.core.progress import ProgressCallback, report
+from app.db.models import Conversation, JobSource, JobTopic, PostingTopic
 from app.db.repositories.conversation_repo import get_or_create_conversation
-from app.db.repositories.job_source_repo import create_job_source, get_source_by_hash
-from app.db.repositories.job_topic_repo import create_job_topic
+from app.db.repositories.job_source_repo import create_job_sources, get_source_by_hash, get_sources_by_ids
+from app.db.repositories.job_topic_repo import create_job_topics
+from app.db.repositories.posting_topic_repo import get_topics_by_hash, create_posting_topics
+from app.db.repositories.injection_detection_repo import build_detection_rows, create_detections
+from app.utils.security import sanitize_with_report
 from app.utils.text import normalize_topic
+from app.services.topic_canonicalizer import canonicalize_topic_rows
+from app.services.constraint_filter import constraint_mismatch, prefilter_search_hits
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
 
-def get_llm_client():
-    """Get Azure OpenAI LLM client."""
-    return AzureChatOpenAI(
-        azure_endpoint=settings.azure_openai_endpoint,
-        api_key=settings.azure_openai_api_key,
-        api_version=settings.api_version,
-        azure_deployment=settings.azure_openai_model,
-        temperature=0.1,
-    )
+def _json_from_response(response_text: str) -> Any:
+    """Parse the JSON in an LLM response, tolerating code fences."""
+    if "```json" in response_text:
+        json_start = response_text.find("```json") + 7
+        json_end = response_text.find("```", json_start)
+        response_text = response_text[json_start:json_end].strip()
+    elif "```" in response_text:
+        json_start = response_text.find("```") + 3
+        json_end = response_text.find("```", json_start)
+        response_text = response_text[json_start:json_end].strip()
+    return json.loads(response_text)
+
+
+def _constraints_from_response(response_text: str) -> ConstraintParsingOutput:
+    """Parse a constraint parsing response; raises if it is not valid constraints JSON."""
+    return ConstraintParsingOutput(**_json_from_response(response_text))
 
 
-def parse_constraints(instruction: str) -> ConstraintParsingOutput:
+def _job_topics_from_response(response_text: str) -> List[Dict[str, Any]]:
+    """Parse a job topic extraction response; raises if it is not a JSON array."""
+    topics = _json_from_response(response_text)
+    if not isinstance(topics, list):
+        raise ValueError("Job topic response is not a JSON array")
+    return topics
+
+
+def parse_constraints(instruction: str, use_cache: bool = True) -> ConstraintParsingOutput:
     """Parse user instruction into structured constraints."""
     llm = get_llm_client()
     
     prompt = CONSTRAINT_PARSING_PROMPT.replace("{instruction}", instruction)
     
     try:
-        response = llm.invoke(prompt)
-        response_text = response.content
-        
-        # Extract JSON
-        if "```json" in response_text:
-            json_start = response_text.find("```json") + 7
-            json_end = response_text.find("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        elif "```" in response_text:
-            json_start = response_text.find("```") + 3
-            json_end = response_text.find("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        
-        constraints_dict = json.loads(response_text)
-        return ConstraintParsingOutput(**constraints_dict)
+        response = invoke_llm(
+            llm, prompt, "CONSTRAINT_PARSING_PROMPT", use_cache=use_cache, validate=_constraints_from_response
+        )
+        return _constraints_from_response(response.content)
         
     except Exception as e:
         print(f"Error parsing constraints: {str(e)}")
@@ -71,7 +82,7 @@ def parse_constraints(instruction: str) -> ConstraintParsingOutput:
         )
 
 
-def extract_job_topics(job_texts: List[str]) -> List[Dict[str, Any]]:
+def extract_job_topics(job_texts: List[str], use_cache: bool = True) -> List[Dict[str, Any]]:
     """Extract topics from job description texts."""
     llm = get_llm_client()
     all_topics = []
@@ -81,22 +92,10 @@ def extract_job_topics(job_texts: List[str]) -> List[Dict[str, Any]]:
         prompt = JOB_TOPIC_EXTRACT_PROMPT.replace("{job_text}", job_text[:5000])
         
         try:
-            response = llm.invoke(prompt)
-            response_text = response.content
-            
-            # Extract JSON
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-            elif "```" in response_text:
-                json_start = response_text.find("```") + 3
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-            
-            topics = json.loads(response_text)
-            if isinstance(topics, list):
-                all_topics.extend(topics)
+            response = invoke_llm(
+                llm, prompt, "JOB_TOPIC_EXTRACT_PROMPT", use_cache=use_cache, validate=_job_topics_from_response
+            )
+            all_topics.extend(_job_topics_from_response(response.content))
                 
         except Exception as e:
             print(f"Error extracting topics from job text: {str(e)}")
@@ -105,7 +104,38 @@ def extract_job_topics(job_texts: List[str]) -> List[Dict[str, Any]]:
     return all_topics
 
 
-def collect_sources(parsed_constraints: ConstraintParsingOutput, db: Session, conversation_id: str) -> List[JobSource]:
+def parse_posted_at(value: Optional[str]) -> Optional[datetime]:
+    """Parse the ISO date_posted from fetch metadata into a datetime, or None."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def summarize_evidence(evidence: List[JobSource]) -> Dict[str, Any]:
+    """Evidence summary for the verifier: counts, companies, locations and the posting date range."""
+    dates = [s.date_posted for s in evidence if s.date_posted]
+    if dates:
+        date_range = f"{min(dates):%Y-%m-%d} to {max(dates):%Y-%m-%d}"
+    else:
+        date_range = "unknown"
+    return {
+        "job_count": len(evidence),
+        "companies": sorted({s.company for s in evidence if s.company}),
+        "locations": sorted({s.location for s in evidence if s.location}),
+        "date_range": date_range,
+        "dated_job_count": len(dates)
+    }
+
+
+def collect_sources(
+    parsed_constraints: ConstraintParsingOutput,
+    db: Session,
+    conversation_id: str,
+    progress: Optional[ProgressCallback] = None
+) -> List[JobSource]:
     """Collect job sources via web search."""
     # Build search query
     query_parts = []
@@ -119,6 +149,7 @@ def collect_sources(parsed_constraints: ConstraintParsingOutput, db: Session, co
     query += " job description"
     
     # Search
+    report(progress, "search", query=query)
     try:
         search_results = search_web(query, max_results=10)
     except ValueError as e:
@@ -129,122 +160,224 @@ def collect_sources(parsed_constraints: ConstraintParsingOutput, db: Session, co
         print(f"Search error: {str(e)}")
         return []
     
+    # Drop hits that cannot match the constraints before downloading them
+    if settings.search_prefilter_enabled and search_results:
+        kept_results, dropped = prefilter_search_hits(search_results, parsed_constraints)
+        if dropped:
+            logger.info(f"Pre-filter dropped {len(search_results) - len(kept_results)} of {len(search_results)} search hits: {dropped}")
+            report(progress, "prefilter", dropped=len(search_results) - len(kept_results), total=len(search_results), reasons=dropped)
+        search_results = kept_results
+    
     collected_sources = []
+    new_sources = []
+    seen_hashes = set()
+    filtered = {}  # Reason -> postings dropped by constraint_mismatch
+    results_by_url = {result["url"]: result for result in search_results if result.get("url")}
     
-    # Fetch pages
-    for result in search_results:
-        url = result.get("url", "")
-        if not url:
-            continue
-        
-        # Check for duplicates
-        fetched = fetch_web_page(url)
+    # Fetch pages concurrently; results arrive in completion order
+    for fetched_count, fetched in enumerate(fetch_web_pages(results_by_url.keys()), 1):
+        url = fetched["url"]
+        result = results_by_url[url]
+        report(progress, "fetch", fetched=fetched_count, total=len(results_by_url), url=url, page_status=fetched["status"])
         if fetched["status"] != "success":
+            logger.info(f"Skipping {url}: {fetched['status']} ({fetched.get('snippet', '')})")
             continue
         
+        # Check for duplicates within this conversation. Postings already seen in
+        # other conversations get their own row here; verify_and_store reuses their topics.
         content_hash = fetched.get("content_hash")
         if content_hash:
-            existing = get_source_by_hash(db, content_hash)
+            if content_hash in seen_hashes:
+                continue
+            seen_hashes.add(content_hash)
+            existing = get_source_by_hash(db, content_hash, conversation_id)
             if existing:
+                reason = constraint_mismatch(parsed_constraints, existing.date_posted, None)
+                if reason:
+                    filtered[reason] = filtered.get(reason, 0) + 1
+                    continue
                 collected_sources.append(existing)
                 continue
         
+        # JSON-LD JobPosting fields are exact; check them against the constraints before
+        # the posting is stored or reaches an LLM
+        metadata = fetched.get("metadata") or {}
+        date_posted = parse_posted_at(metadata.get("date_posted"))
+        reason = constraint_mismatch(parsed_constraints, date_posted, metadata.get("company"))
+        if reason:
+            logger.info(f"Skipping {url}: {reason} ({metadata.get('company')}, posted {metadata.get('date_posted')})")
+            filtered[reason] = filtered.get(reason, 0) + 1
+            continue
+        
         # Extract company name
-        company = extract_company_from_url(url)
+        company = metadata.get("company") or extract_company_from_url(url)
         if not company:
             company = result.get("title", "").split("-")[0].strip()
         
-        # Create job source
-        job_source = JobSource(
-            conversation_id=conversation_id,
-            url=url,
-            source_site=result.get("source", "unknown"),
-            title=result.get("title", fetched.get("title", "")),
-            company=company,
-            role=parsed_constraints.role_keywords[0] if parsed_constraints.role_keywords else None,
-            snippet=fetched.get("snippet", result.get("content", "")[:500]),
-            raw_text=fetched.get("raw_text", ""),
-            access_status=fetched.get("status", "success"),
-            content_hash=content_hash
-        )
-        
-        job_source = create_job_source(db, job_source)
-        collected_sources.append(job_source)
+        # Queue job source for a single bulk insert
+        new_sources.append({
+            "conversation_id": conversation_id,
+            "url": url,
+            "source_site": result.get("source", "unknown"),
+            "title": result.get("title", fetched.get("title", "")),
+            "company": company,
+            "role": metadata.get("title") or (parsed_constraints.role_keywords[0] if parsed_constraints.role_keywords else None),
+            "date_posted": date_posted,
+            "location": metadata.get("location"),
+            "snippet": fetched.get("snippet", result.get("content", "")[:500]),
+            "raw_text": fetched.get("raw_text", ""),
+            "access_status": fetched.get("status", "success"),
+            "content_hash": content_hash
+        })
+    
+    new_ids = create_job_sources(db, new_sources)
+    collected_sources.extend(get_sources_by_ids(db, new_ids))
+    if filtered:
+        logger.info(f"Filtered out {sum(filtered.values())} postings by structured metadata: {filtered}")
+        report(progress, "filter", filtered=sum(filtered.values()), reasons=filtered)
     
     return collected_sources
 
 
-def verify_and_store(evidence: List[JobSource], constraints: ConstraintParsingOutput, db: Session, conversation_id: str) -> tuple[bool, int]:
+def build_job_topic_rows(conversation_id: str, job_source: JobSource, topics_for_job: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate topics extracted from one job source and build JobTopic rows for bulk insert."""
+    rows = []
+    for topic_data in topics_for_job:
+        if isinstance(topic_data, dict):
+            topic_name = topic_data.get("topic") or topic_data.get("raw_topic", "")
+            if not topic_name or len(topic_name.strip()) == 0:
+                logger.warning(f"Skipping empty topic: {topic_data}")
+                continue
+            normalized = normalize_topic(topic_name)
+            if normalized and len(normalized) > 2:  # Valid topic
+                try:
+                    rows.append({
+                        "conversation_id": conversation_id,
+                        "job_source_id": job_source.id,
+                        "normalized_topic": normalized,
+                        "raw_topic": topic_data.get("raw_topic", topic_name),
+                        "frequency_weight": 1.0,
+                        "confidence": float(topic_data.get("confidence", 0.8))
+                    })
+                except (TypeError, ValueError) as e:
+                    logger.error(f"Error preparing topic {normalized}: {e}", exc_info=True)
+            else:
+                logger.warning(f"Skipping invalid normalized topic: '{normalized}' (original: '{topic_name}')")
+        else:
+            logger.warning(f"Skipping non-dict topic data: {topic_data}")
+    return rows
+
+
+def build_known_topic_rows(conversation_id: str, job_source: JobSource, posting_topics: List[PostingTopic]) -> List[Dict[str, Any]]:
+    """Build JobTopic rows copying topics already extracted for the same posting into this conversation."""
+    return [
+        {
+            "conversation_id": conversation_id,
+            "job_source_id": job_source.id,
+            "normalized_topic": posting_topic.normalized_topic,
+            "raw_topic": posting_topic.raw_topic,
+            "frequency_weight": 1.0,
+            "confidence": posting_topic.confidence
+        }
+        for posting_topic in posting_topics
+    ]
+
+
+def verify_and_store(
+    evidence: List[JobSource],
+    constraints: ConstraintParsingOutput,
+    db: Session,
+    conversation_id: str,
+    progress: Optional[ProgressCallback] = None
+) -> tuple[bool, int]:
     """Verify evidence and store job topics."""
     # Prepare evidence summary
-    companies = list(set([s.company for s in evidence if s.company]))
-    evidence_summary = {
-        "job_count": len(evidence),
-        "companies": companies,
-        "date_range": "recent"  # Simplified
-    }
+    evidence_summary = summarize_evidence(evidence)
     
     # Verify
     constraints_dict = constraints.model_dump()
+    report(progress, "verify", job_count=len(evidence))
     verifier_result = verify_evidence(constraints_dict, evidence_summary)
     
     # Always extract and store topics, even if verifier fails
     # (We'll still store them but mark verification status)
     
-    # Extract topics from job descriptions
-    stored_count = 0
+    # Reuse topics of postings seen before; only new postings go to extraction
+    topic_rows = []
+    posting_rows = []
+    jobs_to_extract = []
+    detection_rows = []
     for job_source in evidence:
-        if job_source.raw_text or job_source.snippet:
-            job_text = job_source.raw_text or job_source.snippet
-            if not job_text or len(job_text) < 50:  # Skip if too short
+        if job_source.job_topics:  # Already processed in this conversation
+            continue
+        if job_source.content_hash:
+            known_topics = get_topics_by_hash(db, job_source.content_hash)
+            if known_topics:
+                topic_rows.extend(build_known_topic_rows(conversation_id, job_source, known_topics))
+                logger.info(f"Reused {len(known_topics)} known topics for job source {job_source.id}")
                 continue
-            
-            # Extract topics for this specific job
-            try:
+        job_text = job_source.raw_text or job_source.snippet
+        if not job_text or len(job_text) < 50:  # Skip if too short
+            continue
+        # Cut injected instructions out locally before the text reaches the extraction prompt
+        sanitized = sanitize_with_report(job_text, settings.injection_policy, settings.injection_redact_scope)
+        if sanitized["matches"]:
+            detection_rows.extend(build_detection_rows(sanitized, "job_source", job_source.id, conversation_id))
+            logger.warning(
+                f"[SECURITY] {len(sanitized['matches'])} injection match(es) in job source {job_source.id}: "
+                f"{sanitized['action']}, {sanitized['removed_chars']} chars removed"
+            )
+        job_text = sanitized["text"]
+        if len(job_text) < 50:  # Dropped or nothing left after redaction
+            continue
+        jobs_to_extract.append((job_source, job_text[:5000]))  # Limit text length
+    
+    # Extract topics from the remaining job descriptions, one LLM call per job, in parallel
+    if jobs_to_extract:
+        with ThreadPoolExecutor(max_workers=settings.llm_max_concurrency, thread_name_prefix="job-topics") as executor:
+            futures = {}
+            for job_source, job_text in jobs_to_extract:
                 logger.info(f"Extracting topics from job source {job_source.id} (text length: {len(job_text)})")
-                topics_for_job = extract_job_topics([job_text[:5000]])  # Limit text length
-                logger.info(f"Got {len(topics_for_job)} topics from job source {job_source.id}")
-                
-                for topic_data in topics_for_job:
-                    if isinstance(topic_data, dict):
-                        topic_name = topic_data.get("topic") or topic_data.get("raw_topic", "")
-                        if not topic_name or len(topic_name.strip()) == 0:
-                            logger.warning(f"Skipping empty topic: {topic_data}")
-                            continue
-                        normalized = normalize_topic(topic_name)
-                        if normalized and len(normalized) > 2:  # Valid topic
-                            try:
-                                job_topic = JobTopic(
-                                    conversation_id=conversation_id,
-                                    job_source_id=job_source.id,
-                                    normalized_topic=normalized,
-                                    raw_topic=topic_data.get("raw_topic", topic_name),
-                                    frequency_weight=1.0,
-                                    confidence=float(topic_data.get("confidence", 0.8))
-                                )
-                                create_job_topic(db, job_topic)
-                                stored_count += 1
-                                logger.debug(f"Stored topic: {normalized}")
-                            except Exception as e:
-                                logger.error(f"Error storing topic {normalized}: {e}", exc_info=True)
-                        else:
-                            logger.warning(f"Skipping invalid normalized topic: '{normalized}' (original: '{topic_name}')")
-                    else:
-                        logger.warning(f"Skipping non-dict topic data: {topic_data}")
-            except Exception as e:
-                logger.error(f"Error extracting topics from job {job_source.id}: {str(e)}", exc_info=True)
-                continue
+                futures[executor.submit(extract_job_topics, [job_text])] = job_source
+            
+            # Collect results on this thread as they complete; the session is not thread-safe
+            for extracted_count, future in enumerate(as_completed(futures), 1):
+                job_source = futures[future]
+                report(progress, "extract", extracted=extracted_count, total=len(futures))
+                try:
+                    topics_for_job = future.result()
+                    logger.info(f"Got {len(topics_for_job)} topics from job source {job_source.id}")
+                    rows = build_job_topic_rows(conversation_id, job_source, topics_for_job)
+                except Exception as e:
+                    logger.error(f"Error extracting topics from job {job_source.id}: {str(e)}", exc_info=True)
+                    continue
+                topic_rows.extend(rows)
+                if job_source.content_hash:
+                    posting_rows.extend(
+                        {
+                            "content_hash": job_source.content_hash,
+                            "normalized_topic": row["normalized_topic"],
+                            "raw_topic": row["raw_topic"],
+                            "confidence": row["confidence"]
+                        }
+                        for row in rows
+                    )
     
-    logger.info(f"Stored {stored_count} job topics from {len(evidence)} job sources")
+    # Map topics to their canonical names so variants count as one topic
+    topic_rows = canonicalize_topic_rows(topic_rows)
     
-    # Commit all changes
+    # Store all topics in one transaction
+    stored_count = create_job_topics(db, topic_rows, commit=False)
+    create_posting_topics(db, posting_rows, commit=False)
+    create_detections(db, detection_rows, commit=False)
     db.commit()
+    logger.info(f"Stored {stored_count} job topics from {len(evidence)} job sources")
     
     # Return verification status and topic count
     return verifier_result.is_passed, stored_count
 
 
-def handle_search(search_req: SearchRequest, db: Session) -> SearchResponse:
+def handle_search(search_req: SearchRequest, db: Session, progress: Optional[ProgressCallback] = None) -> SearchResponse:
     """Handle search request - main entry point."""
     # Parse constraints
     parsed = parse_constraints(search_req.instruction)
@@ -255,18 +388,30 @@ def handle_search(search_req: SearchRequest, db: Session) -> SearchResponse:
     conversation_id = conv.conversation_id
     
     # Collect sources
-    sources = collect_sources(parsed, db, conversation_id)
+    sources = collect_sources(parsed, db, conversation_id, progress)
+    report(
+        progress, "sources_collected",
+        conversation_id=conversation_id,
+        results_count=len(sources),
+        sources_sample=[{"url": s.url, "title": s.title} for s in sources[:3]]
+    )
     
     # Verify and store
-    verified, topics_stored = verify_and_store(sources, parsed, db, conversation_id)
+    verified, topics_stored = verify_and_store(sources, parsed, db, conversation_id, progress)
     
     # Update conversation
     update_conversation(db, conversation_id, parsed_constraints_json=parsed.model_dump(), status="search_completed")
     
     # Verify topics were actually stored
-    from app.db.repositories.job_topic_repo import get_topics_by_conversation
-    stored_topics = get_topics_by_conversation(db, conversation_id)
-    logger.info(f"Search completed: {len(sources)} sources, {len(stored_topics)} topics stored")
+    from app.db.repositories.job_topic_repo import count_topics_by_conversation, get_topic_frequencies
+    top_topics = ", ".join(
+        f"{row['normalized_topic']} ({row['sources']})"
+        for _, row in zip(range(5), get_topic_frequencies(db, conversation_id, sample_urls=0))
+    )
+    logger.info(
+        f"Search completed: {len(sources)} sources, {count_topics_by_conversation(db, conversation_id)} topics stored"
+        f" (most common: {top_topics or 'none'})"
+    )
     
     return SearchResponse(
         conversation_id=conversation_id,
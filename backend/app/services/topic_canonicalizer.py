@@ -0,0 +1,391 @@
+"""Canonical topic dictionary: maps topic variants to one canonical name."""
+import logging
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from app.db.session import SessionLocal
+from app.db.repositories.canonical_topic_repo import (
+    get_canonical_names, get_variant_index, get_variant_canonicals, create_canonical_topics, create_topic_variants
+)
+from app.services.topic_matcher import GENERIC_TOKENS, STOPWORDS
+from app.services.topic_vectors import embed_topics
+from app.tools.embeddings import get_embedding_backend, match_threshold
+from app.core.config import settings
+from app.utils.text import normalize_topic
+
+logger = logging.getLogger(__name__)
+
+# Words that qualify a topic without changing what it is ("sql queries" is "sql")
+GENERIC_SUFFIXES = {
+    "query", "queries", "skill", "skills", "experience", "knowledge", "programming",
+    "concept", "concepts", "fundamentals", "basics", "proficiency",
+}
+QUALIFIER_PREFIXES = {
+    "advanced", "basic", "basics", "intro", "introduction", "applied", "modern", "strong", "solid", "to",
+}
+
+
+def _singular(token: str) -> str:
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "is", "us")):
+        return token[:-1]
+    return token
+
+
+def _core_tokens(topic: str) -> List[re.Match]:
+    """Tokens of a topic without leading qualifiers and one trailing generic word."""
+    tokens = list(re.finditer(r"[\w+#.]+", topic))
+    while len(tokens) > 1 and tokens[0].group() in QUALIFIER_PREFIXES:
+        tokens = tokens[1:]
+    if len(tokens) > 1 and tokens[-1].group() in GENERIC_SUFFIXES and tokens[-2].group() not in GENERIC_TOKENS:
+        tokens = tokens[:-1]
+    return tokens
+
+
+def cluster_key(topic: str) -> str:
+    """
+    Reduce a normalized topic to its clustering key.
+
+    Leading qualifiers and one trailing generic word are dropped and tokens are
+    singularized: "advanced sql queries" -> "sql", "data warehouses" -> "data warehouse".
+    """
+    return " ".join(_singular(t.group()) for t in _core_tokens(topic))
+
+
+def canonical_name(topic: str) -> str:
+    """Readable canonical name for a new topic: its core tokens as written ("intro to r" -> "r")."""
+    tokens = _core_tokens(topic)
+    return topic[tokens[0].start():tokens[-1].end()] if tokens else topic
+
+
+def acronym(key: str) -> Optional[str]:
+    """Acronym of a multi-word key ("structured query language" -> "sql"), if it has one."""
+    words = [w for w in key.split() if w not in STOPWORDS]
+    if len(words) < 2 or any(len(w) < 3 for w in words):
+        return None
+    return "".join(w[0] for w in words if w[0].isalnum())
+
+
+def _compact(key: str) -> str:
+    """Form used for acronym lookups ("ci cd" -> "cicd")."""
+    return re.sub(r"[^\w]", "", key)
+
+
+def written_in_caps(short: str, spellings: Iterable[str]) -> bool:
+    """
+    Whether any spelling writes the short form in capitals ("AI", "CI/CD"),
+    as one all-caps word or a run of all-caps words.
+    """
+    target = short.upper()
+    for spelling in spellings:
+        words = re.findall(r"[^\W_]+", spelling)
+        for i in range(len(words)):
+            joined = ""
+            for word in words[i:]:
+                if not word.isupper():
+                    break
+                joined += word
+                if len(joined) >= len(target):
+                    break
+            if joined == target:
+                return True
+    return False
+
+
+class TopicResolver:
+    """
+    In-memory variant -> canonical index backed by the canonical_topics and topic_variants tables.
+
+    Known variants resolve with one dict lookup. New topics are clustered
+    incrementally: by cluster key, then by acronym, then by embedding
+    similarity to existing canonicals; anything else becomes a new canonical.
+    Every decision is stored, so a variant always resolves the same way.
+
+    Matching initials alone never merge topics ("AI" is not "Adobe Illustrator"):
+    an acronym match also needs the embeddings of both forms to clear the
+    clustering threshold, and when the new topic is the short form, one of
+    its spellings must write it in capitals.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.variants: Dict[str, str] = {}
+        self.keys: Dict[str, str] = {}
+        self.compact_keys: Dict[str, str] = {}
+        self.acronyms: Dict[str, str] = {}
+        self.canonicals: List[str] = []
+        self._vectors: Optional[np.ndarray] = None
+        self._vectors_backend: Optional[str] = None
+
+    def _register(self, variant: str, canonical: str) -> None:
+        self.variants[variant] = canonical
+        key = cluster_key(variant)
+        self.keys.setdefault(key, canonical)
+        self.compact_keys.setdefault(_compact(key), canonical)
+        short = acronym(key)
+        if short:
+            self.acronyms.setdefault(short, canonical)
+
+    def _load(self) -> None:
+        self.variants, self.keys, self.compact_keys, self.acronyms = {}, {}, {}, {}
+        db = SessionLocal()
+        try:
+            self.canonicals = get_canonical_names(db)
+            for canonical in self.canonicals:
+                self._register(canonical, canonical)
+            for variant, canonical in get_variant_index(db):
+                self._register(variant, canonical)
+        finally:
+            db.close()
+        self._vectors = None
+        self._loaded = True
+        logger.info(f"Loaded {len(self.canonicals)} canonical topics and {len(self.variants)} variants")
+
+    def _reassign(self, variant: str, canonical: str) -> None:
+        """Point a variant, and the index keys it set, at another canonical."""
+        previous = self.variants.get(variant)
+        self.variants[variant] = canonical
+        key = cluster_key(variant)
+        for index, index_key in ((self.keys, key), (self.compact_keys, _compact(key)), (self.acronyms, acronym(key))):
+            if index_key and index.get(index_key, previous) == previous:
+                index[index_key] = canonical
+
+    def _key_match(self, topic: str) -> Optional[str]:
+        """Canonical of a new topic with the same cluster key, if any."""
+        return self.keys.get(cluster_key(topic))
+
+    def _acronym_candidate(self, topic: str) -> Tuple[Optional[str], bool]:
+        """
+        Canonical whose initials match a new topic, unconfirmed.
+
+        Returns:
+            Tuple of (candidate canonical or None, whether the new topic is the short form)
+        """
+        key = cluster_key(topic)
+        if _compact(key) in self.acronyms:
+            return self.acronyms[_compact(key)], True
+        short = acronym(key)
+        if short and short in self.compact_keys:
+            return self.compact_keys[short], False
+        return None, False
+
+    def _confirm_acronym(
+        self, topic: str, candidate: str, topic_is_short: bool,
+        spellings: Dict[str, set], vectors: Dict[str, np.ndarray], threshold: float
+    ) -> Optional[float]:
+        """Similarity of an acronym match if the spellings and embeddings confirm it, else None."""
+        if topic_is_short and not written_in_caps(_compact(cluster_key(topic)), spellings.get(topic, ())):
+            return None
+        topic_vector, candidate_vector = vectors.get(topic), vectors.get(candidate)
+        if topic_vector is None or candidate_vector is None:
+            return None
+        similarity = float(topic_vector @ candidate_vector)
+        return similarity if similarity >= threshold else None
+
+    def resolve(self, topics: Iterable[str]) -> Dict[str, str]:
+        """
+        Map topics to canonical names, clustering and storing unseen ones.
+
+        The lock only guards the in-memory index: embeddings are computed and
+        decisions stored outside it, then stored decisions of other processes
+        for the same variants win over ours.
+
+        Args:
+            topics: Topic strings, raw where available (their capitalization confirms acronyms)
+
+        Returns:
+            Dict of normalize_topic(topic) -> canonical name
+        """
+        spellings: Dict[str, set] = {}
+        for topic in topics:
+            if topic:
+                spellings.setdefault(normalize_topic(topic), set()).add(topic)
+        spellings.pop("", None)
+        normalized = set(spellings)
+        backend = get_embedding_backend()
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            unknown = sorted(t for t in normalized if t not in self.variants)
+            if not unknown:
+                return {t: self.variants[t] for t in normalized}
+            pending = [t for t in unknown if self._key_match(t) is None]
+            candidates = [c for c in (self._acronym_candidate(t)[0] for t in pending) if c]
+            covered = self._covered(backend.name)
+            canonical_tail = self.canonicals[covered:]
+
+        embedded = self._embed(backend, pending, candidates, covered, canonical_tail) if pending else None
+
+        with self._lock:
+            new_canonicals, new_variants = self._cluster(unknown, spellings, backend, embedded)
+        if new_canonicals or new_variants:
+            self._store(new_canonicals, new_variants)
+
+        with self._lock:
+            return {t: self.variants.get(t, t) for t in normalized}
+
+    def _covered(self, backend_name: str) -> int:
+        """Number of leading canonicals with a vector from the given backend."""
+        if self._vectors is None or self._vectors_backend != backend_name:
+            return 0
+        return self._vectors.shape[0]
+
+    def _embed(
+        self, backend, pending: List[str], candidates: List[str], covered: int, canonical_tail: List[str]
+    ) -> Optional[Dict]:
+        """
+        Embed topics without a key match, the names they would get as new canonicals,
+        their acronym candidates, and canonicals from position covered on that
+        have no vector yet (lock not held).
+
+        Returns:
+            Dict with start (covered), tail (vectors of canonical_tail) and vectors
+            (topic -> vector), or None if the backend failed
+        """
+        names = sorted(set(pending) | {canonical_name(t) for t in pending} | set(candidates))
+        db = SessionLocal()
+        try:
+            vectors = embed_topics(db, names, backend)
+            tail = embed_topics(db, canonical_tail, backend) if canonical_tail else None
+            db.commit()
+        except Exception as e:
+            # Without vectors only the key and acronym rules apply
+            db.rollback()
+            logger.warning(f"Topic embeddings unavailable ({e}); clustering by rules only")
+            return None
+        finally:
+            db.close()
+        return {"start": covered, "tail": tail, "vectors": dict(zip(names, vectors))}
+
+    def _cluster(
+        self, unknown: List[str], spellings: Dict[str, set], backend, embedded: Optional[Dict]
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Assign canonicals to unseen topics in the in-memory index (caller holds the lock).
+
+        Returns:
+            Tuple of (new canonical rows, new variant rows) to store
+        """
+        if embedded is not None and embedded["tail"] is not None and self._covered(backend.name) == embedded["start"]:
+            # Extend the canonical vectors unless another thread already did
+            head = self._vectors if embedded["start"] else None
+            self._vectors = embedded["tail"] if head is None else np.vstack([head, embedded["tail"]])
+            self._vectors_backend = backend.name
+        vectors = embedded["vectors"] if embedded is not None else {}
+        threshold = min(0.99, match_threshold(backend) + settings.topic_cluster_margin)
+
+        new_canonicals = []
+        new_variants = []
+        for topic in unknown:
+            if topic in self.variants:
+                # Resolved by another thread since the first look
+                continue
+            # New canonicals made earlier in this batch are candidates too
+            canonical, method, similarity = self._key_match(topic), "key", None
+            if not canonical:
+                candidate, topic_is_short = self._acronym_candidate(topic)
+                if candidate:
+                    similarity = self._confirm_acronym(topic, candidate, topic_is_short, spellings, vectors, threshold)
+                    if similarity is not None:
+                        canonical, method = candidate, "acronym"
+            vector = vectors.get(topic)
+            covered = self._covered(backend.name)
+            if not canonical and vector is not None and covered:
+                scores = self._vectors @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= threshold:
+                    canonical, method, similarity = self.canonicals[best], "embedding", float(scores[best])
+            if not canonical:
+                canonical, method = canonical_name(topic), "new"
+                canonical_vector = vectors.get(canonical)
+                if canonical_vector is not None and covered == len(self.canonicals):
+                    self._vectors = canonical_vector[None, :] if not covered else np.vstack([self._vectors, canonical_vector])
+                    self._vectors_backend = backend.name
+                self.canonicals.append(canonical)
+                new_canonicals.append({"name": canonical})
+                self._register(canonical, canonical)
+            self._register(topic, canonical)
+            if topic != canonical:
+                new_variants.append({
+                    "variant": topic, "canonical_topic": canonical,
+                    "method": method, "similarity": similarity,
+                })
+        return new_canonicals, new_variants
+
+    def _store(self, new_canonicals: List[Dict], new_variants: List[Dict]) -> None:
+        """
+        Store clustering decisions, skipping rows another process stored first,
+        and adopt the stored canonical of each decided topic (lock not held).
+        """
+        # Canonicals of new variants are inserted too, in case another thread's
+        # insert of them is not committed yet
+        names = {row["name"] for row in new_canonicals} | {row["canonical_topic"] for row in new_variants}
+        db = SessionLocal()
+        try:
+            create_canonical_topics(db, [{"name": name} for name in sorted(names)], commit=False)
+            create_topic_variants(db, new_variants, commit=False)
+            db.commit()
+            # New canonicals too: another process may have made one of them a variant
+            stored = get_variant_canonicals(db, [row["variant"] for row in new_variants] + [row["name"] for row in new_canonicals])
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error storing canonical topics: {e}", exc_info=True)
+            return
+        finally:
+            db.close()
+
+        with self._lock:
+            conflicts = [variant for variant, canonical in stored.items() if self.variants.get(variant) != canonical]
+            for variant in conflicts:
+                self._reassign(variant, stored[variant])
+        if conflicts:
+            logger.warning(f"{len(conflicts)} topic variants were clustered differently by another process; using theirs")
+        logger.info(f"Added {len(new_canonicals)} canonical topics and {len(new_variants)} variants")
+
+
+_topic_resolver: Optional[TopicResolver] = None
+_topic_resolver_lock = threading.Lock()
+
+
+def get_topic_resolver() -> TopicResolver:
+    """Get the process-wide topic resolver, creating it on first use."""
+    global _topic_resolver
+    if _topic_resolver is None:
+        with _topic_resolver_lock:
+            if _topic_resolver is None:
+                _topic_resolver = TopicResolver()
+    return _topic_resolver
+
+
+def canonicalize_topic_rows(rows: List[Dict]) -> List[Dict]:
+    """
+    Replace normalized_topic with its canonical name and merge duplicates.
+
+    Rows of the same job source that resolve to the same canonical topic are
+    merged: frequency_weight is summed, confidence is the maximum and the
+    first raw_topic is kept.
+
+    Args:
+        rows: JobTopic row dicts
+
+    Returns:
+        Merged row dicts
+    """
+    # Raw spellings where they normalize to the row's topic, so capitals can confirm acronyms
+    mapping = get_topic_resolver().resolve(
+        row["raw_topic"] if row.get("raw_topic") and normalize_topic(row["raw_topic"]) == row["normalized_topic"]
+        else row["normalized_topic"]
+        for row in rows
+    )
+    merged: Dict[Tuple, Dict] = {}
+    for row in rows:
+        canonical = mapping.get(normalize_topic(row["normalized_topic"]), row["normalized_topic"])
+        key = (row["conversation_id"], row["job_source_id"], canonical)
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = {**row, "normalized_topic": canonical}
+            continue
+        existing["frequency_weight"] = (existing.get("frequency_weight") or 1.0) + (row.get("frequency_weight") or 1.0)
+        existing["confidence"] = max(existing.get("confidence") or 0.0, row.get("confidence") or 0.0)
+    return list(merged.values())
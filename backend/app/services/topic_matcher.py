@@ -0,0 +1,255 @@
+"""Deterministic matching of syllabus topics against extracted job topics."""
+import heapq
+import math
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from app.core.config import settings
+from app.utils.text import normalize_topic
+
+# Words that never make two topics related on their own
+STOPWORDS = {
+    "and", "or", "of", "for", "in", "on", "to", "with", "the", "a", "an",
+    "using", "use", "basics", "basic", "introduction", "intro", "advanced", "skills",
+}
+
+# Broad words that are not specific enough to carry a match alone
+GENERIC_TOKENS = {
+    "data", "programming", "development", "engineering", "management", "analysis",
+    "analytic", "design", "system", "concept", "fundamental", "tool",
+    "experience", "knowledge", "principle", "method", "technique", "modeling",
+}
+
+
+def topic_tokens(topic: str) -> Set[str]:
+    """Split a normalized topic into its meaningful tokens, with plural "s" dropped."""
+    tokens = set()
+    for token in re.split(r"[^\w+#.]+", topic):
+        if not token or token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "is", "us")):
+            token = token[:-1]
+        tokens.add(token)
+    return tokens
+
+
+def recency_factor(posted_at: Optional[datetime], now: datetime) -> float:
+    """1.0 for a new posting, halving every analysis_recency_half_life_days."""
+    half_life = settings.analysis_recency_half_life_days
+    if posted_at is None or half_life <= 0:
+        return 1.0
+    age_days = max(0.0, (now - posted_at).total_seconds() / 86400)
+    return 0.5 ** (age_days / half_life)
+
+
+def build_job_topic_index(
+    topic_postings: Iterable,
+    topic_phrasings: Iterable = ()
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[int, str]]:
+    """
+    Index aggregated job topic rows by normalized topic and score each posting's support.
+
+    A posting supports a topic with recency * confidence * (1 + ln(frequency_weight)),
+    so every posting counts once and repeated mentions add only a little.
+
+    Args:
+        topic_postings: (normalized_topic, job_source_id, url, posted_at, frequency_weight,
+            confidence) rows, one per topic and posting (see job_topic_repo.iter_topic_postings)
+        topic_phrasings: (normalized_topic, raw_topic, mentions) rows
+
+    Returns:
+        Tuple of (dict of normalized topic -> {"tokens", "postings" (job_source_id -> support),
+        "score" (summed support), "phrasings" (Counter of raw topics)}, dict of job_source_id -> url)
+    """
+    now = datetime.utcnow()
+    index: Dict[str, Dict[str, Any]] = {}
+    urls: Dict[int, str] = {}
+    for topic, posting, url, posted_at, weight, confidence in topic_postings:
+        normalized = normalize_topic(topic)
+        if not normalized:
+            continue
+        entry = index.get(normalized)
+        if entry is None:
+            entry = index[normalized] = {
+                "tokens": topic_tokens(normalized),
+                "postings": {},
+                "score": 0.0,
+                "phrasings": Counter(),
+            }
+        urls[posting] = url
+        support = (
+            recency_factor(posted_at, now)
+            * (confidence if confidence is not None else 1.0)
+            * (1 + math.log(max(weight or 1.0, 1.0)))
+        )
+        entry["postings"][posting] = entry["postings"].get(posting, 0.0) + support
+        entry["score"] += support
+
+    for topic, raw_topic, mentions in topic_phrasings:
+        entry = index.get(normalize_topic(topic))
+        if entry is not None and raw_topic:
+            entry["phrasings"][raw_topic] += mentions
+    return index, urls
+
+
+def topics_match(syllabus_terms: Set[str], syllabus_tokens: Set[str], job_topic: str, job_tokens: Set[str]) -> bool:
+    """
+    Decide whether a job topic is covered by a syllabus topic.
+
+    A job topic matches when it equals the syllabus topic name or one of its
+    keywords, when it is a more specific phrasing of the syllabus topic (all
+    syllabus tokens appear in it, e.g. "sql" -> "advanced sql queries"), or
+    when it is fully contained in the syllabus topic (e.g. "python" ->
+    "python programming"). Containment only counts when the contained side has
+    a token that is not in GENERIC_TOKENS, so "data" matches nothing by itself.
+    """
+    if job_topic in syllabus_terms:
+        return True
+    if not job_tokens or not syllabus_tokens:
+        return False
+    if syllabus_tokens <= job_tokens:
+        return bool(syllabus_tokens - GENERIC_TOKENS)
+    if job_tokens <= syllabus_tokens:
+        return bool(job_tokens - GENERIC_TOKENS)
+    return False
+
+
+def _references(posting_support: Dict[int, float], urls: Dict[int, str]) -> List[str]:
+    """Top posting URLs by how strongly each posting supports the topic."""
+    ranked = heapq.nsmallest(
+        settings.analysis_max_references,
+        (p for p in posting_support if p in urls),
+        key=lambda p: (-posting_support[p], p)
+    )
+    return [urls[p] for p in ranked]
+
+
+def _priority(share: float) -> str:
+    if share >= settings.analysis_high_priority_share:
+        return "High"
+    if share >= settings.analysis_medium_priority_share:
+        return "Medium"
+    return "Low"
+
+
+# Computes (similarity matrix, threshold) for syllabus x job topic names
+VectorSimilarity = Callable[[List[str], List[str]], Tuple[np.ndarray, float]]
+
+
+def match_topics(
+    syllabus_topics: Iterable,
+    topic_postings: Iterable,
+    topic_phrasings: Iterable = (),
+    vector_similarity: Optional[VectorSimilarity] = None,
+    canonical: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Match syllabus topics against job topics and compute all table figures.
+
+    Counts are distinct postings and relevance is the share of postings that
+    mention a matching topic (0-100). Rows are ranked by weighted score
+    (support summed over postings, see build_job_topic_index); Table B keeps
+    the top analysis_max_missing_topics via a heap. References are the URLs of
+    the most supportive postings. The result is deterministic for the same rows;
+    prose fields are left for the caller to fill in.
+
+    Args:
+        syllabus_topics: SyllabusTopic rows of the document
+        topic_postings: Aggregated (topic, posting) rows of the conversation
+            (see job_topic_repo.iter_topic_postings)
+        topic_phrasings: (topic, raw_topic, mentions) rows (see job_topic_repo.iter_topic_phrasings)
+        vector_similarity: Optional embedding similarity (see topic_vectors.similarity_matrix);
+            pairs at or above its threshold also match
+        canonical: Optional normalized topic -> canonical topic map for syllabus
+            names and keywords (see topic_canonicalizer); job topics are stored canonical
+
+    Returns:
+        Dict with total_postings, job_topic_count, modules (syllabus modules in order), and
+        table_a / table_b row dicts carrying the matched industry phrasings
+    """
+    canonical = canonical or {}
+    index, urls = build_job_topic_index(topic_postings, topic_phrasings)
+    total_postings = len(urls) or 1
+
+    modules: List[str] = []
+    unique_syllabus = {}
+    for syllabus_topic in syllabus_topics:
+        if syllabus_topic.module and syllabus_topic.module not in modules:
+            modules.append(syllabus_topic.module)
+        name = normalize_topic(syllabus_topic.topic_name)
+        name = canonical.get(name, name)
+        if name and name not in unique_syllabus:
+            unique_syllabus[name] = syllabus_topic
+
+    job_names = list(index)
+    vector_hits = {}
+    if vector_similarity is not None and unique_syllabus and job_names:
+        similarity, threshold = vector_similarity(list(unique_syllabus), job_names)
+        for row, col in zip(*np.nonzero(similarity >= threshold)):
+            vector_hits.setdefault(int(row), set()).add(job_names[col])
+
+    table_a = []
+    covered: Set[str] = set()
+    for row_idx, (name, syllabus_topic) in enumerate(unique_syllabus.items()):
+        keywords = {normalize_topic(k) for k in (syllabus_topic.keywords_json or []) if isinstance(k, str)}
+        terms = {name} | keywords | {canonical[k] for k in keywords if k in canonical}
+        tokens = topic_tokens(name)
+        vector_matches = vector_hits.get(row_idx, set())
+        hits = [
+            topic for topic, entry in index.items()
+            if topic in vector_matches or topics_match(terms, tokens, topic, entry["tokens"])
+        ]
+        covered.update(hits)
+        if not hits:
+            continue
+
+        # A posting matching several job topics counts once, with its strongest support
+        posting_support: Dict[int, float] = {}
+        phrasings: Counter = Counter()
+        for topic in hits:
+            phrasings.update(index[topic]["phrasings"])
+            for posting, support in index[topic]["postings"].items():
+                posting_support[posting] = max(posting_support.get(posting, 0.0), support)
+        table_a.append({
+            "syllabus_topic": syllabus_topic.topic_name,
+            "module": syllabus_topic.module,
+            "industry_relevance_score": min(100, round(100 * len(posting_support) / total_postings)),
+            "evidence_job_count": len(posting_support),
+            "score": sum(posting_support.values()),
+            "references": _references(posting_support, urls),
+            "phrasings": [p for p, _ in phrasings.most_common(5)],
+        })
+
+    # Only the top-k missing topics are built into rows and sent for prose
+    missing = heapq.nlargest(
+        settings.analysis_max_missing_topics,
+        (
+            (entry["score"], len(entry["postings"]), topic)
+            for topic, entry in index.items()
+            if topic not in covered and len(entry["postings"]) >= settings.analysis_min_missing_jobs
+        ),
+        key=lambda item: (item[0], item[1])
+    )
+    table_b = [
+        {
+            "missing_topic": topic,
+            "frequency_in_jobs": postings,
+            "score": score,
+            "priority": _priority(postings / total_postings),
+            "references": _references(index[topic]["postings"], urls),
+            "phrasings": [p for p, _ in index[topic]["phrasings"].most_common(5)],
+        }
+        for score, postings, topic in missing
+    ]
+
+    table_a.sort(key=lambda row: (-row["score"], row["syllabus_topic"].lower()))
+    table_b.sort(key=lambda row: (-row["score"], row["missing_topic"]))
+    return {
+        "total_postings": total_postings,
+        "job_topic_count": len(index),
+        "modules": modules,
+        "table_a": table_a,
+        "table_b": table_b,
+    }
@@ -0,0 +1,89 @@
+"""Topic vector index: embed topics once, store them, and compare them in bulk."""
+import logging
+from typing import List, Optional, Tuple
+import numpy as np
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.db.repositories.topic_embedding_repo import get_embeddings, create_embeddings
+from app.tools.embeddings import EmbeddingBackend, HashingEmbedder, get_embedding_backend, match_threshold
+from app.core.config import settings
+from app.utils.text import normalize_topic
+
+logger = logging.getLogger(__name__)
+
+
+def embed_topics(db: Session, topics: List[str], backend: EmbeddingBackend) -> np.ndarray:
+    """
+    Get unit vectors for topics, embedding only those not stored yet.
+
+    Vectors are stored per normalized topic and backend as float32 blobs, so
+    each distinct topic is embedded once across all documents and searches.
+    New vectors are written in a savepoint of the caller's session and not
+    committed here.
+
+    Args:
+        db: Database session
+        topics: Topic strings
+        backend: Embedding backend
+
+    Returns:
+        (len(topics), dim) float32 matrix in the order of topics
+    """
+    normalized = [normalize_topic(t) for t in topics]
+    stored = get_embeddings(db, backend.name, normalized)
+    missing = sorted(set(normalized) - stored.keys())
+
+    if missing:
+        vectors = backend.embed(missing)
+        rows = [
+            {"backend": backend.name, "normalized_topic": topic, "dim": vectors.shape[1], "vector": vector.tobytes()}
+            for topic, vector in zip(missing, vectors)
+        ]
+        stored.update({row["normalized_topic"]: row["vector"] for row in rows})
+        # Written in a savepoint so a failed insert never rolls back the caller's work; topics
+        # another request stored first are skipped, their vectors are equivalent
+        try:
+            with db.begin_nested():
+                create_embeddings(db, rows, commit=False)
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not store {len(rows)} topic embeddings: {e}")
+
+    if not normalized:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.vstack([np.frombuffer(stored[topic], dtype=np.float32) for topic in normalized])
+
+
+def similarity_matrix(
+    db: Session,
+    syllabus_topics: List[str],
+    job_topics: List[str],
+    backend: Optional[EmbeddingBackend] = None
+) -> Tuple[np.ndarray, float]:
+    """
+    Compute the full syllabus x job cosine similarity matrix with one matrix product.
+
+    Falls back to the local hashing vectorizer if the configured backend fails.
+
+    Args:
+        db: Database session
+        syllabus_topics: Syllabus topic names
+        job_topics: Job topic names
+        backend: Embedding backend (defaults to get_embedding_backend())
+
+    Returns:
+        Tuple of (similarity matrix of shape (len(syllabus_topics), len(job_topics)), match threshold)
+    """
+    backend = backend or get_embedding_backend()
+    if not syllabus_topics or not job_topics:
+        return np.zeros((len(syllabus_topics), len(job_topics)), dtype=np.float32), match_threshold(backend)
+    try:
+        syllabus_vectors = embed_topics(db, syllabus_topics, backend)
+        job_vectors = embed_topics(db, job_topics, backend)
+    except Exception as e:
+        if isinstance(backend, HashingEmbedder):
+            raise
+        logger.warning(f"Embedding backend {backend.name} failed ({e}); falling back to local hashing vectors")
+        backend = HashingEmbedder(settings.embedding_dim)
+        syllabus_vectors = embed_topics(db, syllabus_topics, backend)
+        job_vectors = embed_topics(db, job_topics, backend)
+    return syllabus_vectors @ job_vectors.T, match_threshold(backend)
@@ -0,0 +1,110 @@
+"""Pluggable topic embedding backends: a local hashing vectorizer and Azure OpenAI embeddings."""
+import logging
+import re
+import zlib
+from abc import ABC, abstractmethod
+from typing import List, Optional
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBackend(ABC):
+    """
+    Turns topic strings into L2-normalized float32 vectors.
+
+    name identifies the vector space; vectors from different names must never
+    be compared. default_threshold is the cosine similarity treated as a match.
+    """
+
+    name: str = ""
+    default_threshold: float = 0.8
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts into an (n, dim) float32 matrix of unit vectors."""
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class HashingEmbedder(EmbeddingBackend):
+    """
+    Offline vectorizer hashing word unigrams and character 3-5 grams into a fixed space.
+
+    Character n-grams make spelling variants ("data warehouse" / "data
+    warehousing") land close together without any vocabulary or network.
+    Hashes use crc32 so vectors are stable across processes.
+    """
+
+    default_threshold = 0.65
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.name = f"hashing-{dim}-v1"
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"[\w+#.]+", text.lower())
+        features = [f"w:{w}" for w in words]
+        for word in words:
+            padded = f" {word} "
+            for n in (3, 4, 5):
+                features.extend(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                # Signed hashing keeps collisions from only ever adding similarity
+                matrix[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        # Sublinear term frequency, as in TF-IDF
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        return _normalize_rows(matrix)
+
+
+class AzureEmbedder(EmbeddingBackend):
+    """Azure OpenAI embeddings through the shared client registry."""
+
+    default_threshold = 0.85
+
+    def __init__(self, deployment: str):
+        self.deployment = deployment
+        self.name = f"azure:{deployment}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        from app.core.llm import embed_texts
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return _normalize_rows(np.asarray(embed_texts(self.deployment, texts), dtype=np.float32))
+
+
+def get_embedding_backend(name: Optional[str] = None) -> EmbeddingBackend:
+    """
+    Get the configured embedding backend.
+
+    Args:
+        name: "hashing", "azure" or "auto" (defaults to settings.embedding_backend)
+
+    Returns:
+        EmbeddingBackend instance
+    """
+    name = name or settings.embedding_backend
+    deployment = settings.azure_openai_embedding_deployment
+    if name == "azure" or (name == "auto" and deployment):
+        if deployment:
+            return AzureEmbedder(deployment)
+        logger.warning("embedding_backend is 'azure' but no azure_openai_embedding_deployment is set; using hashing")
+    return HashingEmbedder(settings.embedding_dim)
+
+
+def match_threshold(backend: EmbeddingBackend) -> float:
+    """Cosine similarity counted as a match for a backend."""
+    if settings.embedding_match_threshold is not None:
+        return settings.embedding_match_threshold
+    return backend.default_threshold
@@ -0,0 +1,129 @@
+"""Persistent URL-keyed cache of fetched and extracted web pages."""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.tools.html_extract import EXTRACTOR_VERSION
+
+
+class FetchCache:
+    """
+    SQLite-backed cache of extracted page text with HTTP validators.
+
+    Entries younger than max_age_seconds are served without a request; older
+    entries are revalidated with a conditional GET using the stored ETag and
+    Last-Modified headers. Entries stored by another extractor_version are
+    treated as missing, so a 304 never revives text from an older extractor.
+    """
+
+    def __init__(self, path: str, max_age_seconds: int, max_entries: int, extractor_version: int):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self.max_entries = max_entries
+        self.extractor_version = extractor_version
+        self.fresh_hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fetch_cache ("
+            "url TEXT PRIMARY KEY, title TEXT, raw_text TEXT NOT NULL, content_hash TEXT, "
+            "etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL, metadata_json TEXT, extractor_version INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_fetch_cache_fetched ON fetch_cache (fetched_at)")
+        # Caches created before JobPosting metadata or extractor versions were stored lack the columns
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(fetch_cache)")}
+        if "metadata_json" not in columns:
+            self._conn.execute("ALTER TABLE fetch_cache ADD COLUMN metadata_json TEXT")
+        if "extractor_version" not in columns:
+            self._conn.execute("ALTER TABLE fetch_cache ADD COLUMN extractor_version INTEGER")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for url (fresh or stale), or None if there is none from the current extractor."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM fetch_cache WHERE url = ?", (url,)).fetchone()
+        if row is None or row["extractor_version"] != self.extractor_version:
+            return None
+        entry = dict(row)
+        entry["metadata"] = json.loads(entry.pop("metadata_json") or "{}")
+        entry.pop("extractor_version")
+        return entry
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """Check whether an entry is inside the freshness window."""
+        return time.time() - entry["fetched_at"] < self.max_age_seconds
+
+    def record_fresh_hit(self) -> None:
+        """Count an entry served from inside the freshness window."""
+        with self._lock:
+            self.fresh_hits += 1
+
+    def set(self, url: str, title: str, raw_text: str, content_hash: str,
+            etag: Optional[str], last_modified: Optional[str],
+            metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Store a fetched (cache miss) page and its JobPosting metadata, evicting the oldest entries over the size limit."""
+        with self._lock:
+            self.misses += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fetch_cache "
+                "(url, title, raw_text, content_hash, etag, last_modified, fetched_at, metadata_json, extractor_version) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, title, raw_text, content_hash, etag, last_modified, time.time(),
+                 json.dumps(metadata) if metadata else None, self.extractor_version)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM fetch_cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM fetch_cache WHERE url IN "
+                    "(SELECT url FROM fetch_cache ORDER BY fetched_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+            self._conn.commit()
+
+    def touch(self, url: str) -> None:
+        """Restart the freshness window of an entry after a 304 Not Modified, counting it as revalidated."""
+        with self._lock:
+            self.revalidated += 1
+            self._conn.execute("UPDATE fetch_cache SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit counters and current size."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM fetch_cache").fetchone()[0]
+            return {
+                "fresh_hits": self.fresh_hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "size": size,
+                "max_entries": self.max_entries,
+            }
+
+
+_fetch_cache: Optional[FetchCache] = None
+_fetch_cache_lock = threading.Lock()
+
+
+def get_fetch_cache() -> FetchCache:
+    """Get the process-wide fetch cache, creating it on first use."""
+    global _fetch_cache
+    if _fetch_cache is None:
+        with _fetch_cache_lock:
+            if _fetch_cache is None:
+                _fetch_cache = FetchCache(
+                    settings.fetch_cache_path,
+                    settings.fetch_cache_max_age_seconds,
+                    settings.fetch_cache_max_entries,
+                    EXTRACTOR_VERSION,
+                )
+    return _fetch_cache
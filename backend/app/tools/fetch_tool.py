@@ -1,18 +1,63 @@
 """Web page fetching and content extraction tool."""
 import requests
-from bs4 import BeautifulSoup
-from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Iterable, Iterator, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
 import hashlib
+import threading
+import time
 from urllib.parse import urlparse
+from app.core.config import settings
+from app.tools.fetch_cache import get_fetch_cache
+from app.tools.html_extract import extract_page
 
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
 
-def fetch_web_page(url: str, timeout: int = 10) -> Dict[str, Any]:
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Get the shared HTTP session used for page fetches.
+    
+    The session is created on first use and keeps connections alive per host,
+    so repeated fetches against the same career site reuse sockets.
+    
+    Returns:
+        Shared requests.Session instance
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=settings.fetch_pool_maxsize,
+                    pool_maxsize=settings.fetch_pool_maxsize,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _http_session = session
+    return _http_session
+
+
+def fetch_web_page(url: str, timeout: float = 10, use_cache: bool = True) -> Dict[str, Any]:
     """
     Fetch web page content and extract text.
     
+    Pages fetched recently are served from the fetch cache. Stale cache entries
+    are revalidated with a conditional GET; on 304 Not Modified the cached text
+    is returned without downloading or parsing the page again.
+    
     Args:
         url: URL to fetch
         timeout: Request timeout in seconds
+        use_cache: Set to False to bypass the fetch cache
         
     Returns:
         Dictionary with:
@@ -22,6 +67,9 @@ def fetch_web_page(url: str, timeout: int = 10) -> Dict[str, Any]:
         - raw_text: Full extracted text
         - status: "success", "blocked", "timeout", or "error"
         - content_hash: SHA-256 hash of content for deduplication
+        - cache_status: "fresh", "revalidated" or "miss"
+        - metadata: JSON-LD JobPosting fields (title, company, date_posted,
+          location; see html_extract.job_posting_metadata), empty if the page has none
     """
     result = {
         "url": url,
@@ -29,15 +77,30 @@ def fetch_web_page(url: str, timeout: int = 10) -> Dict[str, Any]:
         "snippet": "",
         "raw_text": "",
         "status": "error",
-        "content_hash": None
+        "content_hash": None,
+        "cache_status": "miss",
+        "metadata": {}
     }
     
+    cache = get_fetch_cache() if use_cache and settings.fetch_cache_enabled else None
+    cached = cache.get(url) if cache else None
+    if cached and cache.is_fresh(cached):
+        cache.record_fresh_hit()
+        return _cached_result(url, cached, "fresh")
+    
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
         
-        response = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
+        response = get_http_session().get(url, headers=headers, timeout=timeout, allow_redirects=True)
+        
+        if response.status_code == 304 and cached:
+            cache.touch(url)
+            return _cached_result(url, cached, "revalidated")
         
         if response.status_code == 403 or response.status_code == 401:
             result["status"] = "blocked"
@@ -49,21 +112,11 @@ def fetch_web_page(url: str, timeout: int = 10) -> Dict[str, Any]:
             result["snippet"] = f"HTTP {response.status_code}"
             return result
         
-        # Parse HTML
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        # Extract title
-        title_tag = soup.find("title")
-        result["title"] = title_tag.get_text(strip=True) if title_tag else ""
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "meta", "link"]):
-            script.decompose()
-        
-        # Extract text
-        text = soup.get_text(separator=" ", strip=True)
-        # Clean up whitespace
-        text = " ".join(text.split())
+        # Extract the job description (JSON-LD, ATS containers or main content) instead of the whole page
+        page = extract_page(response.text, response.url or url)
+        result["title"] = page["title"]
+        result["metadata"] = page["metadata"] if page["job_posting"] else {}
+        text = page["text"]
         
         result["raw_text"] = text
         result["snippet"] = text[:500] if len(text) > 500 else text
@@ -72,6 +125,13 @@ def fetch_web_page(url: str, timeout: int = 10) -> Dict[str, Any]:
         # Generate content hash
         result["content_hash"] = hashlib.sha256(text.encode("utf-8")).hexdigest()
         
+        if cache:
+            cache.set(
+                url, result["title"], text, result["content_hash"],
+                response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                result["metadata"]
+            )
+        
     except requests.exceptions.Timeout:
         result["status"] = "timeout"
         result["snippet"] = "Request timeout"
@@ -85,6 +145,107 @@ def fetch_web_page(url: str, timeout: int = 10) -> Dict[str, Any]:
     return result
 
 
+def _cached_result(url: str, entry: Dict[str, Any], cache_status: str) -> Dict[str, Any]:
+    """Build a fetch result from a fetch cache entry."""
+    text = entry["raw_text"]
+    return {
+        "url": url,
+        "title": entry["title"] or "",
+        "snippet": text[:500],
+        "raw_text": text,
+        "status": "success",
+        "content_hash": entry["content_hash"],
+        "cache_status": cache_status,
+        "metadata": entry["metadata"]
+    }
+
+
+def fetch_web_pages(
+    urls: Iterable[str],
+    max_workers: Optional[int] = None,
+    per_host_limit: Optional[int] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Fetch several web pages concurrently, yielding results as they complete.
+    
+    At most max_workers requests run at once and at most per_host_limit of them
+    target the same host. Pages still pending when the overall deadline expires
+    are yielded with status "timeout" instead of being waited for.
+    
+    Args:
+        urls: URLs to fetch (duplicates are fetched once)
+        max_workers: Maximum parallel requests (defaults to settings)
+        per_host_limit: Maximum parallel requests per host (defaults to settings)
+        timeout: Per-request timeout in seconds (defaults to settings)
+        deadline: Overall time budget in seconds (defaults to settings)
+        
+    Yields:
+        Result dictionaries in the same format as fetch_web_page, in completion order
+    """
+    max_workers = max_workers or settings.fetch_max_concurrency
+    per_host_limit = per_host_limit or settings.fetch_per_host_concurrency
+    timeout = timeout or settings.fetch_timeout
+    deadline = deadline or settings.fetch_search_deadline
+    
+    pending = deque(dict.fromkeys(url for url in urls if url))
+    if not pending:
+        return
+    
+    started_at = time.monotonic()
+    in_flight = {}  # future -> (url, host)
+    host_counts: Dict[str, int] = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+    
+    try:
+        while pending or in_flight:
+            remaining = deadline - (time.monotonic() - started_at)
+            if remaining <= 0:
+                break
+            
+            # Start as many pending URLs as the global and per-host limits allow
+            skipped = deque()
+            while pending and len(in_flight) < max_workers:
+                url = pending.popleft()
+                host = urlparse(url).netloc.lower()
+                if host_counts.get(host, 0) >= per_host_limit:
+                    skipped.append(url)
+                    continue
+                host_counts[host] = host_counts.get(host, 0) + 1
+                future = executor.submit(fetch_web_page, url, min(timeout, remaining))
+                in_flight[future] = (url, host)
+            pending.extendleft(reversed(skipped))
+            
+            done, _ = wait(list(in_flight), timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, host = in_flight.pop(future)
+                host_counts[host] -= 1
+                yield future.result()
+        
+        # Deadline expired - report everything that did not finish
+        for url, _ in in_flight.values():
+            yield _deadline_result(url)
+        for url in pending:
+            yield _deadline_result(url)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _deadline_result(url: str) -> Dict[str, Any]:
+    """Build the result for a page skipped because the fetch deadline expired."""
+    return {
+        "url": url,
+        "title": "",
+        "snippet": "Fetch deadline exceeded",
+        "raw_text": "",
+        "status": "timeout",
+        "content_hash": None,
+        "cache_status": "miss",
+        "metadata": {}
+    }
+
+
 def extract_company_from_url(url: str) -> str:
     """
     Extract company name from URL if possible.
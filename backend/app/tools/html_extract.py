@@ -0,0 +1,453 @@
+"""Main-content text extraction from job posting HTML."""
+import html
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:  # pragma: no cover - lxml is in requirements.txt
+    HAS_LXML = False
+
+logger = logging.getLogger(__name__)
+
+# Version of the extraction output (text and metadata); bump it whenever extract_page
+# changes what it returns so pages cached by an older version are fetched again
+EXTRACTOR_VERSION = 2
+
+# Extracted content shorter than this is not trusted as the job description
+MIN_CONTENT_CHARS = 200
+
+# Never part of the visible text
+NON_TEXT_TAGS = ("script", "style", "noscript", "template", "svg", "iframe", "head", "meta", "link")
+# Page chrome around the posting; removed before main-content scoring
+BOILERPLATE_TAGS = ("nav", "header", "footer", "aside", "form", "button", "select")
+# Elements that start a new line of text
+BLOCK_TAGS = {
+    "address", "article", "blockquote", "br", "dd", "div", "dl", "dt", "fieldset", "figcaption",
+    "figure", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "li", "main", "ol", "p", "pre", "section",
+    "table", "td", "th", "tr", "ul",
+}
+
+# Job description containers of applicant tracking systems, tried in order per host
+# as (tag, attribute, token); a class token matches one of the element's classes
+ATS_SELECTORS = {
+    "greenhouse.io": [
+        ("div", "class", "job__description"),  # job-boards.greenhouse.io
+        ("div", "id", "content"),  # boards.greenhouse.io
+    ],
+    "lever.co": [
+        ("div", "class", "section-wrapper"),  # Headline, description and requirement lists
+        ("div", "data-qa", "job-description"),
+    ],
+}
+# Common description containers on other career sites
+GENERIC_SELECTORS = [
+    ("div", "itemprop", "description"),
+    ("div", "id", "job-description"),
+    ("div", "class", "job-description"),
+    ("section", "class", "job-description"),
+    ("div", "class", "jobDescription"),
+    ("div", "class", "job-details"),
+]
+
+# Readability-style hints in class and id attributes
+POSITIVE_HINTS = re.compile(r"content|description|article|body|main|job|posting|detail|entry|text", re.I)
+NEGATIVE_HINTS = re.compile(
+    r"nav|menu|footer|header|sidebar|cookie|banner|share|social|related|comment|breadcrumb|"
+    r"promo|modal|subscribe|signup|similar|widget|popup",
+    re.I,
+)
+# Elements whose text is scored and credited to their enclosing containers;
+# a div without block children is scored as a paragraph too
+SCORED_TAGS = ("p", "li", "pre", "td", "dd", "blockquote", "div")
+CANDIDATE_BASE_SCORES = {"article": 10, "main": 10, "section": 5, "div": 5, "td": 3, "blockquote": 3, "body": 0}
+MIN_PARAGRAPH_CHARS = 25
+# Paragraphs with more link text than this (job cards, menus) are not scored
+MAX_PARAGRAPH_LINK_DENSITY = 0.25
+# Siblings of the best candidate scoring at least this share of it are kept with it
+SIBLING_SCORE_SHARE = 0.2
+
+_WHITESPACE_RE = re.compile(r"[ \t\r\f\v\xa0]+")
+
+
+def _clean_text(text: str) -> str:
+    """Collapse whitespace inside lines and drop empty lines."""
+    lines = (_WHITESPACE_RE.sub(" ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+# ---------------------------------------------------------------------------
+# JSON-LD
+# ---------------------------------------------------------------------------
+
+def _iter_json_ld_objects(data: Any) -> Iterator[Dict[str, Any]]:
+    """Yield every object of a JSON-LD block, including @graph members."""
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_json_ld_objects(item)
+    elif isinstance(data, dict):
+        yield data
+        if "@graph" in data:
+            yield from _iter_json_ld_objects(data["@graph"])
+
+
+def find_job_posting(json_ld_blocks: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Find the schema.org JobPosting object among JSON-LD script contents.
+
+    Args:
+        json_ld_blocks: Raw contents of <script type="application/ld+json"> tags
+
+    Returns:
+        The JobPosting dict, or None if there is none (invalid blocks are skipped)
+    """
+    for block in json_ld_blocks:
+        try:
+            data = json.loads(block.strip().rstrip(";"), strict=False)
+        except ValueError:
+            continue
+        for item in _iter_json_ld_objects(data):
+            types = item.get("@type")
+            types = types if isinstance(types, list) else [types]
+            if "JobPosting" in types:
+                return item
+    return None
+
+
+def _job_posting_text(job_posting: Dict[str, Any]) -> str:
+    """Plain text of a JobPosting: title, description and requirement fields."""
+    parts = []
+    for field in ("title", "description", "responsibilities", "qualifications", "skills",
+                  "experienceRequirements", "educationRequirements"):
+        value = job_posting.get(field)
+        if isinstance(value, str) and value.strip():
+            # Descriptions are HTML, sometimes entity-escaped a second time
+            parts.append(html_fragment_text(html.unescape(value)))
+    return _clean_text("\n".join(parts))
+
+
+def _json_ld_name(value: Any) -> Optional[str]:
+    """Name of a schema.org Thing given as a dict, a plain string or a list of either."""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("name")
+    if isinstance(value, str) and value.strip():
+        return html.unescape(value).strip()
+    return None
+
+
+def _json_ld_datetime(value: Any) -> Optional[str]:
+    """ISO datetime (naive UTC) of a JSON-LD date such as "2026-08-14" or "2026-08-14T09:30:00Z"."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = datetime.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def _json_ld_location(job_posting: Dict[str, Any]) -> Optional[str]:
+    """Locations of a JobPosting as "City, Region, Country" joined by "; ", with "Remote" for telecommute jobs."""
+    places = job_posting.get("jobLocation") or []
+    places = places if isinstance(places, list) else [places]
+    locations = []
+    for place in places:
+        address = place.get("address") if isinstance(place, dict) else place
+        if isinstance(address, dict):
+            parts = [
+                _json_ld_name(address.get(field))
+                for field in ("addressLocality", "addressRegion", "addressCountry")
+            ]
+            location = ", ".join(part for part in parts if part)
+        else:
+            location = _json_ld_name(address)
+        if location and location not in locations:
+            locations.append(location)
+    location_type = job_posting.get("jobLocationType")
+    location_types = location_type if isinstance(location_type, list) else [location_type]
+    if "TELECOMMUTE" in location_types:
+        locations.insert(0, "Remote")
+    return "; ".join(locations)[:255] or None
+
+
+def job_posting_metadata(job_posting: Optional[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """
+    Structured fields of a schema.org JobPosting.
+
+    Args:
+        job_posting: JobPosting dict from find_job_posting, or None
+
+    Returns:
+        Dictionary with title, company (hiringOrganization name), date_posted
+        (ISO datetime in UTC) and location; fields the posting lacks are None
+    """
+    if not job_posting:
+        return {"title": None, "company": None, "date_posted": None, "location": None}
+    return {
+        "title": _json_ld_name(job_posting.get("title")),
+        "company": _json_ld_name(job_posting.get("hiringOrganization")),
+        "date_posted": _json_ld_datetime(job_posting.get("datePosted")),
+        "location": _json_ld_location(job_posting),
+    }
+
+
+def html_fragment_text(fragment: str) -> str:
+    """Plain text of an HTML fragment (e.g. a JSON-LD description), one line per block."""
+    if "<" not in fragment:
+        return _clean_text(fragment)
+    if HAS_LXML:
+        try:
+            return _lxml_text(lxml.html.fragment_fromstring(fragment, create_parent="div"))
+        except (etree.ParserError, ValueError):
+            return _clean_text(fragment)
+    return _clean_text(BeautifulSoup(fragment, "html.parser").get_text(separator="\n"))
+
+
+# ---------------------------------------------------------------------------
+# lxml backend
+# ---------------------------------------------------------------------------
+
+def _lxml_text(element) -> str:
+    """Visible text of an lxml element with a line break around every block element."""
+    parts = []
+    for event, node in etree.iterwalk(element, events=("start", "end")):
+        tag = node.tag if isinstance(node.tag, str) else ""  # Comments and processing instructions
+        if event == "start":
+            if tag in BLOCK_TAGS:
+                parts.append("\n")
+            if tag and node.text:
+                parts.append(node.text)
+        else:
+            if tag in BLOCK_TAGS:
+                parts.append("\n")
+            if node is not element and node.tail:
+                parts.append(node.tail)
+    return _clean_text("".join(parts))
+
+
+def _lxml_xpath(selector: Tuple[str, str, str]) -> str:
+    tag, attribute, token = selector
+    if attribute == "class":
+        return f"//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {token} ')]"
+    return f"//{tag}[@{attribute}='{token}']"
+
+
+def _lxml_select(root, selectors: List[Tuple[str, str, str]]) -> Optional[str]:
+    """Text of the elements matched by the first selector that yields enough content."""
+    for selector in selectors:
+        elements = root.xpath(_lxml_xpath(selector))
+        # Nested matches (a wrapper inside a wrapper) would repeat text
+        elements = [el for el in elements if not any(other in el.iterancestors() for other in elements)]
+        text = "\n".join(_lxml_text(el) for el in elements)
+        if len(text) >= MIN_CONTENT_CHARS:
+            return text
+    return None
+
+
+def _class_weight(element) -> int:
+    hints = f"{element.get('class', '')} {element.get('id', '')}"
+    weight = 0
+    if NEGATIVE_HINTS.search(hints):
+        weight -= 25
+    if POSITIVE_HINTS.search(hints):
+        weight += 25
+    return weight
+
+
+def _link_density(element, text_length: int) -> float:
+    if not text_length:
+        return 1.0
+    link_chars = sum(len(" ".join(a.itertext()).strip()) for a in element.iter("a"))
+    return min(1.0, link_chars / text_length)
+
+
+def _container(element):
+    """Nearest ancestor of element that can hold the main content."""
+    element = element.getparent()
+    while element is not None and element.tag not in CANDIDATE_BASE_SCORES:
+        element = element.getparent()
+    return element
+
+
+def _lxml_readability(root) -> Optional[str]:
+    """
+    Pick the main content element the way readability does.
+
+    Every paragraph-like element with some text and few links scores by its
+    length and commas; the score goes to its enclosing container and half of
+    it to the container above. Containers start from a tag base score plus
+    class/id hints and are scaled down by their link density, so navigation
+    lists, job cards and footers lose. Sibling containers that score close to
+    the best one (a description split into intro, lists and benefits) are
+    kept with it.
+    """
+    scores: Dict[Any, float] = {}
+    for paragraph in root.iter(*SCORED_TAGS):
+        if paragraph.tag == "div" and any(child.tag in BLOCK_TAGS and child.tag != "br" for child in paragraph):
+            continue
+        text = " ".join(paragraph.itertext()).strip()
+        if len(text) < MIN_PARAGRAPH_CHARS or _link_density(paragraph, len(text)) > MAX_PARAGRAPH_LINK_DENSITY:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = _container(paragraph)
+        grandparent = _container(parent) if parent is not None else None
+        for ancestor, share in ((parent, 1.0), (grandparent, 0.5)):
+            if ancestor is None:
+                continue
+            if ancestor not in scores:
+                scores[ancestor] = CANDIDATE_BASE_SCORES[ancestor.tag] + _class_weight(ancestor)
+            scores[ancestor] += score * share
+
+    for candidate in scores:
+        scores[candidate] *= 1 - _link_density(candidate, len(" ".join(candidate.itertext()).strip()))
+    best = max(scores, key=scores.get, default=None)
+    if best is None or scores[best] <= 0:
+        return None
+
+    parent = best.getparent()
+    if parent is not None:
+        siblings = [el for el in parent if el is best or scores.get(el, 0) >= scores[best] * SIBLING_SCORE_SHARE]
+        if len(siblings) > 1:
+            return "\n".join(_lxml_text(el) for el in siblings)
+    return _lxml_text(best)
+
+
+def _extract_lxml(page_html: str, selectors: List[Tuple[str, str, str]]) -> Dict[str, Any]:
+    try:
+        root = lxml.html.document_fromstring(page_html)
+    except (etree.ParserError, ValueError):
+        # Empty documents, or str input with an XML encoding declaration
+        root = lxml.html.document_fromstring(page_html.encode("utf-8", "replace"))
+
+    title_element = root.find(".//title")
+    title = _clean_text(title_element.text_content()) if title_element is not None else ""
+    json_ld = [
+        script.text or ""
+        for script in root.iter("script")
+        if (script.get("type") or "").strip().lower() == "application/ld+json"
+    ]
+
+    for element in list(root.iter(*NON_TEXT_TAGS)):
+        element.drop_tree()
+    full_text = _lxml_text(root)
+
+    text = _lxml_select(root, selectors)
+    method = "selector"
+    if text is None:
+        for element in list(root.iter(*BOILERPLATE_TAGS)):
+            element.drop_tree()
+        text = _lxml_readability(root)
+        method = "readability"
+    return {"title": title, "json_ld": json_ld, "text": text, "method": method, "full_text": full_text}
+
+
+# ---------------------------------------------------------------------------
+# html.parser fallback (no readability scoring)
+# ---------------------------------------------------------------------------
+
+def _extract_soup(page_html: str, selectors: List[Tuple[str, str, str]]) -> Dict[str, Any]:
+    soup = BeautifulSoup(page_html, "html.parser")
+    title_tag = soup.find("title")
+    title = title_tag.get_text(strip=True) if title_tag else ""
+    json_ld = [
+        script.string or ""
+        for script in soup.find_all("script", attrs={"type": re.compile(r"^\s*application/ld\+json\s*$", re.I)})
+    ]
+
+    for element in soup(list(NON_TEXT_TAGS)):
+        element.decompose()
+    full_text = _clean_text(soup.get_text(separator="\n"))
+
+    text = None
+    for tag, attribute, token in selectors:
+        selector = f"{tag}.{token}" if attribute == "class" else f"{tag}[{attribute}='{token}']"
+        elements = soup.select(selector)
+        elements = [el for el in elements if not any(parent in elements for parent in el.parents)]
+        text = "\n".join(_clean_text(el.get_text(separator="\n")) for el in elements)
+        if len(text) >= MIN_CONTENT_CHARS:
+            break
+        text = None
+    method = "selector"
+    if text is None:
+        for element in soup(list(BOILERPLATE_TAGS)):
+            element.decompose()
+        body = soup.find("main") or soup.find("article") or soup
+        text = _clean_text(body.get_text(separator="\n"))
+        method = "boilerplate_stripped"
+    return {"title": title, "json_ld": json_ld, "text": text, "method": method, "full_text": full_text}
+
+
+def selectors_for_url(url: str) -> List[Tuple[str, str, str]]:
+    """ATS selectors for the URL's host followed by the generic ones."""
+    host = urlparse(url).netloc.lower()
+    for domain, selectors in ATS_SELECTORS.items():
+        if host == domain or host.endswith("." + domain):
+            return selectors + GENERIC_SELECTORS
+    return GENERIC_SELECTORS
+
+
+def extract_page(page_html: str, url: str = "", parser: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract the job description text of an HTML page.
+
+    In order of preference the text comes from a JSON-LD JobPosting block,
+    the description container of a known applicant tracking system or career
+    site (ATS_SELECTORS, GENERIC_SELECTORS), the readability-style main
+    content element, and finally all visible text. A source is used only if it
+    yields at least MIN_CONTENT_CHARS characters. Pages are parsed with lxml,
+    or with BeautifulSoup's html.parser when lxml is not installed (which
+    skips readability scoring and only strips page chrome).
+
+    Args:
+        page_html: Page HTML
+        url: Page URL, used to pick ATS selectors
+        parser: "lxml" or "html.parser" (defaults to lxml when installed)
+
+    Returns:
+        Dictionary with:
+        - title: Page title
+        - text: Extracted text, one line per block element
+        - method: "json_ld", "selector", "readability", "boilerplate_stripped" or "full_page"
+        - job_posting: The JSON-LD JobPosting dict, or None
+        - metadata: job_posting_metadata of it (all None without one)
+        - parser: Parser used
+    """
+    parser = parser or ("lxml" if HAS_LXML else "html.parser")
+    if parser == "lxml" and not HAS_LXML:
+        logger.warning("lxml is not installed; parsing HTML with html.parser")
+        parser = "html.parser"
+    selectors = selectors_for_url(url)
+    page = _extract_lxml(page_html, selectors) if parser == "lxml" else _extract_soup(page_html, selectors)
+
+    job_posting = find_job_posting(page["json_ld"])
+    text, method = page["text"], page["method"]
+    if job_posting:
+        posting_text = _job_posting_text(job_posting)
+        if len(posting_text) >= MIN_CONTENT_CHARS:
+            text, method = posting_text, "json_ld"
+    if not text or len(text) < MIN_CONTENT_CHARS:
+        text, method = page["full_text"], "full_page"
+
+    return {
+        "title": page["title"],
+        "text": text,
+        "method": method,
+        "job_posting": job_posting,
+        "metadata": job_posting_metadata(job_posting),
+        "parser": parser,
+    }
@@ -1,7 +1,152 @@
 """PDF text extraction tool."""
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
 import pdfplumber
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Get the shared extraction process pool, creating it on first use."""
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                # spawn: forking a multi-threaded server process is not safe
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=settings.pdf_extract_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _process_pool
+
+
+def _reset_process_pool(pool: ProcessPoolExecutor) -> None:
+    """Discard a broken pool so the next extraction starts a fresh one."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_process_pool() -> None:
+    """Stop the extraction worker processes (app shutdown), cancelling queued page ranges."""
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _page_text(page_num: int, text: Optional[str]) -> str:
+    return text if text else f"[Page {page_num}: No text content found]"
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[Dict[str, Any]]:
+    """
+    Extract pages [start, end) of a PDF, flushing each page's cache after use.
+    
+    Runs inside a worker process, so it opens its own handle on the file.
+    """
+    pages = []
+    with pdfplumber.open(pdf_path, pages=list(range(start + 1, end + 1))) as pdf:
+        for page in pdf.pages:
+            page_start = time.perf_counter()
+            text = page.extract_text()
+            page.close()  # Drop cached layout objects so memory stays flat
+            pages.append({
+                "page_num": page.page_number,
+                "text": _page_text(page.page_number, text),
+                "has_text": bool(text),
+                "seconds": time.perf_counter() - page_start,
+            })
+    return pages
+
+
+def iter_pdf_pages(pdf_path: str, workers: Optional[int] = None,
+                   pages_per_task: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield page text in page order, extracting page ranges in parallel.
+    
+    Page ranges of settings.pdf_pages_per_task pages are spread over a process
+    pool. Pages are yielded as soon as their range and all earlier ranges are
+    done. Small documents are extracted in-process.
+    
+    Args:
+        pdf_path: Path to PDF file
+        workers: Worker processes (defaults to settings.pdf_extract_workers)
+        pages_per_task: Pages per task (defaults to settings.pdf_pages_per_task)
+        
+    Yields:
+        Dicts with page_num, text, has_text and seconds (extraction time)
+    """
+    workers = workers or settings.pdf_extract_workers
+    pages_per_task = max(1, pages_per_task or settings.pdf_pages_per_task)
+    
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+    ranges = [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+    
+    if workers <= 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            yield from _extract_page_range(pdf_path, start, end)
+        return
+    
+    pool = _get_process_pool()
+    futures = [pool.submit(_extract_page_range, pdf_path, start, end) for start, end in ranges]
+    try:
+        for i, future in enumerate(futures):
+            try:
+                pages = future.result()
+            except BrokenProcessPool:
+                # A worker died; drop the pool and finish the remaining ranges in-process
+                logger.error("PDF extraction pool broke, continuing in-process")
+                _reset_process_pool(pool)
+                for start, end in ranges[i:]:
+                    yield from _extract_page_range(pdf_path, start, end)
+                return
+            yield from pages
+    finally:
+        # Cancel queued ranges and wait for running ones, so no worker still has the file open
+        for future in futures:
+            future.cancel()
+        wait(futures)
+
+
+def _join_pages(pages: Iterator[Dict[str, Any]]) -> Tuple[str, bool]:
+    """Join page texts, logging slow pages and an extraction summary."""
+    text_parts = []
+    timings = []
+    started = time.perf_counter()
+    for page in pages:
+        text_parts.append(page["text"])
+        timings.append((page["seconds"], page["page_num"]))
+        if page["seconds"] > settings.pdf_slow_page_seconds:
+            logger.warning(f"Slow PDF page {page['page_num']}: {page['seconds']:.2f}s")
+    
+    if timings:
+        slowest = ", ".join(f"p{num} {secs:.2f}s" for secs, num in sorted(timings, reverse=True)[:3])
+        logger.info(
+            f"Extracted {len(timings)} PDF pages in {time.perf_counter() - started:.2f}s "
+            f"(page time {sum(secs for secs, _ in timings):.2f}s, slowest: {slowest})"
+        )
+    
+    full_text = "\n\n".join(text_parts)
+    # If no text extracted, might need OCR in future
+    ocr_used = not full_text.strip()
+    return full_text, ocr_used
 
 
 def extract_text_from_pdf(pdf_path: str) -> Tuple[str, bool]:
@@ -16,33 +161,32 @@ def extract_text_from_pdf(pdf_path: str) -> Tuple[str, bool]:
         - extracted_text: Full text content
         - ocr_used: Whether OCR was needed (currently always False)
     """
-    text_parts = []
-    ocr_used = False
-    
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
-                else:
-                    # Page has no extractable text - might need OCR
-                    # For now, just note it
-                    text_parts.append(f"[Page {page_num}: No text content found]")
-        
-        full_text = "\n\n".join(text_parts)
-        
-        # If no text extracted, might need OCR in future
-        # For now, we'll just return what we have
-        if not full_text.strip():
-            ocr_used = True  # Would use OCR here
-        
-        return full_text, ocr_used
-        
+        return _join_pages(iter_pdf_pages(pdf_path))
     except Exception as e:
         raise Exception(f"Error extracting text from PDF: {str(e)}")
 
 
+def iter_pages_from_bytes(pdf_bytes: bytes, workers: Optional[int] = None,
+                          pages_per_task: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield page text from PDF bytes in page order (see iter_pdf_pages).
+    
+    The upload is spooled to a temporary file so worker processes can open it
+    without each receiving a copy of the bytes.
+    """
+    fd, pdf_path = tempfile.mkstemp(suffix=".pdf", prefix="upload_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        yield from iter_pdf_pages(pdf_path, workers, pages_per_task)
+    finally:
+        try:
+            os.unlink(pdf_path)
+        except OSError as e:
+            logger.warning(f"Could not remove temporary PDF {pdf_path}: {e}")
+
+
 def extract_text_from_bytes(pdf_bytes: bytes) -> Tuple[str, bool]:
     """
     Extract text from PDF bytes (for uploaded files).
@@ -53,28 +197,7 @@ def extract_text_from_bytes(pdf_bytes: bytes) -> Tuple[str, bool]:
     Returns:
         Tuple of (extracted_text, ocr_used)
     """
-    import io
-    
-    text_parts = []
-    ocr_used = False
-    
     try:
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
-                else:
-                    text_parts.append(f"[Page {page_num}: No text content found]")
-        
-        full_text = "\n\n".join(text_parts)
-        
-        if not full_text.strip():
-            ocr_used = True
-        
-        return full_text, ocr_used
-        
+        return _join_pages(iter_pages_from_bytes(pdf_bytes))
     except Exception as e:
         raise Exception(f"Error extracting text from PDF bytes: {str(e)}")
-
-
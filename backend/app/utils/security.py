@@ -1,6 +1,6 @@
 """Security utilities for prompt injection detection."""
 import re
-from typing import List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 # Common prompt injection patterns
@@ -19,6 +19,120 @@ INJECTION_PATTERNS = [
 ]
 
 
+# Longest stretch of text a single match is expected to span; streamed scans
+# carry this much text over between chunks so no match is split
+INJECTION_MAX_MATCH_CHARS = 256
+
+
+def _compile_scanner(patterns: List[str]) -> Tuple[re.Pattern, List[re.Pattern]]:
+    """
+    Compile the patterns into one alternation plus the individual patterns.
+    
+    The alternation uses non-capturing branches and no IGNORECASE (text is
+    lowercased first), which lets the regex engine skip ahead on the branches'
+    first characters; named groups or IGNORECASE disable that and are several
+    times slower. Hits are rare, so the pattern id of each hit is found by
+    trying the patterns in order at the hit, which picks the same branch.
+    """
+    # Patterns with uppercase characters (or escapes like \S) cannot rely on lowercased text
+    flags = 0 if all(p == p.lower() for p in patterns) else re.IGNORECASE
+    alternation = re.compile("|".join(f"(?:{p})" for p in patterns), flags)
+    return alternation, [re.compile(p, flags) for p in patterns]
+
+
+_SCANNER, _COMPILED_PATTERNS = _compile_scanner(INJECTION_PATTERNS)
+
+
+def _scan(text: str, pos: int = 0, limit: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+    """
+    Single pass over lowercased text yielding non-overlapping (pattern_id, start, end), leftmost first.
+    
+    Matches are reported only if they start before limit (default: end of text).
+    """
+    limit = len(text) if limit is None else limit
+    for match in _SCANNER.finditer(text, pos):
+        if match.start() >= limit:
+            break
+        pattern_id = next(i for i, compiled in enumerate(_COMPILED_PATTERNS) if compiled.match(text, match.start()))
+        yield pattern_id, match.start(), match.end()
+
+
+def _lowercase(text: str) -> str:
+    """Lowercase text for scanning, keeping offsets valid (casefolding that changes length is skipped)."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+def _match_dict(text: str, pattern_id: int, start: int, end: int, offset: int = 0) -> Dict[str, Any]:
+    return {
+        "pattern_id": pattern_id,
+        "pattern": INJECTION_PATTERNS[pattern_id],
+        "start": offset + start,
+        "end": offset + end,
+        "text": text[start:end],
+    }
+
+
+def scan_injections(text: str) -> List[Dict[str, Any]]:
+    """
+    Find all prompt injection matches in one pass over the text.
+    
+    Like a single alternation of INJECTION_PATTERNS, matches do not overlap and
+    the leftmost wins; matching ignores case.
+    
+    Args:
+        text: Text to scan
+        
+    Returns:
+        List of dicts with pattern_id (index into INJECTION_PATTERNS), pattern,
+        start, end (offsets into text) and the matched text
+    """
+    return [_match_dict(text, *match) for match in _scan(_lowercase(text))]
+
+
+def scan_injections_stream(
+    chunks: Iterable[str],
+    overlap: int = INJECTION_MAX_MATCH_CHARS
+) -> Iterator[Dict[str, Any]]:
+    """
+    Scan text arriving in chunks (e.g. PDF pages) without joining it first.
+    
+    The last overlap characters of each chunk are held back and scanned with
+    the next one, so a match crossing a chunk boundary is found once. Results
+    equal scan_injections("".join(chunks)) for matches up to overlap characters.
+    
+    Args:
+        chunks: Text chunks in order
+        overlap: Characters carried over between chunks
+        
+    Yields:
+        Match dicts as in scan_injections, with offsets into the joined text
+    """
+    buffer = ""
+    offset = 0  # Position of buffer[0] in the joined text
+    resume = 0  # Position in buffer where scanning continues
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        # Matches starting in the last overlap characters wait for the next chunk
+        limit = max(resume, len(buffer) - overlap)
+        for pattern_id, start, end in _scan(_lowercase(buffer), resume, limit):
+            yield _match_dict(buffer, pattern_id, start, end, offset)
+            resume = end
+        resume = max(resume, limit)
+        # Keep only what the next scan can still reach
+        drop = min(resume, len(buffer) - overlap)
+        if drop > 0:
+            buffer = buffer[drop:]
+            offset += drop
+            resume -= drop
+    for pattern_id, start, end in _scan(_lowercase(buffer), resume):
+        yield _match_dict(buffer, pattern_id, start, end, offset)
+
+
 def detect_injection_patterns(text: str) -> bool:
     """
     Detect potential prompt injection patterns in text.
@@ -29,35 +143,123 @@ def detect_injection_patterns(text: str) -> bool:
     Returns:
         True if suspicious patterns found, False otherwise
     """
-    text_lower = text.lower()
+    return next(_scan(_lowercase(text)), None) is not None
+
+
+# Policies for text that contains injection matches
+SANITIZE_POLICIES = {"flag", "redact", "drop"}
+# Units cut out around a match under the "redact" policy
+REDACT_SCOPES = {"sentence", "paragraph"}
+# Put in place of each removed span so the model sees that text was cut
+REDACTION_MARKER = "[removed]"
+
+# Sentence ends at terminal punctuation before whitespace or at a line break;
+# paragraphs end at blank lines
+_SENTENCE_BOUNDARY = re.compile(r"[.!?]+(?=\s)|\n")
+_PARAGRAPH_BOUNDARY = re.compile(r"\n\s*\n")
+# Longest stretch searched for a boundary on either side of a match, so text
+# without punctuation or blank lines does not lose everything around a hit
+_SCOPE_MAX_CHARS = {"sentence": 1000, "paragraph": 3000}
+
+
+def _unit_bounds(text: str, start: int, end: int, scope: str) -> Tuple[int, int]:
+    """Offsets of the sentence or paragraph around text[start:end], without surrounding whitespace."""
+    boundary = _SENTENCE_BOUNDARY if scope == "sentence" else _PARAGRAPH_BOUNDARY
+    max_chars = _SCOPE_MAX_CHARS[scope]
     
-    for pattern in INJECTION_PATTERNS:
-        if re.search(pattern, text_lower, re.IGNORECASE):
-            return True
+    unit_start = max(0, start - max_chars)
+    for match in boundary.finditer(text, unit_start, start):
+        unit_start = match.end()
+    while unit_start < start and text[unit_start].isspace():
+        unit_start += 1
     
-    return False
+    window_end = min(len(text), end + max_chars)
+    match = boundary.search(text, end, window_end)
+    if match is None:
+        unit_end = window_end
+    else:
+        # Keep line breaks and blank lines; punctuation goes with the sentence
+        unit_end = match.start() if text[match.start()].isspace() else match.end()
+    return unit_start, unit_end
+
+
+def _merge_spans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge sorted (start, end) spans that overlap or touch."""
+    merged = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
 
 
-def sanitize_text(text: str) -> str:
+def sanitize_with_report(text: str, policy: str = "redact", scope: str = "sentence") -> Dict[str, Any]:
     """
-    Sanitize text by removing suspicious patterns.
-    Keep only factual content.
+    Sanitize text against prompt injection without an LLM call.
+    
+    Matches come from one scan_injections pass. Under "flag" the text is
+    returned unchanged; under "redact" the sentence or paragraph (scope)
+    around every match is replaced by REDACTION_MARKER; under "drop" the whole
+    text is discarded if anything matched.
     
     Args:
         text: Text to sanitize
+        policy: "flag", "redact" or "drop"
+        scope: "sentence" or "paragraph" (redact only)
+        
+    Returns:
+        Dict with text (sanitized; empty if dropped), action ("clean",
+        "flagged", "redacted" or "dropped"), matches (as in scan_injections)
+        and removed_chars
+    """
+    if policy not in SANITIZE_POLICIES:
+        raise ValueError(f"Unknown sanitize policy '{policy}'; expected one of {sorted(SANITIZE_POLICIES)}")
+    if scope not in REDACT_SCOPES:
+        raise ValueError(f"Unknown redact scope '{scope}'; expected one of {sorted(REDACT_SCOPES)}")
+    
+    matches = scan_injections(text) if text else []
+    if not matches:
+        return {"text": text, "action": "clean", "matches": [], "removed_chars": 0}
+    if policy == "flag":
+        return {"text": text, "action": "flagged", "matches": matches, "removed_chars": 0}
+    if policy == "drop":
+        return {"text": "", "action": "dropped", "matches": matches, "removed_chars": len(text)}
+    
+    spans = _merge_spans([_unit_bounds(text, m["start"], m["end"], scope) for m in matches])
+    parts = []
+    position = 0
+    for start, end in spans:
+        parts.append(text[position:start])
+        parts.append(REDACTION_MARKER)
+        position = end
+    parts.append(text[position:])
+    removed = sum(end - start for start, end in spans)
+    return {"text": "".join(parts), "action": "redacted", "matches": matches, "removed_chars": removed}
+
+
+def sanitize_text(text: str, policy: str = "redact", scope: str = "sentence") -> str:
+    """
+    Sanitize text by removing suspicious sections.
+    
+    Args:
+        text: Text to sanitize
+        policy: "flag", "redact" or "drop" (see sanitize_with_report)
+        scope: "sentence" or "paragraph"
         
     Returns:
         Sanitized text
     """
-    # For now, just detect and log
-    # In production, might want to remove suspicious sections
-    if detect_injection_patterns(text):
+    result = sanitize_with_report(text, policy, scope)
+    if result["matches"]:
         # Log the detection
-        print(f"[SECURITY] Detected potential injection pattern in text (length: {len(text)})")
-        # Could filter out suspicious sections here
-        # For now, return as-is but flag it
-    
-    return text
+        pattern_ids = sorted({m["pattern_id"] for m in result["matches"]})
+        print(
+            f"[SECURITY] Detected {len(result['matches'])} potential injection pattern match(es) in text "
+            f"(length: {len(text)}, pattern ids: {pattern_ids}, action: {result['action']}, "
+            f"removed chars: {result['removed_chars']})"
+        )
+    return result["text"]
 
 
 def get_injection_details(text: str) -> List[str]:
@@ -68,16 +270,7 @@ def get_injection_details(text: str) -> List[str]:
         text: Text to analyze
         
     Returns:
-        List of detected patterns
+        List of detected patterns, in INJECTION_PATTERNS order
     """
-    detected = []
-    text_lower = text.lower()
-    
-    for pattern in INJECTION_PATTERNS:
-        matches = re.findall(pattern, text_lower, re.IGNORECASE)
-        if matches:
-            detected.append(pattern)
-    
-    return detected
-
-
+    pattern_ids = {m["pattern_id"] for m in scan_injections(text)}
+    return [INJECTION_PATTERNS[i] for i in sorted(pattern_ids)]
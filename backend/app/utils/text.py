@@ -106,9 +106,10 @@ def normalize_topic(topic: str) -> str:
 
 def compute_embedding_similarity(text1: str, text2: str) -> float:
     """
-    Compute similarity between two texts (placeholder for embedding-based similarity).
+    Compute cosine similarity between two texts with the local hashing vectorizer.
     
-    For now, uses simple word overlap. Could be enhanced with embeddings.
+    For many pairs, use app.services.topic_vectors.similarity_matrix, which
+    stores vectors and compares all pairs in one matrix product.
     
     Args:
         text1: First text
@@ -117,19 +118,11 @@ def compute_embedding_similarity(text1: str, text2: str) -> float:
     Returns:
         Similarity score 0-1
     """
-    # Simple word overlap-based similarity
-    words1 = set(normalize_topic(text1).split())
-    words2 = set(normalize_topic(text2).split())
+    from app.core.config import settings
+    from app.tools.embeddings import HashingEmbedder
     
-    if not words1 or not words2:
+    if not normalize_topic(text1) or not normalize_topic(text2):
         return 0.0
     
-    intersection = words1.intersection(words2)
-    union = words1.union(words2)
-    
-    if not union:
-        return 0.0
-    
-    return len(intersection) / len(union)
-
-
+    vectors = HashingEmbedder(settings.embedding_dim).embed([normalize_topic(text1), normalize_topic(text2)])
+    return max(0.0, float(vectors[0] @ vectors[1]))
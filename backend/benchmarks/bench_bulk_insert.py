@@ -0,0 +1,96 @@
+"""Benchmark per-row vs bulk inserts for a 10-posting, 300-topic search.
+
+Run from the backend directory:
+    python benchmarks/bench_bulk_insert.py
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Use a throwaway SQLite file so fsync costs are included in the measurement
+_db_dir = tempfile.mkdtemp(prefix="bench_bulk_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/bench.db"
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db.session import init_db, SessionLocal
+from app.db.models import Conversation, JobSource, JobTopic
+from app.db.repositories.job_source_repo import create_job_source, create_job_sources
+from app.db.repositories.job_topic_repo import create_job_topic, create_job_topics
+
+POSTINGS = 10
+TOPICS_PER_POSTING = 30
+ROUNDS = 3
+
+
+def source_row(conversation_id: str, i: int) -> dict:
+    return {
+        "conversation_id": conversation_id,
+        "url": f"https://boards.greenhouse.io/example/jobs/{i}",
+        "title": f"Data Engineer {i}",
+        "raw_text": "Build data pipelines with SQL and Python. " * 50,
+        "access_status": "success",
+        "content_hash": f"{i:064d}",
+    }
+
+
+def topic_row(conversation_id: str, source_id: int, j: int) -> dict:
+    return {
+        "conversation_id": conversation_id,
+        "job_source_id": source_id,
+        "normalized_topic": f"topic {j}",
+        "raw_topic": f"Topic {j}",
+        "frequency_weight": 1.0,
+        "confidence": 0.9,
+    }
+
+
+def per_row(db, conversation_id: str) -> int:
+    rows = 0
+    for i in range(POSTINGS):
+        source = create_job_source(db, JobSource(**source_row(conversation_id, i)))
+        rows += 1
+        for j in range(TOPICS_PER_POSTING):
+            create_job_topic(db, JobTopic(**topic_row(conversation_id, source.id, j)))
+            rows += 1
+    return rows
+
+
+def bulk(db, conversation_id: str) -> int:
+    source_ids = create_job_sources(db, [source_row(conversation_id, i) for i in range(POSTINGS)])
+    topics = [
+        topic_row(conversation_id, source_id, j)
+        for source_id in source_ids
+        for j in range(TOPICS_PER_POSTING)
+    ]
+    return len(source_ids) + create_job_topics(db, topics)
+
+
+def run(label: str, insert_fn) -> float:
+    best = None
+    for round_num in range(ROUNDS):
+        db = SessionLocal()
+        conversation_id = f"{label}-{round_num}"
+        db.add(Conversation(conversation_id=conversation_id, status="active"))
+        db.commit()
+        start = time.perf_counter()
+        rows = insert_fn(db, conversation_id)
+        elapsed = time.perf_counter() - start
+        db.close()
+        rate = rows / elapsed
+        best = rate if best is None else max(best, rate)
+    print(f"   {label:<8} {rows:>5} rows   best {best:>10,.0f} rows/sec")
+    return best
+
+
+if __name__ == "__main__":
+    init_db()
+    print("=" * 60)
+    print(f"BULK INSERT BENCHMARK ({POSTINGS} postings, {POSTINGS * TOPICS_PER_POSTING} topics)")
+    print("=" * 60)
+    before = run("per-row", per_row)
+    after = run("bulk", bulk)
+    print(f"\n   Speedup: {after / before:.1f}x")
@@ -0,0 +1,93 @@
+"""Benchmark concurrent chat-style commits against the default and the tuned SQLite engine.
+
+Each worker thread behaves like a /chat request: read the conversation's
+history, then insert a message and commit. The default engine is what
+db.session used to build (rollback journal, synchronous=FULL, default pool);
+the tuned engine comes from create_db_engine (WAL, synchronous=NORMAL,
+busy_timeout, cache and mmap pragmas, sized pool).
+
+Run from the backend directory:
+    python benchmarks/bench_concurrent_writes.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.db.session import Base, create_db_engine
+from app.db.models import Conversation, ChatMessage
+
+THREADS = 16
+MESSAGES_PER_THREAD = 50
+
+
+def default_engine(url: str):
+    # The engine db.session created before the tuning layer
+    return create_engine(url, connect_args={"check_same_thread": False})
+
+
+def worker(session_factory, conversation_id: str, counts: dict, lock: threading.Lock) -> None:
+    ok = failed = 0
+    for i in range(MESSAGES_PER_THREAD):
+        db = session_factory()
+        try:
+            db.execute(
+                select(func.count()).select_from(ChatMessage).where(ChatMessage.conversation_id == conversation_id)
+            ).scalar_one()
+            db.add(ChatMessage(conversation_id=conversation_id, role="user", content=f"message {i} " * 20))
+            db.commit()
+            ok += 1
+        except OperationalError:
+            db.rollback()
+            failed += 1
+        finally:
+            db.close()
+    with lock:
+        counts["ok"] += ok
+        counts["failed"] += failed
+
+
+def run(label: str, db_engine) -> float:
+    Base.metadata.create_all(bind=db_engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+    with session_factory() as db:
+        for t in range(THREADS):
+            db.add(Conversation(conversation_id=f"{label}-{t}", status="active"))
+        db.commit()
+
+    counts = {"ok": 0, "failed": 0}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(session_factory, f"{label}-{t}", counts, lock))
+        for t in range(THREADS)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    db_engine.dispose()
+
+    rate = counts["ok"] / elapsed
+    print(f"   {label:<8} {counts['ok']:>5} commits   {counts['failed']:>4} locked   {rate:>8,.0f} commits/sec")
+    return rate
+
+
+if __name__ == "__main__":
+    db_dir = tempfile.mkdtemp(prefix="bench_writes_")
+    print("=" * 60)
+    print(f"CONCURRENT WRITE BENCHMARK ({THREADS} threads x {MESSAGES_PER_THREAD} commits)")
+    print("=" * 60)
+    before = run("default", default_engine(f"sqlite:///{db_dir}/default.db"))
+    after = run("tuned", create_db_engine(f"sqlite:///{db_dir}/tuned.db"))
+    print(f"\n   Speedup: {after / before:.1f}x")
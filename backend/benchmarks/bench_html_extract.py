@@ -0,0 +1,94 @@
+"""Benchmark HTML text extraction speed and quality on saved job posting pages.
+
+Compares the previous fetch_tool extraction (BeautifulSoup html.parser, all
+visible text) with html_extract.extract_page on lxml and on its html.parser
+fallback. Quality is measured on the first 5000 characters, the part of a
+page verify_and_store sends to topic extraction: recall is the share of the
+fixture's expected job requirement phrases found there, boilerplate the
+share of its navigation/footer phrases that leaked in.
+
+Fixtures and their expected phrases are in benchmarks/fixtures/html/.
+
+Run from the backend directory:
+    python benchmarks/bench_html_extract.py
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+from app.tools.html_extract import HAS_LXML, extract_page
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "html"
+TEXT_BUDGET = 5000  # Characters of a page verify_and_store keeps
+ROUNDS = 20
+
+
+def legacy(page_html: str, url: str) -> str:
+    # The extraction fetch_web_page did before html_extract
+    soup = BeautifulSoup(page_html, "html.parser")
+    for script in soup(["script", "style", "meta", "link"]):
+        script.decompose()
+    return " ".join(soup.get_text(separator=" ", strip=True).split())
+
+
+def extract_lxml(page_html: str, url: str) -> str:
+    return extract_page(page_html, url, parser="lxml")["text"]
+
+
+def extract_fallback(page_html: str, url: str) -> str:
+    return extract_page(page_html, url, parser="html.parser")["text"]
+
+
+def measure(extract_fn, page_html: str, url: str, expected: dict) -> dict:
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        text = extract_fn(page_html, url)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    kept = text[:TEXT_BUDGET]
+    return {
+        "ms": best * 1000,
+        "chars": len(text),
+        "recall": sum(phrase in kept for phrase in expected["expected"]) / len(expected["expected"]),
+        "boilerplate": sum(phrase in kept for phrase in expected["boilerplate"]) / len(expected["boilerplate"]),
+    }
+
+
+if __name__ == "__main__":
+    manifest = json.loads((FIXTURES / "expected.json").read_text(encoding="utf-8"))
+    extractors = [("legacy", legacy), ("lxml", extract_lxml), ("fallback", extract_fallback)]
+    if not HAS_LXML:
+        extractors = [e for e in extractors if e[0] != "lxml"]
+
+    print("=" * 78)
+    print(f"HTML EXTRACTION BENCHMARK ({len(manifest)} fixtures, best of {ROUNDS})")
+    print("=" * 78)
+    print(f"   {'fixture':<28} {'extractor':<9} {'KB':>6} {'ms':>8} {'chars':>7} {'recall':>7} {'boiler':>7}")
+    totals = {label: {"ms": 0.0, "recall": 0.0, "boilerplate": 0.0} for label, _ in extractors}
+    for name, expected in manifest.items():
+        page_html = (FIXTURES / name).read_text(encoding="utf-8")
+        for label, extract_fn in extractors:
+            stats = measure(extract_fn, page_html, expected["url"], expected)
+            for key in totals[label]:
+                totals[label][key] += stats[key]
+            print(
+                f"   {name[:28]:<28} {label:<9} {len(page_html) / 1024:>6.0f} {stats['ms']:>8.2f} "
+                f"{stats['chars']:>7} {stats['recall']:>7.0%} {stats['boilerplate']:>7.0%}"
+            )
+
+    print("\n   Totals")
+    for label, total in totals.items():
+        print(
+            f"   {label:<9} {total['ms']:>8.2f} ms   recall {total['recall'] / len(manifest):>5.0%}   "
+            f"boilerplate {total['boilerplate'] / len(manifest):>5.0%}"
+        )
+    if "lxml" in totals:
+        print(f"\n   Speedup over legacy: {totals['legacy']['ms'] / totals['lxml']['ms']:.1f}x")
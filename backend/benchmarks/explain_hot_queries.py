@@ -0,0 +1,140 @@
+"""Check that the hot repository queries use indexes instead of full table scans.
+
+Runs the chat history, posting dedup and job topic aggregation queries
+through their repository functions, captures the SQL they emit and runs
+EXPLAIN on each. Exits with status 1 if any plan reads a whole table or a
+whole index: on SQLite every access to a hot table must be a "SEARCH" (an
+index or key lookup bounded by a key prefix), and on PostgreSQL (with seq
+scans disabled) no hot table may get a "Seq Scan" or an index scan without
+an index condition. test_hot_query_plans.py runs the same check under pytest.
+
+Run from the backend directory (uses DATABASE_URL if set, else a throwaway SQLite file):
+    python benchmarks/explain_hot_queries.py
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='explain_')}/explain.db"
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event, text
+from app.db.session import engine, init_db, SessionLocal
+from app.db.models import Conversation, JobSource, JobTopic, ChatMessage
+from app.db.repositories.chat_message_repo import get_conversation_messages
+from app.db.repositories.job_source_repo import get_source_by_hash
+from app.db.repositories import job_topic_repo
+
+CONVERSATIONS = 20
+POSTINGS = 10
+TOPICS_PER_POSTING = 10
+TABLES = {"chat_messages", "job_sources", "job_topics"}
+
+
+def seed(db) -> str:
+    for c in range(CONVERSATIONS):
+        conversation_id = f"explain-{c}"
+        db.add(Conversation(conversation_id=conversation_id, status="active"))
+        db.flush()
+        for m in range(10):
+            db.add(ChatMessage(conversation_id=conversation_id, role="user", content=f"message {m}"))
+        for p in range(POSTINGS):
+            source = JobSource(conversation_id=conversation_id, url=f"https://example.com/{c}/{p}", content_hash=f"{c}-{p}")
+            db.add(source)
+            db.flush()
+            for t in range(TOPICS_PER_POSTING):
+                db.add(JobTopic(
+                    conversation_id=conversation_id, job_source_id=source.id,
+                    normalized_topic=f"topic {t}", raw_topic=f"Topic {t}", confidence=0.9
+                ))
+    db.commit()
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text("ANALYZE"))
+    return "explain-0"
+
+
+def capture(db, label: str, run, captured: list) -> None:
+    """Run a repository call and record every SELECT it sends to the database."""
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((label, statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = run()
+        if hasattr(result, "__next__"):
+            list(result)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _unbounded_pg_scans(node: dict) -> list:
+    """Nodes of a PostgreSQL JSON plan that read a whole hot table or index."""
+    found = []
+    relation = node.get("Relation Name")
+    if relation in TABLES:
+        if node["Node Type"] == "Seq Scan":
+            found.append(f"Seq Scan on {relation}")
+        elif node["Node Type"] in ("Index Scan", "Index Only Scan") and "Index Cond" not in node:
+            found.append(f"{node['Node Type']} using {node.get('Index Name')} on {relation} without Index Cond")
+    for child in node.get("Plans", []):
+        found.extend(_unbounded_pg_scans(child))
+    return found
+
+
+def full_scans(db, statement: str, parameters) -> list:
+    """Plan lines that read a whole hot table or a whole index of one."""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SET enable_seqscan = off"))
+        with db.connection().connection.cursor() as cursor:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = cursor.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return _unbounded_pg_scans(plan[0]["Plan"])
+    cursor = db.connection().connection.cursor()
+    cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+    plan = [row[-1] for row in cursor.fetchall()]
+    cursor.close()
+    # "SEARCH <table> ..." is bounded by a key; "SCAN <table>" reads every row,
+    # with or without "USING (COVERING) INDEX". Subquery and co-routine scans are fine.
+    return [line for line in plan if line.startswith("SCAN ") and line.split()[1] in TABLES]
+
+
+def hot_query_plans() -> List[Tuple[str, list]]:
+    """
+    Seed the database, run the hot repository queries and check their plans.
+
+    Returns:
+        (label, full scans) for every captured statement; no scans means the plan is fine
+    """
+    init_db()
+    db = SessionLocal()
+    try:
+        conversation_id = seed(db)
+        captured = []
+        capture(db, "get_conversation_messages", lambda: get_conversation_messages(db, conversation_id), captured)
+        capture(db, "get_source_by_hash", lambda: get_source_by_hash(db, "0-1", conversation_id), captured)
+        capture(db, "count_topics_by_conversation", lambda: job_topic_repo.count_topics_by_conversation(db, conversation_id), captured)
+        capture(db, "get_topic_frequencies", lambda: job_topic_repo.get_topic_frequencies(db, conversation_id), captured)
+        capture(db, "iter_topic_postings", lambda: job_topic_repo.iter_topic_postings(db, conversation_id), captured)
+        capture(db, "iter_topic_phrasings", lambda: job_topic_repo.iter_topic_phrasings(db, conversation_id), captured)
+        return [(label, full_scans(db, statement, parameters)) for label, statement, parameters in captured]
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("HOT QUERY PLANS")
+    print("=" * 60)
+    failed = False
+    for label, scans in hot_query_plans():
+        print(f"   {'FAIL' if scans else 'ok':<5} {label}" + (f": {'; '.join(scans)}" if scans else ""))
+        failed = failed or bool(scans)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,211 @@
+"""
+Test the async repositories end-to-end on aiosqlite, and on asyncpg when
+DATABASE_URL points at PostgreSQL (skipped otherwise).
+"""
+import asyncio
+import os
+import tempfile
+import uuid
+
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "test")
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+import app.db.models  # noqa: F401  (registers the tables)
+from app.core.config import settings
+from app.db import session as session_module
+from app.db.migrations import get_applied_migrations, run_migrations
+from app.db.migrations.runner import MIGRATION_LOCK_KEY, discover_migrations
+from app.db.models import AnalysisRun, BackgroundJob, Document
+from app.db.repositories.aio import (
+    analysis_repo, background_job_repo, canonical_topic_repo, chat_message_repo, conversation_repo,
+    document_repo, job_source_repo, job_topic_repo, posting_topic_repo, syllabus_topic_repo, topic_embedding_repo,
+)
+from app.db.session import Base, async_database_url, create_async_db_engine, create_db_engine
+
+POSTGRES_URL = os.environ.get("DATABASE_URL", "")
+DATABASES = [
+    pytest.param("sqlite", id="aiosqlite"),
+    pytest.param(POSTGRES_URL, id="asyncpg", marks=pytest.mark.skipif(
+        not POSTGRES_URL.startswith(("postgresql", "postgres://")), reason="DATABASE_URL is not PostgreSQL"
+    )),
+]
+
+
+@pytest.fixture(params=DATABASES)
+def database_url(request):
+    """Database migrated through the sync engine, as init_db does."""
+    if request.param == "sqlite":
+        database_url = f"sqlite:///{tempfile.mkdtemp()}/async.db"
+    else:
+        database_url = request.param
+    db_engine = create_db_engine(database_url)
+    try:
+        Base.metadata.create_all(bind=db_engine)
+        run_migrations(db_engine)
+        with db_engine.connect() as connection:
+            assert get_applied_migrations(connection) == list(discover_migrations())
+    finally:
+        db_engine.dispose()
+    return database_url
+
+
+def test_async_driver_mapping():
+    assert async_database_url("sqlite:///app.db") == "sqlite+aiosqlite:///app.db"
+    assert async_database_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert async_database_url("postgres://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert async_database_url("postgresql+psycopg://u:p@db/app") == "postgresql+psycopg://u:p@db/app"
+    assert async_database_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+
+
+def test_migrations_are_idempotent(database_url):
+    db_engine = create_db_engine(database_url)
+    try:
+        assert run_migrations(db_engine) == []
+    finally:
+        db_engine.dispose()
+
+
+def test_postgres_migration_lock_is_transaction_scoped(database_url):
+    if not database_url.startswith("postgres"):
+        pytest.skip("advisory locks are PostgreSQL only")
+    db_engine = create_db_engine(database_url)
+    try:
+        run_migrations(db_engine)
+        # run_migrations releases its lock with each transaction, so another session can take it at once
+        with db_engine.connect() as connection:
+            assert connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}).scalar()
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    finally:
+        db_engine.dispose()
+
+
+async def exercise_repositories(db: AsyncSession) -> None:
+    """Write and read back through every async repository."""
+    suffix = uuid.uuid4().hex[:8]
+
+    conversation = await conversation_repo.get_or_create_conversation(db)
+    conversation_id = conversation.conversation_id
+    assert (await conversation_repo.get_or_create_conversation(db, conversation_id)).conversation_id == conversation_id
+    updated = await conversation_repo.update_conversation(db, conversation_id, status="completed")
+    assert updated.status == "completed"
+
+    await chat_message_repo.create_chat_message(db, conversation_id, "user", "Compare my syllabus")
+    await chat_message_repo.create_chat_message(db, conversation_id, "assistant", "Done", {"tables": 2})
+    assert await chat_message_repo.get_conversation_messages_for_llm(db, conversation_id) == [
+        {"role": "user", "content": "Compare my syllabus"},
+        {"role": "assistant", "content": "Done"},
+    ]
+
+    document = await document_repo.create_document(db, Document(filename="syllabus.pdf", raw_text="SQL"))
+    assert (await document_repo.get_document_by_id(db, document.document_id)).filename == "syllabus.pdf"
+    await syllabus_topic_repo.create_topics(db, [
+        {"document_id": document.document_id, "topic_name": "SQL", "keywords_json": ["joins"]},
+    ])
+    assert [t.topic_name for t in await syllabus_topic_repo.get_topics_by_document_id(db, document.document_id)] == ["SQL"]
+
+    content_hash = f"hash-{suffix}"
+    source_ids = await job_source_repo.create_job_sources(db, [
+        {"conversation_id": conversation_id, "url": f"https://jobs.example/{i}", "content_hash": f"{content_hash}-{i}"}
+        for i in range(3)
+    ])
+    assert len(source_ids) == 3
+    assert [s.id for s in await job_source_repo.get_sources_by_ids(db, source_ids[::-1])] == source_ids[::-1]
+    assert (await job_source_repo.get_source_by_hash(db, f"{content_hash}-1", conversation_id)).id == source_ids[1]
+    assert len(await job_source_repo.get_sources_by_conversation(db, conversation_id)) == 3
+
+    await job_topic_repo.create_job_topics(db, [
+        {"job_source_id": source_id, "conversation_id": conversation_id,
+         "normalized_topic": "sql", "raw_topic": "SQL", "confidence": 0.9}
+        for source_id in source_ids
+    ] + [{"job_source_id": source_ids[0], "conversation_id": conversation_id,
+          "normalized_topic": "airflow", "raw_topic": "Airflow", "confidence": 0.5}])
+    assert await job_topic_repo.count_topics_by_conversation(db, conversation_id) == 4
+    assert len(await job_topic_repo.get_topics_by_conversation(db, conversation_id)) == 4
+    frequencies = [row async for row in job_topic_repo.get_topic_frequencies(db, conversation_id, sample_urls=2)]
+    assert [(row["normalized_topic"], row["sources"]) for row in frequencies] == [("sql", 3), ("airflow", 1)]
+    assert len(frequencies[0]["sample_urls"]) == 2
+    assert len([row async for row in job_topic_repo.iter_topic_postings(db, conversation_id)]) == 4
+    assert len([row async for row in job_topic_repo.iter_topic_phrasings(db, conversation_id)]) == 2
+
+    await posting_topic_repo.create_posting_topics(db, [
+        {"content_hash": content_hash, "normalized_topic": "sql", "raw_topic": "SQL"},
+    ])
+    assert [t.normalized_topic for t in await posting_topic_repo.get_topics_by_hash(db, content_hash)] == ["sql"]
+
+    canonical, variant = f"sql {suffix}", f"structured query language {suffix}"
+    for _ in range(2):
+        # The second round hits the ON CONFLICT DO NOTHING path
+        await canonical_topic_repo.create_canonical_topics(db, [{"name": canonical}])
+        await canonical_topic_repo.create_topic_variants(db, [
+            {"variant": variant, "canonical_topic": canonical, "method": "acronym", "similarity": 0.9},
+        ])
+    assert canonical in await canonical_topic_repo.get_canonical_names(db)
+    assert (variant, canonical) in await canonical_topic_repo.get_variant_index(db)
+    assert await canonical_topic_repo.get_variant_canonicals(db, [variant, "unknown"]) == {variant: canonical}
+
+    backend = f"test-{suffix}"
+    for _ in range(2):
+        await topic_embedding_repo.create_embeddings(db, [
+            {"backend": backend, "normalized_topic": "sql", "dim": 2, "vector": b"\x00" * 8},
+        ])
+    assert await topic_embedding_repo.get_embeddings(db, backend, ["sql", "airflow"]) == {"sql": b"\x00" * 8}
+
+    run = await analysis_repo.create_analysis_run(
+        db, AnalysisRun(conversation_id=conversation_id, document_id=document.document_id)
+    )
+    assert (await analysis_repo.get_analysis_run(db, run.id)).document_id == document.document_id
+    await analysis_repo.create_table_a_rows(db, [
+        {"analysis_run_id": run.id, "syllabus_topic": "SQL", "industry_relevance_score": 90},
+    ])
+    await analysis_repo.create_table_b_rows(db, [
+        {"analysis_run_id": run.id, "missing_topic": "airflow", "priority": "High"},
+    ])
+    assert [r.syllabus_topic for r in await analysis_repo.get_table_a_rows(db, run.id)] == ["SQL"]
+    assert [r.missing_topic for r in await analysis_repo.get_table_b_rows(db, run.id)] == ["airflow"]
+
+    job = await background_job_repo.create_background_job(db, BackgroundJob(kind="analyze", params_json={"n": 1}))
+    assert job.status == "queued"
+    await background_job_repo.update_background_job(db, job.job_id, status="running", worker="host:1")
+    running = await background_job_repo.get_jobs_by_status(db, ["running"])
+    assert job.job_id in [j.job_id for j in running]
+    assert (await background_job_repo.get_background_job(db, job.job_id)).worker == "host:1"
+
+
+def test_async_repositories(database_url):
+    async def run():
+        db_engine = create_async_db_engine(database_url)
+        if database_url.startswith("postgres"):
+            assert db_engine.dialect.driver == "asyncpg"
+        else:
+            assert db_engine.dialect.driver == "aiosqlite"
+        try:
+            async with async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)() as db:
+                await exercise_repositories(db)
+        finally:
+            await db_engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_get_async_db(database_url, monkeypatch):
+    monkeypatch.setattr(settings, "database_url", database_url)
+
+    async def run():
+        await session_module.dispose_async_engine()
+        try:
+            sessions = session_module.get_async_db()
+            db = await sessions.__anext__()
+            assert make_url(str(db.get_bind().url)).get_driver_name() in ("aiosqlite", "asyncpg")
+            conversation = await conversation_repo.get_or_create_conversation(db)
+            await sessions.aclose()
+
+            async with session_module.AsyncSessionLocal() as db:
+                assert await db.get(app.db.models.Conversation, conversation.conversation_id) is not None
+        finally:
+            await session_module.dispose_async_engine()
+
+    asyncio.run(run())
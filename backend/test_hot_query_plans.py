@@ -0,0 +1,19 @@
+"""Test that the hot repository queries only use key-bounded index lookups (see benchmarks/explain_hot_queries.py)."""
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from benchmarks.explain_hot_queries import full_scans, hot_query_plans
+
+
+def test_full_index_scan_is_reported():
+    with Session(create_engine("sqlite://")) as db:
+        db.execute(text("CREATE TABLE job_topics (conversation_id TEXT, normalized_topic TEXT, raw_topic TEXT)"))
+        db.execute(text("CREATE INDEX idx_topics ON job_topics (conversation_id, normalized_topic)"))
+        # Not bounded by the index's leading column: SQLite scans the whole covering index
+        scans = full_scans(db, "SELECT conversation_id FROM job_topics WHERE normalized_topic = ?", ("sql",))
+        assert scans == ["SCAN job_topics USING COVERING INDEX idx_topics"]
+        assert full_scans(db, "SELECT normalized_topic FROM job_topics WHERE conversation_id = ?", ("c",)) == []
+
+
+def test_hot_queries_use_indexes():
+    failures = {label: scans for label, scans in hot_query_plans() if scans}
+    assert not failures, failures
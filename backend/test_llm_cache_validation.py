@@ -0,0 +1,67 @@
+"""Test that invoke_llm only caches responses its caller can parse."""
+import os
+
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "test")
+
+import pytest
+from langchain_core.messages import AIMessage
+from app.core import llm as llm_module
+from app.core.config import settings
+from app.core.llm_cache import LLMResponseCache
+from app.services.search_service import _job_topics_from_response, extract_job_topics
+
+
+class FakeLLM:
+    """Chat model stand-in returning queued replies and counting calls."""
+
+    deployment_name = "fake"
+    temperature = 0.0
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return AIMessage(content=self.replies.pop(0))
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = LLMResponseCache(":memory:", ttl_seconds=3600, max_entries=100)
+    monkeypatch.setattr(settings, "llm_cache_enabled", True)
+    monkeypatch.setattr(llm_module, "get_llm_cache", lambda: cache)
+    return cache
+
+
+def test_unparseable_response_is_not_cached(cache):
+    fake = FakeLLM(["not json", '[{"topic": "sql"}]'])
+    first = llm_module.invoke_llm(fake, "prompt", "JOB_TOPIC_EXTRACT_PROMPT", validate=_job_topics_from_response)
+    assert first.content == "not json"
+    assert cache.stats()["size"] == 0
+
+    second = llm_module.invoke_llm(fake, "prompt", "JOB_TOPIC_EXTRACT_PROMPT", validate=_job_topics_from_response)
+    third = llm_module.invoke_llm(fake, "prompt", "JOB_TOPIC_EXTRACT_PROMPT", validate=_job_topics_from_response)
+    assert second.content == third.content == '[{"topic": "sql"}]'
+    assert fake.calls == 2
+
+
+def test_cached_response_the_caller_rejects_is_deleted(cache):
+    fake = FakeLLM(['[{"topic": "python"}]'])
+    model_key = LLMResponseCache.make_key(
+        "JOB_TOPIC_EXTRACT_PROMPT", llm_module.PROMPT_VERSION, "prompt", "fake", 0.0
+    )
+    cache.set(model_key, "{broken", "JOB_TOPIC_EXTRACT_PROMPT")
+
+    response = llm_module.invoke_llm(fake, "prompt", "JOB_TOPIC_EXTRACT_PROMPT", validate=_job_topics_from_response)
+    assert response.content == '[{"topic": "python"}]'
+    assert fake.calls == 1
+    assert cache.get(model_key) == '[{"topic": "python"}]'
+
+
+def test_extract_job_topics_retries_after_malformed_reply(cache, monkeypatch):
+    fake = FakeLLM(["Sorry, I cannot help with that.", '[{"topic": "docker"}]'])
+    monkeypatch.setattr("app.services.search_service.get_llm_client", lambda *args, **kwargs: fake)
+    assert extract_job_topics(["Docker experience required"]) == []
+    assert extract_job_topics(["Docker experience required"]) == [{"topic": "docker"}]
@@ -0,0 +1,118 @@
+"""Test topic clustering keys, acronyms and TopicResolver decisions."""
+import os
+import tempfile
+
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "test")
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/topics.db"
+
+import numpy as np
+import pytest
+import app.db.models  # noqa: F401  (registers the tables)
+from app.core.config import settings
+from app.db.models import CanonicalTopic, TopicVariant
+from app.db.session import SessionLocal, init_db
+from app.services import topic_canonicalizer
+from app.services.topic_canonicalizer import TopicResolver, acronym, cluster_key, written_in_caps
+from app.tools.embeddings import EmbeddingBackend
+
+
+class ConceptEmbedder(EmbeddingBackend):
+    """Embeds texts of the same concept to the same unit vector and everything else apart."""
+
+    default_threshold = 0.8
+
+    def __init__(self, concepts):
+        self.concepts = concepts
+        self.name = f"concepts-{id(self)}"
+        self.dim = 64
+        self.others = {}
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            concept = self.concepts.get(text)
+            if concept is None:
+                concept = self.others.setdefault(text, len(self.concepts) + len(self.others))
+            vectors[i, concept] = 1.0
+        return vectors
+
+
+@pytest.fixture(scope="module", autouse=True)
+def database():
+    init_db()
+
+
+@pytest.fixture(autouse=True)
+def empty_dictionary(monkeypatch):
+    monkeypatch.setattr(settings, "embedding_match_threshold", None)
+    db = SessionLocal()
+    try:
+        db.query(TopicVariant).delete()
+        db.query(CanonicalTopic).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def use_concepts(monkeypatch, concepts):
+    backend = ConceptEmbedder(concepts)
+    monkeypatch.setattr(topic_canonicalizer, "get_embedding_backend", lambda: backend)
+    return backend
+
+
+def test_cluster_key_drops_qualifiers_and_plurals():
+    assert cluster_key("advanced sql queries") == "sql"
+    assert cluster_key("data warehouses") == "data warehouse"
+    assert cluster_key("intro to r") == "r"
+
+
+def test_acronym_needs_several_long_words():
+    assert acronym("structured query language") == "sql"
+    assert acronym("python") is None
+    assert acronym("ci cd") is None
+
+
+def test_written_in_caps():
+    assert written_in_caps("ai", ["Generative AI"])
+    assert written_in_caps("cicd", ["CI/CD pipelines"])
+    assert not written_in_caps("ai", ["ai", "Ai tools"])
+    assert not written_in_caps("ai", ["AIR"])
+
+
+def test_key_variants_share_a_canonical(monkeypatch):
+    use_concepts(monkeypatch, {})
+    mapping = TopicResolver().resolve(["Data Warehouses", "advanced data warehouse"])
+    assert mapping["data warehouses"] == mapping["advanced data warehouse"]
+
+
+@pytest.mark.parametrize("order", [["Adobe Illustrator", "AI"], ["AI", "Adobe Illustrator"]])
+def test_matching_initials_alone_do_not_merge(monkeypatch, order):
+    use_concepts(monkeypatch, {})
+    resolver = TopicResolver()
+    for topic in order:
+        resolver.resolve([topic])
+    assert resolver.resolve(["AI", "Adobe Illustrator"]) == {"ai": "ai", "adobe illustrator": "adobe illustrator"}
+
+
+@pytest.mark.parametrize("order", [["Structured Query Language", "SQL"], ["SQL", "Structured Query Language"]])
+def test_confirmed_acronym_merges(monkeypatch, order):
+    use_concepts(monkeypatch, {"sql": 0, "structured query language": 0})
+    resolver = TopicResolver()
+    first = resolver.resolve([order[0]])
+    second = resolver.resolve([order[1]])
+    assert set(first.values()) == set(second.values())
+
+
+def test_store_conflict_updates_indexes(monkeypatch):
+    use_concepts(monkeypatch, {})
+    late = TopicResolver()
+    with late._lock:
+        late._load()
+        late._loaded = True
+    TopicResolver().resolve(["data warehouse", "intro to data warehouses"])
+
+    # Left alone, late would make "data warehouses" the canonical
+    assert late.resolve(["intro to data warehouses"]) == {"intro to data warehouses": "data warehouse"}
+    assert late.keys["data warehouse"] == "data warehouse"
+    assert late.resolve(["data warehouses skills"]) == {"data warehouses skills": "data warehouse"}
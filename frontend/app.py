@@ -334,6 +334,8 @@ with tab4:
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
+            if message.get("notice"):
+                st.warning(message["notice"])
             
             # Display tables if any (no tool calls shown)
             if "tables" in message and message["tables"]:
@@ -346,63 +348,102 @@ with tab4:
         with st.chat_message("user"):
             st.markdown(prompt)
         
-        # Get response
+        # Get response (streamed as server-sent events)
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    payload = {
-                        "message": prompt,
-                        "conversation_id": st.session_state.conversation_id,
-                        "document_id": st.session_state.document_id
+            status_placeholder = st.empty()
+            text_placeholder = st.empty()
+            status_placeholder.caption("Thinking...")
+            try:
+                payload = {
+                    "message": prompt,
+                    "conversation_id": st.session_state.conversation_id,
+                    "document_id": st.session_state.document_id
+                }
+                
+                result = None
+                partial = None
+                error_detail = None
+                streamed_text = ""
+                with requests.post(f"{backend_url}/chat/stream", json=payload, stream=True, timeout=(10, 300)) as response:
+                    if response.status_code != 200:
+                        error_detail = f"{response.status_code} - {response.text}"
+                    else:
+                        event_name = None
+                        for line in response.iter_lines(decode_unicode=True):
+                            if line.startswith("event: "):
+                                event_name = line[len("event: "):]
+                            elif line.startswith("data: "):
+                                data = json.loads(line[len("data: "):])
+                                if event_name == "progress":
+                                    status_placeholder.caption(data.get("message", ""))
+                                elif event_name == "token":
+                                    streamed_text += data.get("delta", "")
+                                    text_placeholder.markdown(streamed_text)
+                                elif event_name == "done":
+                                    result = data
+                                elif event_name == "error":
+                                    error_detail = data.get("detail", "Unknown error")
+                                    if data.get("partial"):
+                                        # The reply broke off; the backend stored what was streamed
+                                        partial = data
+                status_placeholder.empty()
+                
+                if result is not None:
+                    # Update conversation ID
+                    if result.get("conversation_id"):
+                        st.session_state.conversation_id = result["conversation_id"]
+                    
+                    # Update document ID if provided
+                    if result.get("document_id"):
+                        st.session_state.document_id = result["document_id"]
+                    
+                    # Display response
+                    text_placeholder.markdown(result.get("response", ""))
+                    
+                    # Store message with metadata (tool_calls stored but not displayed)
+                    message_data = {
+                        "role": "assistant",
+                        "content": result.get("response", "")
                     }
                     
-                    response = requests.post(f"{backend_url}/chat", json=payload, timeout=300)
+                    # Store tool_calls for backend tracking but don't display to user
+                    if result.get("tool_calls"):
+                        message_data["tool_calls"] = result["tool_calls"]
                     
-                    if response.status_code == 200:
-                        result = response.json()
-                        
-                        # Update conversation ID
-                        if result.get("conversation_id"):
-                            st.session_state.conversation_id = result["conversation_id"]
-                        
-                        # Update document ID if provided
-                        if result.get("document_id"):
-                            st.session_state.document_id = result["document_id"]
-                        
-                        # Display response
-                        st.markdown(result.get("response", ""))
-                        
-                        # Store message with metadata (tool_calls stored but not displayed)
-                        message_data = {
-                            "role": "assistant",
-                            "content": result.get("response", "")
-                        }
-                        
-                        # Store tool_calls for backend tracking but don't display to user
-                        if result.get("tool_calls"):
-                            message_data["tool_calls"] = result["tool_calls"]
-                        
-                        # Display tables nicely if present
-                        if result.get("tables"):
-                            message_data["tables"] = result["tables"]
-                            display_analysis_tables(result["tables"])
-                        
-                        st.session_state.messages.append(message_data)
-                        st.rerun()  # Refresh UI to enable chat input again
-                    else:
-                        error_msg = f"Error: {response.status_code} - {response.text}"
-                        st.error(error_msg)
-                        st.session_state.messages.append({
-                            "role": "assistant",
-                            "content": error_msg
-                        })
-                        st.rerun()  # Refresh UI even on error
-                except requests.exceptions.RequestException as e:
-                    error_msg = f"Connection error: {str(e)}"
+                    # Display tables nicely if present
+                    if result.get("tables"):
+                        message_data["tables"] = result["tables"]
+                        display_analysis_tables(result["tables"])
+                    
+                    st.session_state.messages.append(message_data)
+                    st.rerun()  # Refresh UI to enable chat input again
+                elif partial is not None:
+                    # Keep the partial reply, as stored in the backend history, with the error underneath
+                    if partial.get("conversation_id"):
+                        st.session_state.conversation_id = partial["conversation_id"]
+                    notice = f"The reply was interrupted: {error_detail}"
+                    text_placeholder.markdown(partial.get("response", ""))
+                    st.warning(notice)
+                    st.session_state.messages.append({
+                        "role": "assistant",
+                        "content": partial.get("response", ""),
+                        "notice": notice
+                    })
+                    st.rerun()  # Refresh UI to enable chat input again
+                else:
+                    error_msg = f"Error: {error_detail or 'No response from backend'}"
                     st.error(error_msg)
                     st.session_state.messages.append({
                         "role": "assistant",
                         "content": error_msg
                     })
                     st.rerun()  # Refresh UI even on error
+            except requests.exceptions.RequestException as e:
+                error_msg = f"Connection error: {str(e)}"
+                st.error(error_msg)
+                st.session_state.messages.append({
+                    "role": "assistant",
+                    "content": error_msg
+                })
+                st.rerun()  # Refresh UI even on error
 